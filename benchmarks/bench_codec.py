@@ -0,0 +1,76 @@
+"""
+Compares the JSON codecs in igor.codec on sample gateway payloads.
+
+Decoding is timed from bytes, the way gateway frames and REST bodies arrive.
+Codecs whose library isn't installed are skipped.
+
+Usage:
+    python -m benchmarks.bench_codec [--number N] [--payloads FILE]
+"""
+
+import argparse
+import os
+import timeit
+from igor.codec import FACTORIES, get_codec
+
+DEFAULT_PAYLOADS = os.path.join(os.path.dirname(__file__), "gateway_payloads.jsonl")
+
+
+def load_payloads(path):
+    with open(path, "rb") as f:
+        return [line.rstrip(b"\n") for line in f if line.strip()]
+
+
+def bench(codec, frames, number):
+    objects = [codec.loads(frame) for frame in frames]
+    total = sum(len(frame) for frame in frames)
+
+    def decode():
+        for frame in frames:
+            codec.loads(frame)
+
+    def encode():
+        for obj in objects:
+            codec.dumps(obj)
+
+    decode_time = min(timeit.repeat(decode, number=number, repeat=5)) / number
+    encode_time = min(timeit.repeat(encode, number=number, repeat=5)) / number
+    return {
+        "decode_us": decode_time / len(frames) * 1e6,
+        "decode_mb_s": total / decode_time / 1e6,
+        "encode_us": encode_time / len(frames) * 1e6,
+        "encode_mb_s": total / encode_time / 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--payloads", default=DEFAULT_PAYLOADS)
+    args = parser.parse_args()
+
+    frames = load_payloads(args.payloads)
+    print(f"{len(frames)} payloads, {sum(map(len, frames))} bytes")
+    print(
+        f"{'codec':<10}{'decode µs':>12}{'decode MB/s':>14}"
+        f"{'encode µs':>12}{'encode MB/s':>14}"
+    )
+
+    for name in FACTORIES:
+        try:
+            codec = get_codec(name)
+        except ImportError:
+            print(f"{name:<10}not installed")
+            continue
+
+        result = bench(codec, frames, args.number)
+        print(
+            f"{name:<10}{result['decode_us']:>12.2f}{result['decode_mb_s']:>14.1f}"
+            f"{result['encode_us']:>12.2f}{result['encode_mb_s']:>14.1f}"
+        )
+
+    print(f"default codec: {get_codec().name}")
+
+
+if __name__ == "__main__":
+    main()
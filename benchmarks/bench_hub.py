@@ -0,0 +1,115 @@
+"""
+Runs the hub end to end under load from the LoadGen channel and reports
+throughput and reply latency per reactor as JSON.
+
+The hub is started from a generated config holding only the load generator
+and the reactors of the message mix, so no network or platform tokens are
+needed. Results are written to stdout, or to --output, so runs can be kept
+and compared.
+
+Usage:
+    python -m benchmarks.bench_hub [--count N] [--rate R] [--concurrency C]
+        [--path process_event|submit] [--workers W] [--seed S] [--output FILE]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import toml
+from igor.hub import Hub
+from igor.channels.loadgen import PROCESS_EVENT, SUBMIT
+
+REACTORS = {
+    "fortune": {"class": "Fortune", "triggers": ["igor fortune"]},
+    "echoreactor": {"class": "EchoReactor", "triggers": ["igor echo"]},
+    "help": {"class": "Help", "triggers": ["igor help"]},
+}
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_config(args):
+    return {
+        "hub": {"workers": args.workers, "queue_size": args.concurrency},
+        "channels": {
+            "loadgen": {
+                "class": "LoadGen",
+                "count": args.count,
+                "rate": args.rate,
+                "concurrency": args.concurrency,
+                "path": args.path,
+                "seed": args.seed,
+                "exit_when_done": True,
+            }
+        },
+        "reactors": REACTORS,
+    }
+
+
+async def run(config_path):
+    hub = Hub(config_path)
+    await hub.start()
+    return hub.channels["loadgen"].results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--count", type=int, default=5000)
+    parser.add_argument("--rate", type=float, default=0, help="0 for unlimited")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument(
+        "--path", choices=(PROCESS_EVENT, SUBMIT), default=PROCESS_EVENT
+    )
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    # the unmatched share of the mix would log a warning per message
+    logging.getLogger("igor").setLevel(logging.ERROR)
+
+    config = build_config(args)
+    with tempfile.NamedTemporaryFile("w", suffix=".toml", delete=False) as f:
+        toml.dump(config, f)
+    try:
+        results = asyncio.run(run(f.name))
+    finally:
+        os.unlink(f.name)
+
+    report = {
+        "benchmark": "hub",
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "revision": git_revision(),
+        "config": config,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as out:
+            json.dump(report, out, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
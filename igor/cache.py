@@ -0,0 +1,129 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class CacheEntry:
+    __slots__ = ("value", "etag", "expires_at", "size")
+
+    def __init__(self, value: Any, etag: Optional[str], expires_at: float, size: int):
+        self.value = value
+        self.etag = etag
+        self.expires_at = expires_at
+        self.size = size
+
+    def fresh(self) -> bool:
+        return self.expires_at > time.monotonic()
+
+
+class ResponseCache:
+    """
+    LRU cache of decoded responses with per-entry TTLs and a memory cap.
+
+    Entries stay in the cache after they expire, so their ETag can be used to
+    revalidate them instead of downloading the body again. When the total
+    size of the cached bodies exceeds max_bytes, the least recently used
+    entries are evicted.
+
+    Concurrent lookups of the same key are coalesced: only one fetch is in
+    flight at a time and everyone waiting gets its result.
+
+    Cached values are shared between callers and must not be mutated.
+
+    Attributes:
+        max_bytes (int): Total body size the cache may hold.
+        hits (int): Lookups answered from a fresh entry.
+        misses (int): Lookups that needed a fetch.
+        revalidations (int): Fetches answered with 304 Not Modified.
+        coalesced (int): Lookups that joined a fetch already in flight.
+        evictions (int): Entries evicted to stay under max_bytes.
+    """
+
+    def __init__(self, max_bytes: int = 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        """
+        Returns the entry for the key, fresh or stale, and marks it as
+        recently used.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: float,
+        etag: Optional[str] = None,
+        size: int = 0,
+    ) -> None:
+        self.discard(key)
+        if size > self.max_bytes:
+            return
+
+        self._entries[key] = CacheEntry(value, etag, time.monotonic() + ttl, size)
+        self.size += size
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= evicted.size
+            self.evictions += 1
+
+    def discard(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry.size
+
+    async def get_or_fetch(
+        self,
+        key: Hashable,
+        fetch: Callable[[Optional[CacheEntry]], Awaitable[Any]],
+    ) -> Any:
+        """
+        Returns the cached value if it is fresh. Otherwise calls
+        fetch(stale_entry_or_None), which is responsible for storing the
+        result with put(), and returns what it returns. Concurrent calls for
+        the same key share one fetch.
+        """
+        entry = self.get(key)
+        if entry is not None and entry.fresh():
+            self.hits += 1
+            return entry.value
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.create_task(fetch(entry))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+
+        # shield the shared fetch so one caller giving up doesn't cancel it
+        # for everyone else
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.size,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
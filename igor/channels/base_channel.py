@@ -1,8 +1,23 @@
+import time
 from abc import ABC, abstractmethod
-from typing import Any
-from igor.event import Event
+from typing import Any, Hashable, Optional
+from igor.event import Event, is_for_igor
 from igor.response import Response
 from igor.hub import Hub
+from igor.dispatcher import conversation_key
+from igor.outbound import OutboundBuffer
+from igor.metrics import REGISTRY
+
+SEND_SECONDS = REGISTRY.histogram(
+    "igor_channel_send_seconds",
+    "Time channels take to send a response to their platform.",
+    ("channel",),
+)
+SEND_ERRORS = REGISTRY.counter(
+    "igor_channel_send_errors_total",
+    "Responses channels failed to send.",
+    ("channel",),
+)
 
 
 class Channel(ABC):
@@ -15,16 +30,104 @@ class Channel(ABC):
 
     Attributes:
         hub (Hub): The central hub that manages all channels and reactors.
+        setup_timeout (float): Seconds setup() may take, None for the hub's
+            default.
+        max_message_length (int): The platform's message length limit, longer
+            responses are split. None for no limit.
+        coalesce_window (float): Seconds to wait for more responses to the
+            same destination, so they can be sent as one message.
     """
 
-    def __init__(self, hub: Hub):
+    setup_timeout = None
+    max_message_length: Optional[int] = None
+    coalesce_window = 0.0
+
+    def __init__(self, hub: Hub, coalesce_window: Optional[float] = None):
         """
         Initialize a new Channel instance.
 
         Args:
             hub (Hub): The central hub that manages all channels and reactors.
+            coalesce_window (float): Overrides the class's coalesce_window.
         """
         self.hub = hub
+        if coalesce_window is not None:
+            self.coalesce_window = coalesce_window
+        name = type(self).__name__.lower()
+        self.send_seconds = SEND_SECONDS.labels(name)
+        self.send_errors = SEND_ERRORS.labels(name)
+        self.outbound = OutboundBuffer(
+            self.timed_send_response,
+            self.coalesce_window,
+            self.max_message_length,
+        )
+
+    async def setup(self) -> None:
+        """
+        Prepare the channel for use, e.g. open connections or load data.
+
+        The hub runs the setup of all channels and reactors concurrently at
+        startup and calls start_listening() once this returns.
+
+        If it raises or takes longer than setup_timeout seconds (the hub's
+        default when None), the channel is left out.
+        """
+        pass
+
+    async def teardown(self) -> None:
+        """
+        Release the resources acquired in setup(). Called by the hub when Igor
+        is shutting down.
+        """
+        pass
+
+    async def deliver(self, event: Event, response: Response) -> None:
+        """
+        Queues a response for sending. Responses to the same destination are
+        coalesced within coalesce_window and split to max_message_length,
+        then sent in order through send_response().
+
+        Args:
+            event (Event): The original event that triggered this response.
+            response (Response): The response to be sent back to the user.
+        """
+        self.outbound.deliver(self.destination(event), event, response)
+
+    def unanswered(self, event: Event) -> None:
+        """
+        Called by the hub once it is done with an event of this channel that
+        got no response, e.g. because no reactor handled it. Channels that
+        wait for a reply to every event override it.
+        """
+
+    def is_for_igor(self, text: str) -> bool:
+        """
+        Checks whether a message is addressed to Igor, before an event is
+        created for it.
+        """
+        return is_for_igor(text)
+
+    async def timed_send_response(self, event: Event, response: Response) -> None:
+        start = time.perf_counter()
+        try:
+            await self.send_response(event, response)
+        except Exception:
+            self.send_errors.inc()
+            raise
+        finally:
+            self.send_seconds.observe(time.perf_counter() - start)
+
+    async def flush(self) -> None:
+        """
+        Waits until every response delivered so far has been sent.
+        """
+        await self.outbound.flush()
+
+    def destination(self, event: Event) -> Hashable:
+        """
+        Returns the key of the chat or channel responses to the event go to.
+        """
+        return conversation_key(event)
 
     @abstractmethod
     async def start_listening(self) -> None:
@@ -1,38 +1,191 @@
 import asyncio
+import os
+import stat
+import sys
+import threading
+from collections import deque
+from typing import Optional
 from igor.event import Event
 from igor.response import Response
 from igor.channels.base_channel import Channel
+from igor.tracing import get_tracer
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+# written in batch mode for a message the hub's full queue refused
+REJECTED = "error: Igor is too busy, message dropped"
+
+
+async def open_reader(file) -> asyncio.StreamReader:
+    """
+    Returns a StreamReader for a file object, e.g. sys.stdin. Pipes are read
+    by the event loop. Regular files can't be watched by it (they are always
+    readable), and a tty would be switched to non-blocking mode, which it
+    shares with stdout, so both are read in a thread, a chunk at a time.
+    """
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    fd = file.fileno()
+
+    if stat.S_ISREG(os.fstat(fd).st_mode) or os.isatty(fd):
+        # a daemon thread, so a read still waiting for the user doesn't hold
+        # up the exit
+        threading.Thread(
+            target=read_in_thread, args=(fd, loop, reader), daemon=True
+        ).start()
+    else:
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), file)
+    return reader
+
+
+def read_in_thread(fd: int, loop, reader: asyncio.StreamReader) -> None:
+    try:
+        while True:
+            try:
+                chunk = os.read(fd, 65536)
+            except OSError:
+                # e.g. the terminal was closed (EIO), same as the end of input
+                chunk = b""
+            if not chunk:
+                loop.call_soon_threadsafe(reader.feed_eof)
+                return
+            loop.call_soon_threadsafe(reader.feed_data, chunk)
+    except RuntimeError:
+        # the event loop was closed while waiting for input
+        pass
 
 
 class Console(Channel):
-    def __init__(self, hub):
-        super().__init__(hub)
+    """
+    Talks to Igor through the terminal.
+
+    In interactive mode it prompts for one message at a time. In batch mode
+    it reads newline-delimited messages from stdin (or input_path) until the
+    end of the input, submits them as fast as the hub takes them, writes the
+    replies to stdout in the order of the messages, and shuts Igor down.
+    Every message for Igor gets exactly one line of output: replies have
+    their line breaks escaped, messages without a reply get an empty line,
+    and messages the hub rejects get an error line.
+    """
+
+    def __init__(self, hub, mode=INTERACTIVE, input_path=None, **options):
+        """
+        Args:
+            mode (str): "interactive" or "batch".
+            input_path (str): File to read messages from in batch mode,
+                stdin if None.
+        """
+        super().__init__(hub, **options)
+        if mode not in (INTERACTIVE, BATCH):
+            raise ValueError(f"Unknown console mode: {mode}")
+        self.mode = mode
+        self.input_path = input_path
+        self.reader: Optional[asyncio.StreamReader] = None
+        # batch mode: lines waiting for their reply, and replies waiting for
+        # the lines before them
+        self.expected = deque()
+        self.replies = {}
 
     async def start_listening(self):
+        if self.mode == BATCH:
+            await self.run_batch()
+            return
+
         while True:
             try:
                 user_input = await self.async_input("> ")
-                if user_input.lower().startswith("igor"):
-                    event = Event(type="message", content=user_input, channel="console")
-                    await self.hub.process_event(event)
-                elif user_input.lower() == "q":
+                if user_input is None or user_input.lower() == "q":
                     await self.stop_listening()
                     print(f"{self.__class__.__name__} is shutting down")
                     break
+                elif self.is_for_igor(user_input):
+                    event = self.channel_event_to_igor_event(user_input)
+                    await self.hub.submit(event)
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 print(f"An error occurred: {e}")
 
-    async def async_input(self, prompt):
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, input, prompt)
+    async def async_input(self, prompt) -> Optional[str]:
+        """
+        Prompts for a line and waits for it without blocking the event loop.
+
+        Returns:
+            str: The line without its line break, None at the end of input.
+        """
+        if self.reader is None:
+            self.reader = await open_reader(sys.stdin)
+
+        print(prompt, end="", flush=True)
+        line = await self.reader.readline()
+        if not line:
+            return None
+        return line.decode().rstrip("\r\n")
+
+    async def run_batch(self):
+        """
+        Submits every message of the input, waits for all of them to be
+        handled and their replies to be written, then shuts Igor down.
+        """
+        if self.input_path is not None:
+            with open(self.input_path, "rb") as file:
+                await self.submit_lines(await open_reader(file))
+        else:
+            await self.submit_lines(await open_reader(sys.stdin))
+
+        await self.hub.drain()
+        await self.flush()
+        self.write_replies(final=True)
+        await self.stop_listening()
+
+    async def submit_lines(self, reader: asyncio.StreamReader):
+        line_number = 0
+        while line := await reader.readline():
+            text = line.decode().rstrip("\r\n")
+            if self.is_for_igor(text):
+                self.expected.append(line_number)
+                event = self.channel_event_to_igor_event(text)
+                # every line is its own conversation, so the hub handles
+                # them concurrently
+                event.extra["conversation_id"] = line_number
+                if not await self.hub.submit(event):
+                    self.replies[line_number] = REJECTED
+                    self.write_replies()
+            line_number += 1
+
+    def write_replies(self, final=False):
+        """
+        Writes the replies that are next in line. With final, gives up on
+        lines that never got one.
+        """
+        while self.expected and (final or self.expected[0] in self.replies):
+            reply = self.replies.pop(self.expected.popleft(), "")
+            sys.stdout.write(reply.replace("\r\n", "\n").replace("\n", "\\n") + "\n")
+        sys.stdout.flush()
 
     def channel_event_to_igor_event(self, event):
-        return Event(event_type="message", content=event, channel="console")
+        return Event(
+            event_type="message",
+            content=event,
+            channel="console",
+            trace=get_tracer().start("console"),
+        )
 
     async def send_response(self, event: Event, response: Response):
-        print(f"Igor: {response.content}")
+        line_number = event.extra.get("conversation_id")
+        if line_number is None:
+            print(f"Igor: {response.content}")
+            return
+
+        self.replies[line_number] = response.content
+        self.write_replies()
+
+    def unanswered(self, event: Event):
+        line_number = event.extra.get("conversation_id")
+        if line_number is not None:
+            self.replies[line_number] = ""
+            self.write_replies()
 
     async def stop_listening(self):
         self.hub.signal_shutdown()
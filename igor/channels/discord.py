@@ -3,18 +3,48 @@ import os
 import asyncio
 from igor.channels.base_channel import Channel
 from igor.external.discord_api import DiscordAPI
+from igor.event_queue import DROP_OLDEST
 from dotenv import load_dotenv
-from igor.event import Event
-from igor.logging_config import get_logger
+from igor.event import Event, PREFIX
+from igor.logging_config import get_logger, get_rate_limited_logger
+from igor.tracing import get_tracer
 
 load_dotenv()
 logger = get_logger(__name__)
+event_logger = get_rate_limited_logger(f"{__name__}.events")
+
+# seconds a message may wait in the queue before it is worth a warning
+LAG_WARNING = 5.0
 
 
 class Discord(Channel):
-    def __init__(self, hub):
-        super().__init__(hub)
-        self.api = DiscordAPI(os.getenv("DISCORD_BOT_TOKEN"))
+    max_message_length = 2000
+    coalesce_window = 0.05
+
+    def __init__(
+        self,
+        hub,
+        shards=None,
+        shard_processes=0,
+        queue_size=1000,
+        overflow=DROP_OLDEST,
+        **options,
+    ):
+        """
+        Args:
+            shards (int): Number of gateway shards, None for Discord's
+                recommendation.
+            shard_processes (int): Worker processes to run the shards in, 0
+                to run them all in this event loop.
+            queue_size (int): Capacity of the queue of received messages.
+            overflow (str): What to do when it is full: "block",
+                "drop_oldest" or "drop_newest".
+        """
+        super().__init__(hub, **options)
+        self.api = DiscordAPI(os.getenv("DISCORD_BOT_TOKEN"), queue_size, overflow)
+        self.api.add_interest("MESSAGE_CREATE", content_prefix=PREFIX)
+        self.shards = shards
+        self.shard_processes = shard_processes
         self.running = False
 
     async def start_listening(self):
@@ -32,7 +62,10 @@ class Discord(Channel):
     async def keep_connected(self):
         while self.running:
             try:
-                await self.api.connect()
+                if self.shard_processes:
+                    await self.api.connect_processes(self.shard_processes, self.shards)
+                else:
+                    await self.api.connect(self.shards)
             except Exception as e:
                 logger.debug(f"Connection error: {e}, reconnecting...")
                 await asyncio.sleep(5)
@@ -40,20 +73,42 @@ class Discord(Channel):
     async def listen_for_events(self):
         while self.running:
             try:
+                # the api only queues messages starting with "igor"
                 discord_event = await self.api.get_next_event()
-                if discord_event["d"]["content"].lower().startswith("igor"):
-                    igor_event = self.channel_event_to_igor_event(discord_event)
-                    await self.hub.process_event(igor_event)
+                wait = self.api.event_queue.last_wait
+                if wait > LAG_WARNING:
+                    event_logger.warning(
+                        "Discord message waited %.1fs in the queue", wait
+                    )
+                igor_event = self.channel_event_to_igor_event(discord_event)
+                trace = igor_event.trace
+                if trace is not None:
+                    trace.add_span("discord.queue", trace.start - wait, trace.start)
+                await self.hub.submit(igor_event)
             except Exception as e:
-                logger.debug(f"Error getting next discord event: {e}")
+                logger.debug("Error getting next discord event: %s", e)
                 await asyncio.sleep(1)  # Avoid tight loop in case of recurring errors
 
+    def health(self):
+        """
+        Returns the state and heartbeat latency of every gateway shard.
+        """
+        return self.api.health()
+
+    def queue_stats(self):
+        """
+        Returns the depth of the queue of received messages, how many it
+        shed and how long messages waited in it.
+        """
+        return self.api.queue_stats()
+
     def channel_event_to_igor_event(self, event):
         return Event(
             channel="discord",
             event_type="message",
             content=event["d"]["content"],
             extra={"discord_channel_id": event["d"]["channel_id"]},
+            trace=get_tracer().start("discord"),
         )
 
     async def send_response(self, event, response):
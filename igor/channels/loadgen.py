@@ -0,0 +1,188 @@
+import asyncio
+import random
+import time
+from typing import Dict, List, Optional
+from igor.event import Event
+from igor.response import Response
+from igor.channels.base_channel import Channel
+from igor.logging_config import get_logger
+from igor.tracing import get_tracer
+from igor.utils.stats import percentile
+
+logger = get_logger(__name__)
+
+PROCESS_EVENT = "process_event"
+SUBMIT = "submit"
+
+# label: (message, weight); labels name the reactor a message is meant for
+DEFAULT_MIX = {
+    "echo": ("igor echo the quick brown fox", 5),
+    "fortune": ("igor fortune", 3),
+    "help": ("igor help", 1),
+    "unmatched": ("igor make me a sandwich", 1),
+}
+
+
+class LoadGen(Channel):
+    """
+    Synthetic channel that drives the hub with generated messages and
+    measures how long each one takes to get its reply.
+
+    Messages are drawn from a weighted mix and sent at up to rate messages per
+    second, with at most concurrency in flight. By default they go straight
+    to Hub.process_event; with path = "submit" they take the same route as
+    messages from real channels, through the hub's queue and workers.
+
+    Attributes:
+        results (dict): The summary of the last run, see summary().
+    """
+
+    coalesce_window = 0.0
+
+    def __init__(
+        self,
+        hub,
+        count: int = 1000,
+        rate: float = 0,
+        concurrency: int = 32,
+        mix: Optional[Dict[str, list]] = None,
+        path: str = PROCESS_EVENT,
+        seed: Optional[int] = None,
+        exit_when_done: bool = False,
+        **options,
+    ):
+        """
+        Args:
+            count (int): Number of messages to send.
+            rate (float): Messages per second, 0 to send as fast as possible.
+            concurrency (int): Messages in flight at most.
+            mix (dict): Label to (message, weight), DEFAULT_MIX if None.
+            path (str): "process_event" or "submit".
+            seed (int): Seed for the message draw, for repeatable runs.
+            exit_when_done (bool): Shut the hub down after the run.
+        """
+        super().__init__(hub, **options)
+        if path not in (PROCESS_EVENT, SUBMIT):
+            raise ValueError(f"Unknown load generator path: {path}")
+        self.count = count
+        self.rate = rate
+        self.concurrency = concurrency
+        self.mix = {
+            label: tuple(entry) for label, entry in (mix or DEFAULT_MIX).items()
+        }
+        self.path = path
+        self.random = random.Random(seed)
+        self.exit_when_done = exit_when_done
+        self.results: Optional[dict] = None
+        self._sent_at: Dict[int, float] = {}
+        self._labels: Dict[int, str] = {}
+        self._latencies: Dict[str, List[float]] = {}
+        self._replies: Dict[str, int] = {}
+        self._errors = 0
+
+    async def start_listening(self):
+        self.results = await self.run()
+        if self.exit_when_done:
+            await self.stop_listening()
+
+    async def stop_listening(self):
+        self.hub.signal_shutdown()
+
+    async def run(self) -> dict:
+        """
+        Sends count messages and waits for all of them to be handled.
+
+        Returns:
+            dict: The run's summary.
+        """
+        labels = list(self.mix)
+        weights = [self.mix[label][1] for label in labels]
+        slots = asyncio.Semaphore(self.concurrency)
+        interval = 1 / self.rate if self.rate else 0
+        tasks = []
+
+        start = time.perf_counter()
+        for number in range(self.count):
+            if interval:
+                # keep to the schedule instead of sleeping a fixed interval,
+                # so slow sends don't lower the rate
+                delay = start + number * interval - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await slots.acquire()
+            label = self.random.choices(labels, weights)[0]
+            task = asyncio.create_task(self.send(number, label))
+            task.add_done_callback(lambda _: slots.release())
+            tasks.append(task)
+
+        await asyncio.gather(*tasks)
+        if self.path == SUBMIT:
+            await self.hub.drain()
+        await self.flush()
+        elapsed = time.perf_counter() - start
+
+        return self.summary(elapsed)
+
+    async def send(self, number: int, label: str) -> None:
+        event = self.channel_event_to_igor_event(self.mix[label][0])
+        # every message is its own conversation, as if sent by another user
+        event.extra["conversation_id"] = number
+        self._labels[number] = label
+        self._sent_at[number] = time.perf_counter()
+        try:
+            if self.path == SUBMIT:
+                await self.hub.submit(event)
+            else:
+                await self.hub.process_event(event)
+        except Exception as e:
+            self._errors += 1
+            logger.error(f"Load generator event failed: {e}")
+
+    def channel_event_to_igor_event(self, event):
+        return Event(
+            event_type="message",
+            content=event,
+            channel="loadgen",
+            trace=get_tracer().start("loadgen"),
+        )
+
+    async def send_response(self, event: Event, response: Response):
+        number = event.extra["conversation_id"]
+        label = self._labels[number]
+        latency = time.perf_counter() - self._sent_at[number]
+        self._latencies.setdefault(label, []).append(latency)
+        self._replies[label] = self._replies.get(label, 0) + 1
+
+    def summary(self, elapsed: float) -> dict:
+        """
+        Summarizes a run: overall throughput, and the number of messages,
+        replies and reply latency percentiles (in milliseconds) per label.
+        """
+        sent: Dict[str, int] = {}
+        for label in self._labels.values():
+            sent[label] = sent.get(label, 0) + 1
+
+        per_label = {}
+        for label in sorted(sent):
+            ordered = sorted(self._latencies.get(label, []))
+            per_label[label] = {
+                "sent": sent[label],
+                "replies": self._replies.get(label, 0),
+                **{
+                    f"p{p}_ms": (
+                        None
+                        if percentile(ordered, p) is None
+                        else percentile(ordered, p) * 1000
+                    )
+                    for p in (50, 95, 99)
+                },
+                "max_ms": ordered[-1] * 1000 if ordered else None,
+            }
+
+        return {
+            "events": len(self._labels),
+            "errors": self._errors,
+            "seconds": elapsed,
+            "events_per_second": len(self._labels) / elapsed if elapsed else None,
+            "reactors": per_label,
+        }
@@ -1,4 +1,8 @@
+import hmac
 import os
+import secrets
+from aiohttp import web
+from igor import codec
 from igor.channels.base_channel import Channel
 from igor.event import Event
 from igor.response import Response
@@ -12,22 +16,81 @@ from telegram.ext import (
 )
 from dotenv import load_dotenv
 from igor.logging_config import get_logger
+from igor.tracing import get_tracer
 
 load_dotenv()
 logger = get_logger(__name__)
 
+POLLING = "polling"
+WEBHOOK = "webhook"
+
+# header Telegram sends the webhook's secret token in
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
 
 class Telegram(Channel):
-    def __init__(self, hub):
-        super().__init__(hub)
+    max_message_length = 4096
+    coalesce_window = 0.05
+
+    def __init__(
+        self,
+        hub,
+        mode=POLLING,
+        webhook_url=None,
+        listen="127.0.0.1",
+        port=8443,
+        path="/telegram",
+        max_connections=40,
+        base_url=None,
+        **options,
+    ):
+        """
+        Args:
+            mode (str): "polling" to long-poll Telegram for updates, "webhook"
+                to have Telegram post them to a local server.
+            webhook_url (str): Public HTTPS URL Telegram posts updates to,
+                forwarded to listen:port/path. Required in webhook mode.
+            listen (str): Address the webhook server binds to.
+            port (int): Port the webhook server listens on.
+            path (str): Path the webhook server accepts updates on.
+            max_connections (int): Concurrent webhook requests Telegram may
+                make.
+            base_url (str): Bot API endpoint, for a local Bot API server.
+        """
+        super().__init__(hub, **options)
 
-        token = os.getenv("TELEGRAM_BOT_TOKEN")
-        if token is None:
+        self.token = os.getenv("TELEGRAM_BOT_TOKEN")
+        if self.token is None:
             error = "TELEGRAM_BOT_TOKEN environment variable not set"
             logger.error(error)
             raise ValueError(error)
 
-        self.application = ApplicationBuilder().token(token).build()
+        if mode not in (POLLING, WEBHOOK):
+            raise ValueError(f"Unknown Telegram mode: {mode}")
+        if mode == WEBHOOK and not webhook_url:
+            raise ValueError("Telegram webhook mode needs a webhook_url")
+
+        self.mode = mode
+        self.webhook_url = webhook_url
+        self.listen = listen
+        self.port = port
+        self.path = path
+        self.max_connections = max_connections
+        self.base_url = base_url
+        # Telegram echoes the secret in every webhook request; a fresh one is
+        # registered at every start unless it is pinned in the environment
+        self.secret_token = os.getenv(
+            "TELEGRAM_WEBHOOK_SECRET"
+        ) or secrets.token_urlsafe(32)
+        self.application = None
+        self.runner = None
+
+    async def setup(self):
+        builder = ApplicationBuilder().token(self.token)
+        if self.base_url:
+            builder = builder.base_url(self.base_url)
+        self.application = builder.build()
+        await self.application.initialize()
 
     async def start_listening(self):
         # setup handlers
@@ -42,9 +105,12 @@ class Telegram(Channel):
         # self.application.add_handler(webapp_handler)
 
         # start the bot
-        await self.application.initialize()
         await self.application.start()
 
+        if self.mode == WEBHOOK:
+            await self.start_webhook()
+            return
+
         if self.application.updater is None:
             logger.error("Unable to get application updater")
             return
@@ -52,7 +118,80 @@ class Telegram(Channel):
         await self.application.updater.start_polling()
 
     async def stop_listening(self):
-        await self.application.shutdown()
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+        # nothing else to stop if setup() failed
+        if self.application is None:
+            return
+        updater = self.application.updater
+        if updater is not None and updater.running:
+            await updater.stop()
+        if self.application.running:
+            await self.application.stop()
+
+    async def teardown(self):
+        """
+        Stops the updater or the webhook server and the application if they
+        still run, then shuts the application down.
+        """
+        await self.stop_listening()
+        if self.application is not None:
+            await self.application.shutdown()
+            self.application = None
+
+    async def start_webhook(self):
+        """
+        Starts the local server receiving updates and registers its public
+        URL with Telegram, which then posts every update to it as it
+        happens.
+        """
+        app = web.Application()
+        app.router.add_post(self.path, self.handle_webhook)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.listen, self.port).start()
+
+        await self.application.bot.set_webhook(
+            url=self.webhook_url,
+            secret_token=self.secret_token,
+            allowed_updates=["message"],
+            max_connections=self.max_connections,
+        )
+        logger.info(f"Telegram webhook listening on {self.listen}:{self.port}")
+
+    async def handle_webhook(self, request: web.Request) -> web.Response:
+        """
+        Accepts an update posted by Telegram. Requests are handled
+        concurrently; each one only decodes its update and hands it on, so
+        Telegram gets its answer right away.
+        """
+        secret = request.headers.get(SECRET_HEADER, "")
+        if not hmac.compare_digest(secret.encode(), self.secret_token.encode()):
+            return web.Response(status=403)
+
+        try:
+            data = codec.loads(await request.read())
+            # valid JSON that isn't an update object is still a bad request
+            if not isinstance(data, dict):
+                return web.Response(status=400)
+            update = Update.de_json(data, self.application.bot)
+        except (ValueError, TypeError, KeyError):
+            return web.Response(status=400)
+
+        await self.dispatch_update(update)
+        return web.Response()
+
+    async def dispatch_update(self, update: Update):
+        """
+        Submits messages for Igor straight to the hub; everything else goes
+        through the application's handlers, as when polling.
+        """
+        message = update.message
+        if message is not None and message.text and self.is_for_igor(message.text):
+            await self.hub.submit(self.channel_event_to_igor_event(update))
+        else:
+            await self.application.process_update(update)
 
     async def handle_start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         if update.effective_chat is None:
@@ -63,10 +202,10 @@ class Telegram(Channel):
         )
 
     async def handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        if update.message.text.lower().startswith("igor"):
+        if self.is_for_igor(update.message.text):
             event = self.channel_event_to_igor_event(update)
-            setattr(event, "context", context.args)
-            await self.hub.process_event(event)
+            event.extra["context"] = context.args
+            await self.hub.submit(event)
 
     def channel_event_to_igor_event(self, event):
         # for now we're just handling commands and text messages
@@ -83,6 +222,7 @@ class Telegram(Channel):
             content=content,
             channel="telegram",
             extra={"chat_id": event.effective_chat.id},
+            trace=get_tracer().start("telegram"),
         )
         return event
 
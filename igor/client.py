@@ -1,10 +1,165 @@
+import time
 import aiohttp
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Any, Mapping, Optional
 from igor.logging_config import get_logger
+from igor.cache import ResponseCache
+from igor import codec
+from igor.metrics import REGISTRY
 
 
 logger = get_logger(__name__)
 
+DEFAULT_HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "application/json",
+}
+
+
+HTTP_RESPONSES = REGISTRY.counter(
+    "igor_http_responses_total",
+    "Responses to outgoing HTTP requests, by method and status.",
+    ("method", "status"),
+)
+HTTP_ERRORS = REGISTRY.counter(
+    "igor_http_errors_total",
+    "Outgoing HTTP requests that got no response.",
+    ("method",),
+)
+HTTP_SECONDS = REGISTRY.histogram(
+    "igor_http_request_seconds",
+    "Time outgoing HTTP requests take, body included.",
+    ("method",),
+)
+
+
+@dataclass
+class HttpResponse:
+    status: int
+    body: bytes
+    headers: Mapping[str, str] = field(default_factory=dict)
+
+    def json(self) -> Any:
+        return codec.loads(self.body)
+
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+
+class HttpClient:
+    """
+    App-wide HTTP client. All outgoing requests share one aiohttp session, so
+    connections are kept alive and reused, DNS lookups are cached and the
+    number of connections (in total and per host) is capped.
+
+    The hub opens it at startup and closes it on shutdown; used on its own
+    it opens itself on the first request.
+
+    Attributes:
+        limit (int): Maximum number of open connections.
+        limit_per_host (int): Maximum number of open connections per host.
+        dns_cache_ttl (int): Seconds resolved addresses are cached.
+        keepalive_timeout (float): Seconds an idle connection is kept open.
+        total_timeout (float): Seconds a whole request may take.
+        connect_timeout (float): Seconds establishing a connection may take.
+        cache (ResponseCache): Cache for GETs made with a cache_ttl.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        dns_cache_ttl: int = 300,
+        keepalive_timeout: float = 30,
+        total_timeout: float = 30,
+        connect_timeout: float = 10,
+        cache_max_bytes: int = 1024 * 1024,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.total_timeout = total_timeout
+        self.connect_timeout = connect_timeout
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.cache = ResponseCache(cache_max_bytes)
+
+    async def open(self) -> None:
+        if self.session is not None and not self.session.closed:
+            return
+
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=self.total_timeout, connect=self.connect_timeout
+        )
+        self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[dict] = None,
+        json: Any = None,
+        headers: Optional[dict] = None,
+    ) -> HttpResponse:
+        """
+        Sends a request over the shared session and reads the whole body. A
+        json payload is encoded with the fastest codec installed.
+        """
+        if self.session is None or self.session.closed:
+            await self.open()
+
+        data = None
+        if json is not None:
+            data = codec.dumps(json)
+            headers = {"Content-Type": "application/json", **(headers or {})}
+
+        start = time.perf_counter()
+        try:
+            async with self.session.request(
+                method, url, params=params, data=data, headers=headers
+            ) as response:
+                body = await response.read()
+        except Exception:
+            HTTP_ERRORS.labels(method).inc()
+            raise
+        HTTP_SECONDS.labels(method).observe(time.perf_counter() - start)
+        HTTP_RESPONSES.labels(method, response.status).inc()
+        return HttpResponse(response.status, body, response.headers)
+
+
+_client: Optional[HttpClient] = None
+
+
+def get_client() -> HttpClient:
+    """
+    Returns the app-wide client, creating one with default settings if the
+    hub hasn't installed its own.
+    """
+    global _client
+    if _client is None:
+        _client = HttpClient()
+    return _client
+
+
+def set_client(client: Optional[HttpClient]) -> None:
+    """
+    Installs the client used by send_request.
+    """
+    global _client
+    _client = client
+
 
 # url (in discord api we can create the url before calling send_request)
 # request_type
@@ -14,40 +169,76 @@ async def send_request(
     url: str,
     args: Optional[dict] = None,
     optional_headers: Optional[dict] = None,
+    cache_ttl: Optional[float] = None,
 ):
+    """
+    Sends a GET or POST request and returns the decoded JSON body, or None if
+    the request failed.
+
+    GETs made with a cache_ttl are served from the client's response cache
+    for that many seconds. Once expired they are revalidated with the ETag
+    the server sent, if any, and concurrent identical GETs share one request.
+    Cached results are shared and must not be mutated.
+    """
 
     if args is None:
         args = {}
 
-    headers = {
-        "Content-Type": "application/json",
-        "Accept": "application/json",
-    }
+    headers = dict(DEFAULT_HEADERS)
 
     if optional_headers:
         headers.update(optional_headers)
 
-    # create an async session with context manager
-    async with aiohttp.ClientSession() as session:
-        if request_type.lower() == "get":
-            async with session.get(url, params=args, headers=headers) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    error_text = await response.text()
-                    logger.error(
-                        f"Request failed with status {response.status}. Error: {error_text}"
-                    )
-                    return None
-        elif request_type.lower() == "post":
-            async with session.post(url, json=args, headers=headers) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    error_text = await response.text()
-                    logger.error(
-                        f"Request failed with status {response.status}. Error: {error_text}"
-                    )
-                    return None
-        else:
-            raise ValueError("Unsupported request type")
+    client = get_client()
+    if request_type.lower() == "get" and cache_ttl is not None:
+        return await cached_get(client, url, args, headers, cache_ttl)
+    elif request_type.lower() == "get":
+        response = await client.request("GET", url, params=args, headers=headers)
+    elif request_type.lower() == "post":
+        response = await client.request("POST", url, json=args, headers=headers)
+    else:
+        raise ValueError("Unsupported request type")
+
+    return decode_response(response)
+
+
+def decode_response(response: HttpResponse):
+    if response.status == 200:
+        return response.json()
+
+    logger.error(
+        f"Request failed with status {response.status}. Error: {response.text()}"
+    )
+    return None
+
+
+async def cached_get(
+    client: HttpClient, url: str, args: dict, headers: dict, cache_ttl: float
+):
+    cache = client.cache
+    key = (
+        url,
+        tuple(sorted(args.items())),
+        tuple(sorted(headers.items())),
+    )
+
+    async def fetch(stale):
+        request_headers = headers
+        if stale is not None and stale.etag:
+            request_headers = {**headers, "If-None-Match": stale.etag}
+
+        response = await client.request(
+            "GET", url, params=args, headers=request_headers
+        )
+        if response.status == 304 and stale is not None:
+            cache.revalidations += 1
+            cache.put(key, stale.value, cache_ttl, stale.etag, stale.size)
+            return stale.value
+
+        value = decode_response(response)
+        if response.status == 200:
+            etag = response.headers.get("ETag")
+            cache.put(key, value, cache_ttl, etag, len(response.body))
+        return value
+
+    return await cache.get_or_fetch(key, fetch)
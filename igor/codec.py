@@ -0,0 +1,78 @@
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Union
+from igor.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# fastest first; the first one installed is used
+PREFERENCE = ("orjson", "msgspec", "json")
+
+
+@dataclass(frozen=True)
+class Codec:
+    """
+    A JSON implementation.
+
+    Attributes:
+        name (str): The library it uses.
+        loads (Callable): Decodes bytes or str, without decoding bytes to
+            str first.
+        dumps (Callable): Encodes to UTF-8 bytes.
+    """
+
+    name: str
+    loads: Callable[[Union[bytes, bytearray, str]], Any]
+    dumps: Callable[[Any], bytes]
+
+
+def _json_codec() -> Codec:
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    return Codec("json", json.loads, dumps)
+
+
+def _orjson_codec() -> Codec:
+    import orjson
+
+    return Codec("orjson", orjson.loads, orjson.dumps)
+
+
+def _msgspec_codec() -> Codec:
+    import msgspec
+
+    return Codec("msgspec", msgspec.json.decode, msgspec.json.encode)
+
+
+FACTORIES: Dict[str, Callable[[], Codec]] = {
+    "orjson": _orjson_codec,
+    "msgspec": _msgspec_codec,
+    "json": _json_codec,
+}
+
+
+def get_codec(name: Optional[str] = None) -> Codec:
+    """
+    Returns the named codec, or the fastest one installed if name is None.
+
+    Raises:
+        ImportError: If the named codec's library isn't installed.
+    """
+    if name is not None:
+        return FACTORIES[name]()
+
+    for candidate in PREFERENCE:
+        try:
+            return FACTORIES[candidate]()
+        except ImportError:
+            continue
+    return _json_codec()
+
+
+codec = get_codec()
+logger.debug(f"using {codec.name} for JSON")
+
+# bound directly, these run for every gateway frame
+loads = codec.loads
+dumps = codec.dumps
@@ -0,0 +1,125 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Hashable, List, Optional
+from igor.event import Event
+from igor.event_queue import WAIT_WINDOW
+from igor.logging_config import get_logger
+from igor.utils.stats import percentile as percentile_of
+
+logger = get_logger(__name__)
+
+# keys in Event.extra that identify a conversation on each platform;
+# conversation_id is for channels without a platform id of their own
+CONVERSATION_KEYS = ("discord_channel_id", "chat_id", "conversation_id")
+
+
+def conversation_key(event: Event) -> Hashable:
+    """
+    Derives the key of the conversation an event belongs to: the Discord
+    channel or Telegram chat it came from. Events from channels without a
+    notion of conversation (e.g. the console) share one conversation per
+    channel.
+    """
+    for name in CONVERSATION_KEYS:
+        conversation = event.extra.get(name)
+        if conversation is not None:
+            return (event.channel, conversation)
+    return (event.channel, None)
+
+
+class LaneDispatcher:
+    """
+    Runs events one at a time per conversation while letting different
+    conversations run in parallel.
+
+    Conversation keys are hashed onto a fixed number of lanes. Every lane has
+    its own queue, drained in order by its own task, so events that enter the
+    same lane are handled strictly in the order they entered it and replies
+    within a chat go out in order. Submitting an event never waits for its
+    lane: a burst in one chat only lengthens that lane's queue while the
+    other lanes keep going.
+
+    Attributes:
+        lanes (int): The number of lanes, i.e. how many events are handled
+            at most at the same time.
+        capacity (int): How many submitted events may be waiting or running
+            in all lanes together before submit() waits for one to finish,
+            None for no limit.
+        waits (deque): How long the last WAIT_WINDOW events waited in their
+            lane before being handled, in seconds.
+    """
+
+    def __init__(self, lanes: int = 16, capacity: Optional[int] = None):
+        self.lanes = lanes
+        self.capacity = capacity
+        self._queues: List[asyncio.Queue] = [asyncio.Queue() for _ in range(lanes)]
+        # lane tasks are started on first use, they need a running loop
+        self._tasks: List[Optional[asyncio.Task]] = [None] * lanes
+        self._slots = asyncio.Semaphore(capacity) if capacity is not None else None
+        self._pending = 0
+        self.waits = deque(maxlen=WAIT_WINDOW)
+
+    def lane(self, event: Event) -> int:
+        """
+        Returns the index of the lane the event's conversation is hashed to.
+        """
+        return hash(conversation_key(event)) % self.lanes
+
+    async def submit(
+        self,
+        event: Event,
+        handler: Callable[[Event], Awaitable[Any]],
+    ) -> None:
+        """
+        Queues the event in its conversation's lane and returns without
+        waiting for it to be handled. Only waits when the dispatcher is at
+        capacity, until an event in any lane finishes.
+
+        Args:
+            event (Event): The event to handle.
+            handler (Callable): Coroutine function called with the event.
+                Exceptions it raises are logged.
+        """
+        if self._slots is not None:
+            await self._slots.acquire()
+
+        index = self.lane(event)
+        if self._tasks[index] is None:
+            self._tasks[index] = asyncio.create_task(self._drain(self._queues[index]))
+        self._pending += 1
+        self._queues[index].put_nowait((time.monotonic(), event, handler))
+
+    async def _drain(self, queue: asyncio.Queue) -> None:
+        while True:
+            enqueued_at, event, handler = await queue.get()
+            self.waits.append(time.monotonic() - enqueued_at)
+            try:
+                await handler(event)
+            except Exception as e:
+                logger.error(f"Error handling event {event}: {e}", exc_info=True)
+            finally:
+                self._pending -= 1
+                if self._slots is not None:
+                    self._slots.release()
+
+    def wait_percentile(self, percentile: float) -> Optional[float]:
+        """
+        Returns a percentile (0-100) of the recent lane waits, in seconds, or
+        None before the first event was handled.
+        """
+        return percentile_of(sorted(self.waits), percentile)
+
+    def close(self) -> None:
+        """
+        Cancels the lane tasks, dropping the events still queued in them.
+        """
+        for task in self._tasks:
+            if task is not None:
+                task.cancel()
+
+    def __len__(self) -> int:
+        """
+        Returns the number of events waiting or running in the lanes.
+        """
+        return self._pending
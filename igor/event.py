@@ -1,10 +1,49 @@
 from dataclasses import dataclass, field
-from typing import Dict, Any
+from typing import Dict, Any, List
 
+# the word messages for Igor start with
+PREFIX = "igor"
 
-@dataclass
+
+def is_for_igor(text: str) -> bool:
+    # only the prefix is lowercased, not the whole message
+    return text[: len(PREFIX)].lower() == PREFIX
+
+
+@dataclass(slots=True)
 class Event:
+    """
+    Something that happened on a channel, usually a message.
+
+    The content is lowercased and split into tokens once, when the event is
+    created, so the router and the reactors don't each do it again.
+
+    Attributes:
+        tokens (list): The words of the content, lowercased.
+        args (str): The content after the trigger that routed the event to
+            the reactor handling it, in its original casing; the whole
+            content for reactors not matched through a trigger.
+    """
+
     event_type: str
     content: str
     channel: str
     extra: Dict[str, Any] = field(default_factory=dict)
+    # igor.tracing.Trace of a sampled event, None for the others
+    trace: Any = field(default=None, repr=False, compare=False)
+    tokens: List[str] = field(init=False, repr=False, compare=False)
+    args: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.tokens = self.content.lower().split()
+        self.args = self.content
+
+    def args_after(self, count: int) -> str:
+        """
+        Returns the content after its first count words, in its original
+        casing.
+        """
+        if count == 0:
+            return self.content
+        words = self.content.split(None, count)
+        return words[count] if len(words) > count else ""
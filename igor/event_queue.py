@@ -0,0 +1,117 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Optional
+from igor.logging_config import get_logger
+from igor.utils.stats import percentile as percentile_of
+
+logger = get_logger(__name__)
+
+BLOCK = "block"
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+REJECT = "reject"
+
+OVERFLOW_POLICIES = (BLOCK, DROP_OLDEST, DROP_NEWEST, REJECT)
+
+# queue waits kept for the wait percentiles
+WAIT_WINDOW = 1000
+
+
+class EventQueue:
+    """
+    Bounded FIFO queue with an explicit policy for what happens when it is
+    full.
+
+    - block: put() waits until a slot frees up (backpressure on the producer)
+    - drop_oldest: the oldest queued item is discarded to make room
+    - reject (or drop_newest): the new item is not queued and put() returns
+      False
+
+    Every item is stamped with the time it was queued, so the time items
+    spend waiting is known when they are taken off.
+
+    Attributes:
+        maxsize (int): The capacity of the queue.
+        overflow (str): One of OVERFLOW_POLICIES.
+        dropped (int): Items discarded by the drop_oldest policy.
+        rejected (int): Items refused by the reject/drop_newest policy.
+        last_wait (float): Seconds the last item taken off had waited.
+        waits (deque): The last WAIT_WINDOW waits, in seconds.
+    """
+
+    def __init__(self, maxsize: int = 256, overflow: str = BLOCK):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        if maxsize <= 0:
+            raise ValueError("EventQueue needs a positive maxsize")
+
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.dropped = 0
+        self.rejected = 0
+        self.last_wait: Optional[float] = None
+        self.waits = deque(maxlen=WAIT_WINDOW)
+        self._queue = asyncio.Queue(maxsize)
+
+    async def put(self, item: Any) -> bool:
+        """
+        Adds an item to the queue according to the overflow policy.
+
+        Returns:
+            bool: True if the item was queued, False if it was rejected.
+        """
+        if self.overflow == BLOCK:
+            await self._queue.put((time.monotonic(), item))
+            return True
+
+        if self._queue.full():
+            if self.overflow in (REJECT, DROP_NEWEST):
+                self.rejected += 1
+                return False
+            self._queue.get_nowait()
+            self._queue.task_done()
+            self.dropped += 1
+
+        self._queue.put_nowait((time.monotonic(), item))
+        return True
+
+    async def get(self) -> Any:
+        enqueued_at, item = await self._queue.get()
+        self.last_wait = time.monotonic() - enqueued_at
+        self.waits.append(self.last_wait)
+        return item
+
+    def task_done(self) -> None:
+        self._queue.task_done()
+
+    async def join(self) -> None:
+        """
+        Waits until every queued item has been marked done.
+        """
+        await self._queue.join()
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    def full(self) -> bool:
+        return self._queue.full()
+
+    def wait_percentile(self, percentile: float) -> Optional[float]:
+        """
+        Returns a percentile (0-100) of the recent queue waits, in seconds,
+        or None before the first item was taken off.
+        """
+        return percentile_of(sorted(self.waits), percentile)
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.qsize(),
+            "maxsize": self.maxsize,
+            "overflow": self.overflow,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "wait_last": self.last_wait,
+            "wait_p50": self.wait_percentile(50),
+            "wait_p99": self.wait_percentile(99),
+        }
@@ -0,0 +1,94 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from igor.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# execution modes a reactor can declare
+ASYNC = "async"
+THREAD = "thread"
+PROCESS = "process"
+
+EXECUTION_MODES = (ASYNC, THREAD, PROCESS)
+
+
+class Executors:
+    """
+    Owns the thread and process pools used to keep blocking or CPU-bound work
+    off the event loop. Pools are created on first use, so a setup where every
+    reactor is async never starts a thread or a process.
+
+    Attributes:
+        thread_workers (int): Size of the thread pool (None for the default).
+        process_workers (int): Size of the process pool (None for the
+            number of CPUs).
+    """
+
+    def __init__(
+        self,
+        thread_workers: Optional[int] = None,
+        process_workers: Optional[int] = None,
+    ):
+        self.thread_workers = thread_workers
+        self.process_workers = process_workers
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+    def pool(self, mode: str) -> Executor:
+        """
+        Returns the pool for the given execution mode, creating it if needed.
+        """
+        if mode == THREAD:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(
+                    max_workers=self.thread_workers, thread_name_prefix="igor"
+                )
+            return self._thread_pool
+        if mode == PROCESS:
+            if self._process_pool is None:
+                # spawn rather than fork: forking a process that runs an event
+                # loop and other threads can deadlock the child
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.process_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._process_pool
+        raise ValueError(f"No pool for execution mode: {mode}")
+
+    async def run(self, mode: str, func: Callable, *args: Any) -> Any:
+        """
+        Runs func(*args) in the pool for the given mode and waits for the
+        result without blocking the event loop. In process mode, func and
+        args must be picklable.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pool(mode), func, *args)
+
+    def shutdown(self) -> None:
+        """
+        Shuts down the pools, cancelling work that has not started yet.
+        """
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=False, cancel_futures=True)
+            self._thread_pool = None
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+
+
+# reactors instantiated inside pool processes, one per class
+_process_reactors: Dict[type, Any] = {}
+
+
+def handle_in_process(reactor_class: type, event):
+    """
+    Handles an event with a process-local instance of the reactor class. The
+    instance is created on first use in each pool process, without a hub, and
+    reused for every later event so expensive setup only happens once.
+    """
+    reactor = _process_reactors.get(reactor_class)
+    if reactor is None:
+        reactor = _process_reactors[reactor_class] = reactor_class(None)
+    return reactor.handle(event)
@@ -1,15 +1,56 @@
 import asyncio
-import json
-from igor.client import send_request
+import multiprocessing
+import queue
+import threading
+from igor.client import DEFAULT_HEADERS, decode_response, get_client, send_request
+from igor.external.discord_filter import GatewayFilter
+from igor.external.discord_gateway import (
+    GatewayShard,
+    IdentifyLimiter,
+    SharedIdentifyLimiter,
+    run_shard_process,
+    shards_for_process,
+)
+from igor.external.discord_ratelimit import RateLimiter
+from igor.event_queue import DROP_OLDEST, EventQueue
 from igor.logging_config import get_logger
-
-
-import websockets
-
-from igor.utils import op
+from igor.metrics import REGISTRY
 
 logger = get_logger(__name__)
 
+GATEWAY_LATENCY = REGISTRY.gauge(
+    "igor_discord_heartbeat_latency_seconds",
+    "Heartbeat round trip of each gateway shard, by percentile of the "
+    "recent heartbeats.",
+    ("shard", "quantile"),
+)
+GATEWAY_CONNECTED = REGISTRY.gauge(
+    "igor_discord_shard_ready", "1 if the gateway shard is ready.", ("shard",)
+)
+MISSED_ACKS = REGISTRY.counter(
+    "igor_discord_missed_acks_total",
+    "Heartbeats the gateway never acknowledged.",
+    ("shard",),
+)
+RECONNECTS = REGISTRY.counter(
+    "igor_discord_reconnects_total", "Gateway reconnections.", ("shard",)
+)
+SKIPPED = REGISTRY.counter(
+    "igor_discord_dispatches_skipped_total",
+    "Gateway dispatches skipped without decoding.",
+)
+QUEUE_DEPTH = REGISTRY.gauge(
+    "igor_discord_queue_depth", "Discord messages waiting for the hub."
+)
+QUEUE_SHED = REGISTRY.counter(
+    "igor_discord_queue_shed_total",
+    "Discord messages dropped because the hub fell behind.",
+)
+QUEUE_WAIT = REGISTRY.gauge(
+    "igor_discord_queue_wait_p99_seconds",
+    "99th percentile of the time recent Discord messages waited for the hub.",
+)
+
 
 class DiscordAPI:
     """
@@ -24,172 +65,251 @@ class DiscordAPI:
 
     """
 
-    def __init__(self, token):
+    def __init__(self, token, queue_size=1000, overflow=DROP_OLDEST):
         self.base_url = "https://discord.com/api/v10/"
         self.token = token
         self.version = "1.0.0"
-        self.sequence_number = None
-        self.heartbeat_interval = None
-        self.session_id = None
-        self.resume_gateway_url = None
-        self.reconnect_codes = [4000, 4001, 4002, 4003, 4005, 4007, 4008, 4009, 7]
-        self.event_queue = asyncio.Queue()
+        # when the hub falls behind, the oldest messages are shed first by
+        # default; blocking would also stop the shards from reading their
+        # heartbeat ACKs
+        self.event_queue = EventQueue(queue_size, overflow)
+        self.ratelimiter = RateLimiter()
+        self.gateway_filter = GatewayFilter()
+        self.shards = {}
+        self.shard_health = {}
+        self.processes = []
         self.headers = {
             "User-Agent": f"DiscordBot (https://example.com, {self.version})",
             "Authorization": self.token,
         }
-        logger.debug(f"token is: {self.token}")
-        logger.debug(f"DiscordAPI initialized with headers: {self.headers}")
-
-    async def connect(self):
-        """
-        Opens websocket connection. Once connected, the client receives a Hello
-        event that contains the heartbeat_interval. The heartbeat_interval is
-        the length of time in ms that determines how often to send a heartbeat
-        event in order to maintain the connection.
-        """
-        url = self.base_url + "/gateway"
-        while True:
-            try:
-                data = await send_request("get", url, optional_headers=self.headers)
-                if data is None:
-                    return None
-                wss_url = data["url"]
-
-                async with websockets.connect(wss_url) as self.websocket:
-                    hello_event = await self.websocket.recv()
-                    hello_data = json.loads(hello_event)
-
-                    self.heartbeat_interval = hello_data["d"]["heartbeat_interval"]
-                    self.sequence_number = hello_data.get("s")
-
-                    await self.identify()
-
-                    # asyncio.gather is used to run these two methods concurrently. If
-                    # either of these tasks fail, gather will also fail and the
-                    # exception will propagate to the connect method.
-                    await asyncio.gather(
-                        self.heartbeat(),
-                        self.receive(),
-                    )
-
-            except Exception as e:
-                print(f"Connection error: {e}, reconnecting...")
-                await asyncio.sleep(5)
-
-    async def receive(self):
-        while True:
-            try:
-                message = await self.websocket.recv()
-                data = json.loads(message)
-                opcode = data["op"]
-
-                if opcode == op.HEARTBEAT:
-                    self.heartbeat_interval = data["d"]["heartbeat_interval"]
-                elif opcode == op.HEARTBEAT_ACK:
-                    # TODO: if we don't get a heartbeat_ack then it probably means the
-                    # connection is zombified and we should reconnect/resume
-                    print(f"Heartbeat ACK: {data}\n")
-                elif opcode == op.DISPATCH:
-                    event_type = data.get("t")
-                    if event_type == "READY":
-                        self.resume_gateway_url = data["d"].get("resume_gateway_url")
-                        self.session_id = data["d"].get("session_id")
-                    if event_type == "MESSAGE_CREATE":
-                        await self.event_queue.put(data)
-                elif opcode == op.RECONNECT:
-                    print("Received RECONNECT opcode, initiating reconnection...")
-                    await self.reconnect()
-
-                self.sequence_number = data.get("s") or self.sequence_number
-
-            except Exception as e:
-                print(f"Error in receive: {e}")
-
-    async def send(self, opcode, payload=None):
-        """
-        Utility function to send data via websocket
-        """
-        if payload is None:
-            payload = {}
-
-        data = self.opcode(opcode, payload)
-        await self.websocket.send(data)
-
-    def opcode(self, opcode, payload):
-        data = {"op": opcode, "d": payload}
-        return json.dumps(data)
-
-    async def heartbeat(self):
-        """
-        Sends heartbeat event at intervals determined by heartbeat_interval.
-        The heartbeat event consists of opcode 1 and the last sequence number
-        recieved in the "d" field.
-        """
-        while True:
-            try:
-                if self.heartbeat_interval is None:
-                    print("Heartbeat interval not set")
-                    return None
-
-                await asyncio.sleep(self.heartbeat_interval / 1000)
-
-                await self.send(op.HEARTBEAT, self.sequence_number)
-
-            except Exception as e:
-                print(f"Error sending heartbeat: {e}")
-                return
+        REGISTRY.add_collector(self.collect_metrics)
+        logger.debug("token is: %s", self.token)
+        logger.debug("DiscordAPI initialized with headers: %s", self.headers)
+
+    async def gateway_info(self, shard_count=None):
+        """
+        Asks /gateway/bot for the gateway URL, the recommended number of
+        shards and how many shards may identify at once.
+
+        Returns:
+            tuple: (url, shard_count, max_concurrency), shard_count overridden
+            if given, or None if Discord couldn't be reached.
+        """
+        data = await send_request(
+            "get",
+            self.base_url + "gateway/bot",
+            optional_headers=self.headers,
+            cache_ttl=3600,
+        )
+        if data is None:
+            return None
+        return (
+            data["url"],
+            shard_count or data["shards"],
+            data["session_start_limit"]["max_concurrency"],
+        )
+
+    async def connect(self, shard_count=None, shard_ids=None):
+        """
+        Opens one websocket connection per shard, all in this process, and
+        keeps them running. All shards put their events on event_queue.
+
+        Args:
+            shard_count (int): Total number of shards, None for Discord's
+                recommendation.
+            shard_ids (list): The shards to run here, None for all of them.
+        """
+        info = await self.gateway_info(shard_count)
+        if info is None:
+            return None
+        url, shard_count, max_concurrency = info
+
+        if shard_ids is None:
+            shard_ids = range(shard_count)
+        identify_limiter = IdentifyLimiter(max_concurrency)
+        self.shards = {
+            shard_id: GatewayShard(
+                self.token,
+                self.event_queue,
+                self.gateway_filter,
+                shard_id,
+                shard_count,
+                identify_limiter,
+            )
+            for shard_id in shard_ids
+        }
+        logger.info(f"Connecting {len(self.shards)} of {shard_count} shards")
+        tasks = [
+            asyncio.create_task(shard.connect(url)) for shard in self.shards.values()
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # gather leaves the other shards running when one fails; they
+            # would stay connected next to the ones a retry opens
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def connect_processes(self, processes, shard_count=None):
+        """
+        Like connect(), but spreads the shards over worker processes, each
+        with its own event loop decoding its shards' traffic. Their events
+        are put on event_queue in this process, their health is collected in
+        shard_health. A worker process that dies is started again.
+
+        Args:
+            processes (int): Number of worker processes.
+            shard_count (int): Total number of shards, None for Discord's
+                recommendation.
+        """
+        info = await self.gateway_info(shard_count)
+        if info is None:
+            return None
+        url, shard_count, max_concurrency = info
+
+        context = multiprocessing.get_context("spawn")
+        out_queue = context.Queue()
+        identify_limiter = SharedIdentifyLimiter(max_concurrency)
+        interests = self.gateway_filter.interest_list()
+
+        def start_process(index, shard_ids):
+            process = context.Process(
+                target=run_shard_process,
+                args=(
+                    self.token,
+                    url,
+                    shard_ids,
+                    shard_count,
+                    interests,
+                    identify_limiter,
+                    out_queue,
+                ),
+                name=f"igor-shards-{index}",
+                daemon=True,
+            )
+            process.start()
+            return process
+
+        assignments = []
+        for index in range(processes):
+            shard_ids = shards_for_process(shard_count, processes, index)
+            if shard_ids:
+                assignments.append((index, shard_ids))
+                self.processes.append(start_process(index, shard_ids))
+        logger.info(
+            f"Connecting {shard_count} shards in {len(self.processes)} processes"
+        )
+
+        # one long-lived thread reads the workers' queue, instead of handing
+        # every get to the thread pool
+        loop = asyncio.get_running_loop()
+        inbox = asyncio.Queue()
+        stop = threading.Event()
+        reader = threading.Thread(
+            target=read_process_queue,
+            args=(out_queue, loop, inbox, stop),
+            name="igor-shards-reader",
+            daemon=True,
+        )
+        reader.start()
+
+        async def watch_processes():
+            while True:
+                await asyncio.sleep(1)
+                for slot, (index, shard_ids) in enumerate(assignments):
+                    process = self.processes[slot]
+                    if not process.is_alive():
+                        logger.error(
+                            f"Shard process {process.name} exited with code "
+                            f"{process.exitcode}, restarting it"
+                        )
+                        self.processes[slot] = start_process(index, shard_ids)
+
+        watchdog = asyncio.create_task(watch_processes())
+        try:
+            while True:
+                kind, payload = await inbox.get()
+                if kind == "event":
+                    await self.event_queue.put(payload)
+                elif kind == "health":
+                    for health in payload:
+                        self.shard_health[health["shard_id"]] = health
+        finally:
+            watchdog.cancel()
+            stop.set()
+            for process in self.processes:
+                process.terminate()
+            self.processes.clear()
+
+    def health(self):
+        """
+        Returns the health of every shard, whether it runs in this process or
+        in a worker process, by shard id.
+        """
+        health = dict(self.shard_health)
+        for shard_id, shard in self.shards.items():
+            health[shard_id] = shard.health()
+        return health
+
+    @property
+    def latency(self):
+        """
+        Average heartbeat latency of the shards, in seconds.
+        """
+        latencies = [
+            health["latency"]
+            for health in self.health().values()
+            if health["latency"] is not None
+        ]
+        return sum(latencies) / len(latencies) if latencies else None
+
+    def collect_metrics(self):
+        """
+        Copies the shards' health and the event queue's state into the
+        metrics when they are scraped.
+        """
+        for shard_id, health in self.health().items():
+            shard = str(shard_id)
+            for quantile, key in (("0.5", "latency_p50"), ("0.99", "latency_p99")):
+                if health[key] is not None:
+                    GATEWAY_LATENCY.labels(shard, quantile).set(health[key])
+            GATEWAY_CONNECTED.labels(shard).set(health["state"] == "ready")
+            MISSED_ACKS.labels(shard).set_total(health["missed_acks"])
+            RECONNECTS.labels(shard).set_total(health["reconnects"])
+
+        SKIPPED.labels().set_total(self.gateway_filter.skipped)
+        stats = self.event_queue.stats()
+        QUEUE_DEPTH.labels().set(stats["depth"])
+        QUEUE_SHED.labels().set_total(stats["dropped"] + stats["rejected"])
+        if stats["wait_p99"] is not None:
+            QUEUE_WAIT.labels().set(stats["wait_p99"])
 
     async def get_next_event(self):
         event = await self.event_queue.get()
+        self.event_queue.task_done()
         return event
 
-    async def identify(self):
-        event = {
-            "token": self.token,
-            "intents": (1 << 0 | 1 << 9),
-            "properties": {
-                "os": "macos",
-                "browser": "safari",
-                "device": "my_library",
-            },
-        }
+    def queue_stats(self):
+        """
+        Returns the event queue's depth, what it shed and how long events
+        waited in it.
+        """
+        return self.event_queue.stats()
 
-        await self.send(op.IDENTIFY, event)
-
-    async def reconnect(self):
-        if self.resume_gateway_url and self.session_id:
-            try:
-                async with websockets.connect(
-                    self.resume_gateway_url
-                ) as self.websocket:
-                    await self.resume()
-            # TODO: if we don't reconnect in time to resume, we should receive an
-            # INVALID_SESSION, so we should create a new connection. The
-            # reconnect method shouldn't be called in the exception, but
-            # rather when we see this opcode. See https://discord.com/developers/docs/topics/gateway#resuming
-            except Exception as e:
-                print(f"Failed to resume: {e}")
-                self.resume_gateway_url = None
-                self.session_id = None
-                await self.connect()
-        else:
-            await self.connect()
-
-    async def resume(self):
-        resume_payload = {
-            "op": op.RESUME,
-            "d": {
-                "token": self.token,
-                "session_id": self.session_id,
-                "seq": self.sequence_number,
-            },
-        }
-        await self.send(resume_payload)
+    def add_interest(self, event_type, content_prefix=None):
+        """
+        Subscribes to a dispatch type, optionally only to messages starting
+        with content_prefix. Other dispatches are skipped before they are
+        decoded.
+        """
+        self.gateway_filter.add(event_type, content_prefix)
 
     async def get_guild_id(self):
         url = f"{self.base_url}/users/@me/guilds"
-        guilds = await send_request("get", url, optional_headers=self.headers)
+        guilds = await send_request(
+            "get", url, optional_headers=self.headers, cache_ttl=300
+        )
         if guilds is None:
             return None
         guild_id = next(
@@ -202,7 +322,9 @@ class DiscordAPI:
         if guild_id is None:
             return None
         url = f"{self.base_url}/guilds/{guild_id}/channels"
-        channels = await send_request("get", url, optional_headers=self.headers)
+        channels = await send_request(
+            "get", url, optional_headers=self.headers, cache_ttl=300
+        )
         return channels
 
     async def get_channel_id(self, channel_name):
@@ -216,8 +338,36 @@ class DiscordAPI:
         return channel_id
 
     async def send_message(self, channel_id, message):
-        url = f"{self.base_url}/channels/{channel_id}/messages"
-        res = await send_request(
-            "post", url, {"content": message}, optional_headers=self.headers
+        res = await self.rest(
+            "post", f"channels/{channel_id}/messages", {"content": message}
         )
         return res
+
+    async def rest(self, method, path, payload=None):
+        """
+        Sends a REST request through the rate limiter, which queues it until
+        Discord's per-route and global limits allow it to go out.
+        """
+        url = self.base_url + path
+        headers = {**DEFAULT_HEADERS, **self.headers}
+
+        async def send():
+            return await get_client().request(
+                method.upper(), url, json=payload, headers=headers
+            )
+
+        response = await self.ratelimiter.request(method, path, send)
+        return decode_response(response)
+
+
+def read_process_queue(out_queue, loop, inbox, stop):
+    """
+    Moves the messages of the shard processes from out_queue to inbox, an
+    asyncio.Queue of the given loop, until stop is set.
+    """
+    while not stop.is_set():
+        try:
+            message = out_queue.get(timeout=0.5)
+        except queue.Empty:
+            continue
+        loop.call_soon_threadsafe(inbox.put_nowait, message)
@@ -0,0 +1,74 @@
+import zlib
+from typing import Optional, Union
+from urllib.parse import urlencode
+
+# every complete gateway message ends with the marker of a zlib Z_SYNC_FLUSH
+ZLIB_SUFFIX = b"\x00\x00\xff\xff"
+
+GATEWAY_PARAMS = {"v": 10, "encoding": "json", "compress": "zlib-stream"}
+
+
+def gateway_url(url: str) -> str:
+    """
+    Adds the API version, encoding and transport compression parameters to a
+    gateway URL.
+    """
+    return f"{url.rstrip('/')}/?{urlencode(GATEWAY_PARAMS)}"
+
+
+class ZlibStreamInflator:
+    """
+    Decompresses a gateway connection opened with compress=zlib-stream.
+
+    The whole connection is one zlib stream, so a single decompression
+    context is kept for its lifetime: later messages refer back to data sent
+    in earlier ones. A message may span several websocket frames and is only
+    complete once a frame ends with the Z_SYNC_FLUSH suffix. Partial frames
+    are collected in one reused buffer; the common case of a message that
+    fits in one frame is decompressed straight from the frame, without
+    copying.
+
+    Attributes:
+        compressed_bytes (int): Bytes received over the connection.
+        inflated_bytes (int): Bytes of JSON they decompressed to.
+    """
+
+    def __init__(self):
+        self._inflator = zlib.decompressobj()
+        self._buffer = bytearray()
+        self.compressed_bytes = 0
+        self.inflated_bytes = 0
+
+    def feed(self, frame: Union[bytes, str]) -> Optional[Union[bytes, str]]:
+        """
+        Adds a websocket frame to the stream.
+
+        Returns:
+            The decompressed message once the frame completes one, None
+            while more frames are needed. Text frames are not compressed and
+            are returned as they are.
+        """
+        if isinstance(frame, str):
+            return frame
+
+        self.compressed_bytes += len(frame)
+        if not self._buffer and frame.endswith(ZLIB_SUFFIX):
+            message = self._inflator.decompress(frame)
+        else:
+            # the suffix itself may be split across frames
+            self._buffer += frame
+            if not self._buffer.endswith(ZLIB_SUFFIX):
+                return None
+            message = self._inflator.decompress(self._buffer)
+            self._buffer.clear()
+
+        self.inflated_bytes += len(message)
+        return message
+
+    def ratio(self) -> float:
+        """
+        Returns how many bytes of JSON each received byte carried.
+        """
+        if not self.compressed_bytes:
+            return 0.0
+        return self.inflated_bytes / self.compressed_bytes
@@ -0,0 +1,134 @@
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple, Union
+
+from igor.utils import op
+
+OP_PATTERN = re.compile(rb'"op":\s*(\d+)')
+TYPE_PATTERN = re.compile(rb'"t":\s*"([A-Z_]+)"')
+SEQUENCE_PATTERN = re.compile(rb'"s":\s*(\d+)')
+
+# dispatches the client itself needs, whatever the channels subscribe to
+ALWAYS_DECODE = frozenset({"READY", "RESUMED"})
+
+
+class Interest:
+    """
+    A kind of dispatch a channel wants to receive: an event type and,
+    optionally, a prefix the message content must start with (ignoring case).
+
+    Attributes:
+        event_type (str): The dispatch type, e.g. "MESSAGE_CREATE".
+        content_prefix (str): Required start of d.content, None for any.
+    """
+
+    __slots__ = ("event_type", "content_prefix", "_pattern")
+
+    def __init__(self, event_type: str, content_prefix: Optional[str] = None):
+        self.event_type = event_type
+        self.content_prefix = content_prefix.lower() if content_prefix else None
+        self._pattern = None
+        if self.content_prefix:
+            self._pattern = re.compile(
+                rb'"content":\s*"' + re.escape(self.content_prefix.encode()),
+                re.IGNORECASE,
+            )
+
+    def may_match(self, frame: bytes) -> bool:
+        """
+        Checks the raw frame without decoding it. Never rejects a frame
+        match() would accept, but may let through some it rejects, e.g.
+        when a quoted message starts with the prefix.
+        """
+        return self._pattern is None or self._pattern.search(frame) is not None
+
+    def match(self, data: dict) -> bool:
+        if self.content_prefix is None:
+            return True
+        content = data["d"].get("content") or ""
+        return content.lower().startswith(self.content_prefix)
+
+
+DEFAULT_INTERESTS = {"MESSAGE_CREATE": [Interest("MESSAGE_CREATE")]}
+
+
+class GatewayFilter:
+    """
+    Decides which gateway dispatches are worth decoding and queueing.
+
+    Frames are inspected with a few regular expressions before they are
+    decoded: dispatches no channel registered an interest in are skipped,
+    only their sequence number is extracted. Frames that can't be inspected
+    this way are always decoded, as are other opcodes and the dispatches the
+    client needs itself.
+
+    With no interests registered every MESSAGE_CREATE is kept.
+
+    Attributes:
+        skipped (int): Dispatches skipped without decoding.
+    """
+
+    def __init__(self):
+        self.interests: Dict[str, List[Interest]] = defaultdict(list)
+        self.skipped = 0
+
+    def add(self, event_type: str, content_prefix: Optional[str] = None) -> None:
+        self.interests[event_type].append(Interest(event_type, content_prefix))
+
+    def interest_list(self) -> List[Tuple[str, Optional[str]]]:
+        """
+        Returns the registered interests as (event_type, content_prefix)
+        pairs, e.g. to rebuild the filter in another process.
+        """
+        return [
+            (interest.event_type, interest.content_prefix)
+            for interests in self.interests.values()
+            for interest in interests
+        ]
+
+    def _interests_for(self, event_type: str) -> List[Interest]:
+        interests = self.interests or DEFAULT_INTERESTS
+        return interests.get(event_type, [])
+
+    def inspect(self, frame: Union[bytes, str]) -> Tuple[bool, Optional[int]]:
+        """
+        Looks at a raw frame.
+
+        Returns:
+            tuple: (skip, sequence). skip is True if the frame needn't be
+            decoded, sequence is then its sequence number.
+        """
+        if isinstance(frame, str):
+            frame = frame.encode()
+
+        # Discord sends op, s and t before d; only look there, so keys nested
+        # in d can't be mistaken for them. Frames laid out differently are
+        # simply decoded.
+        end = frame.find(b'"d":')
+        if end < 0:
+            end = len(frame)
+
+        opcode = OP_PATTERN.search(frame, 0, end)
+        if opcode is None or int(opcode.group(1)) != op.DISPATCH:
+            return False, None
+        event_type = TYPE_PATTERN.search(frame, 0, end)
+        sequence = SEQUENCE_PATTERN.search(frame, 0, end)
+        if event_type is None or sequence is None:
+            return False, None
+
+        name = event_type.group(1).decode()
+        if name in ALWAYS_DECODE:
+            return False, None
+        if any(interest.may_match(frame) for interest in self._interests_for(name)):
+            return False, None
+
+        self.skipped += 1
+        return True, int(sequence.group(1))
+
+    def accepts(self, data: dict) -> bool:
+        """
+        Checks a decoded dispatch against the registered interests.
+        """
+        return any(
+            interest.match(data) for interest in self._interests_for(data.get("t"))
+        )
@@ -0,0 +1,471 @@
+import asyncio
+import multiprocessing
+import random
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+import websockets
+
+from igor import codec
+from igor.external.discord_compression import ZlibStreamInflator, gateway_url
+from igor.external.discord_filter import GatewayFilter
+from igor.event_queue import EventQueue
+from igor.logging_config import get_logger, get_rate_limited_logger
+from igor.utils import op
+from igor.utils.stats import percentile as percentile_of
+
+logger = get_logger(__name__)
+frame_logger = get_rate_limited_logger(f"{__name__}.frames")
+
+# Discord allows one IDENTIFY per rate limit key every 5 seconds
+IDENTIFY_INTERVAL = 5.0
+
+# GUILDS and GUILD_MESSAGES
+DEFAULT_INTENTS = 1 << 0 | 1 << 9
+
+# heartbeat round trips kept for the latency percentiles
+LATENCY_WINDOW = 100
+
+# close codes after which reconnecting can't help (bad token, intents, ...)
+FATAL_CLOSE_CODES = frozenset({4004, 4010, 4011, 4012, 4013, 4014})
+# close codes after which the session can't be resumed
+SESSION_CLOSE_CODES = frozenset({4007, 4009})
+
+
+class GatewayReconnect(Exception):
+    """
+    Raised to drop the current connection and open a new one.
+
+    Attributes:
+        resumable (bool): Whether the session can be resumed.
+    """
+
+    def __init__(self, reason: str, resumable: bool):
+        super().__init__(reason)
+        self.resumable = resumable
+
+
+class IdentifyLimiter:
+    """
+    Spaces out the IDENTIFYs of the shards in this process. Shards share a
+    rate limit key when their ids are equal modulo max_concurrency; each key
+    may identify once every IDENTIFY_INTERVAL seconds.
+    """
+
+    def __init__(self, max_concurrency: int = 1, interval: float = IDENTIFY_INTERVAL):
+        self.max_concurrency = max_concurrency
+        self.interval = interval
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._last: Dict[int, float] = {}
+
+    async def wait(self, shard_id: int) -> None:
+        key = shard_id % self.max_concurrency
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            loop = asyncio.get_running_loop()
+            last = self._last.get(key)
+            if last is not None:
+                await asyncio.sleep(max(0.0, last + self.interval - loop.time()))
+            self._last[key] = loop.time()
+
+
+class SharedIdentifyLimiter:
+    """
+    IdentifyLimiter for shards spread over several processes: the time of
+    the last IDENTIFY per rate limit key lives in shared memory.
+    """
+
+    def __init__(self, max_concurrency: int = 1, interval: float = IDENTIFY_INTERVAL):
+        context = multiprocessing.get_context("spawn")
+        self.max_concurrency = max_concurrency
+        self.interval = interval
+        self.lock = context.Lock()
+        self.last = context.Array("d", max_concurrency, lock=False)
+
+    async def wait(self, shard_id: int) -> None:
+        await asyncio.to_thread(self._wait, shard_id % self.max_concurrency)
+
+    def _wait(self, key: int) -> None:
+        while True:
+            with self.lock:
+                now = time.time()
+                delay = self.last[key] + self.interval - now
+                if delay <= 0:
+                    self.last[key] = now
+                    return
+            time.sleep(delay)
+
+
+class GatewayShard:
+    """
+    One gateway connection. With sharding, Discord sends each connection the
+    events of the guilds where (guild_id >> 22) % shard_count == shard_id.
+
+    Every shard puts the dispatches its filter accepts on the same queue.
+
+    Attributes:
+        shard_id (int): This shard's id.
+        shard_count (int): The total number of shards.
+        state (str): "disconnected", "connecting", "identifying", "resuming"
+            or "ready".
+        latency (float): Seconds between the last heartbeat and its ACK.
+        latencies (deque): The last LATENCY_WINDOW heartbeat round trips.
+        missed_acks (int): Heartbeats that were never acknowledged.
+        reconnects (int): How often the connection was opened again.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        event_queue: EventQueue,
+        gateway_filter: Optional[GatewayFilter] = None,
+        shard_id: int = 0,
+        shard_count: int = 1,
+        identify_limiter=None,
+        intents: int = DEFAULT_INTENTS,
+    ):
+        self.token = token
+        self.event_queue = event_queue
+        self.gateway_filter = gateway_filter or GatewayFilter()
+        self.shard_id = shard_id
+        self.shard_count = shard_count
+        self.identify_limiter = identify_limiter or IdentifyLimiter()
+        self.intents = intents
+        self.sequence_number = None
+        self.heartbeat_interval = None
+        self.session_id = None
+        self.resume_gateway_url = None
+        self.websocket = None
+        self.inflator = None
+        self.state = "disconnected"
+        self.latency: Optional[float] = None
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.last_heartbeat_at: Optional[float] = None
+        self.heartbeat_acked = True
+        self.missed_acks = 0
+        self.connected_at: Optional[float] = None
+        self.reconnects = 0
+        self.gateway_url = None
+
+    async def connect(self, url: str):
+        """
+        Opens websocket connection. Once connected, the client receives a Hello
+        event that contains the heartbeat_interval. The heartbeat_interval is
+        the length of time in ms that determines how often to send a heartbeat
+        event in order to maintain the connection.
+
+        Keeps the shard connected: when the connection drops, turns out to be
+        a zombie or Discord asks for it, it reconnects right away and resumes
+        the session if it can, so no events are missed.
+        """
+        self.gateway_url = url
+        while True:
+            resuming = self.can_resume()
+            try:
+                self.state = "connecting"
+                async with self.open_gateway(
+                    self.resume_gateway_url if resuming else url
+                ) as self.websocket:
+                    hello_data = await self.recv()
+                    self.heartbeat_interval = hello_data["d"]["heartbeat_interval"]
+
+                    if resuming:
+                        self.state = "resuming"
+                        await self.resume()
+                    else:
+                        self.state = "identifying"
+                        await self.identify_limiter.wait(self.shard_id)
+                        await self.identify()
+
+                    try:
+                        await self.run_session()
+                    except GatewayReconnect as e:
+                        # closing with 1000 would end the session, any other
+                        # code keeps it resumable
+                        code = 4000 if e.resumable else 1000
+                        await self.websocket.close(code=code, reason=str(e))
+                        raise
+
+            except GatewayReconnect as e:
+                logger.info(f"Shard {self.shard_id} reconnecting: {e}")
+                self.state = "disconnected"
+                self.reconnects += 1
+                if not e.resumable:
+                    self.reset_session()
+
+            except websockets.ConnectionClosed as e:
+                code = e.rcvd.code if e.rcvd else None
+                logger.info(f"Shard {self.shard_id} connection closed ({code})")
+                self.state = "disconnected"
+                self.reconnects += 1
+                if code in FATAL_CLOSE_CODES:
+                    raise
+                if code in SESSION_CLOSE_CODES:
+                    self.reset_session()
+                await asyncio.sleep(1)
+
+            except Exception as e:
+                logger.warning(
+                    "Shard %s connection error: %s, reconnecting...", self.shard_id, e
+                )
+                self.state = "disconnected"
+                self.reconnects += 1
+                await asyncio.sleep(5)
+
+    async def run_session(self):
+        """
+        Runs the heartbeat and the receive loop until either fails, then
+        stops the other one.
+        """
+        tasks = [
+            asyncio.create_task(self.heartbeat()),
+            asyncio.create_task(self.receive()),
+        ]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        for task in done:
+            task.result()
+
+    async def receive(self):
+        """
+        Handles incoming messages until the connection fails or has to be
+        reopened.
+        """
+        while True:
+            frame = await self.recv_frame()
+            try:
+                await self.handle_frame(frame)
+            except GatewayReconnect:
+                raise
+            except Exception as e:
+                frame_logger.error(
+                    "Shard %s failed to handle a frame: %s", self.shard_id, e
+                )
+
+    async def handle_frame(self, frame):
+        skip, sequence = self.gateway_filter.inspect(frame)
+        if skip:
+            self.sequence_number = sequence or self.sequence_number
+            return
+
+        data = codec.loads(frame)
+        opcode = data["op"]
+        self.sequence_number = data.get("s") or self.sequence_number
+
+        if opcode == op.HEARTBEAT:
+            # Discord asks for a heartbeat right away
+            await self.send_heartbeat()
+        elif opcode == op.HEARTBEAT_ACK:
+            self.acknowledge_heartbeat()
+        elif opcode == op.DISPATCH:
+            event_type = data.get("t")
+            if event_type in ("READY", "RESUMED"):
+                self.state = "ready"
+                self.connected_at = time.time()
+            if event_type == "READY":
+                self.resume_gateway_url = data["d"].get("resume_gateway_url")
+                self.session_id = data["d"].get("session_id")
+            if self.gateway_filter.accepts(data):
+                await self.event_queue.put(data)
+        elif opcode == op.RECONNECT:
+            raise GatewayReconnect("Discord requested a reconnect", resumable=True)
+        elif opcode == op.INVALID_SESSION:
+            # d tells whether the session can be resumed; Discord asks to wait
+            # 1-5 seconds before identifying again
+            if not data.get("d"):
+                await asyncio.sleep(random.uniform(1, 5))
+            raise GatewayReconnect("invalid session", resumable=bool(data.get("d")))
+
+    def open_gateway(self, url):
+        """
+        Connects to the gateway with zlib-stream transport compression. Each
+        connection is one zlib stream, so it gets a fresh decompression
+        context. Per-message deflate is turned off, it would only compress
+        the data a second time.
+        """
+        self.inflator = ZlibStreamInflator()
+        return websockets.connect(gateway_url(url), compression=None, close_timeout=1)
+
+    async def recv(self):
+        """
+        Receives and decodes the next complete gateway message.
+        """
+        return codec.loads(await self.recv_frame())
+
+    async def recv_frame(self):
+        """
+        Receives the next complete gateway message, decompressing and joining
+        the frames it was sent in, without decoding it.
+        """
+        while True:
+            message = self.inflator.feed(await self.websocket.recv())
+            if message is not None:
+                return message
+
+    async def send(self, opcode, payload=None):
+        """
+        Utility function to send data via websocket
+        """
+        if payload is None:
+            payload = {}
+
+        data = self.opcode(opcode, payload)
+        await self.websocket.send(data)
+
+    def opcode(self, opcode, payload):
+        data = {"op": opcode, "d": payload}
+        return codec.dumps(data).decode()
+
+    async def heartbeat(self):
+        """
+        Sends heartbeat event at intervals determined by heartbeat_interval.
+        The heartbeat event consists of opcode 1 and the last sequence number
+        recieved in the "d" field.
+
+        The first heartbeat is sent after a random fraction of the interval,
+        as the protocol requires. If the previous heartbeat wasn't
+        acknowledged by the time the next one is due, the connection is a
+        zombie: it raises GatewayReconnect so the shard resumes on a new one.
+        """
+        if self.heartbeat_interval is None:
+            logger.warning("Shard %s heartbeat interval not set", self.shard_id)
+            return None
+
+        interval = self.heartbeat_interval / 1000
+        self.heartbeat_acked = True
+        await asyncio.sleep(interval * random.random())
+        while True:
+            if not self.heartbeat_acked:
+                self.missed_acks += 1
+                raise GatewayReconnect("heartbeat not acknowledged", resumable=True)
+            await self.send_heartbeat()
+            await asyncio.sleep(interval)
+
+    async def send_heartbeat(self):
+        self.heartbeat_acked = False
+        self.last_heartbeat_at = time.monotonic()
+        await self.send(op.HEARTBEAT, self.sequence_number)
+
+    def acknowledge_heartbeat(self):
+        self.heartbeat_acked = True
+        if self.last_heartbeat_at is not None:
+            self.latency = time.monotonic() - self.last_heartbeat_at
+            self.latencies.append(self.latency)
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        """
+        Returns a percentile (0-100) of the recent heartbeat round trips, in
+        seconds, or None before the first ACK.
+        """
+        return percentile_of(sorted(self.latencies), percentile)
+
+    async def identify(self):
+        event = {
+            "token": self.token,
+            "intents": self.intents,
+            "shard": [self.shard_id, self.shard_count],
+            "properties": {
+                "os": "macos",
+                "browser": "safari",
+                "device": "my_library",
+            },
+        }
+
+        await self.send(op.IDENTIFY, event)
+
+    def can_resume(self) -> bool:
+        return bool(self.resume_gateway_url and self.session_id)
+
+    def reset_session(self):
+        self.session_id = None
+        self.resume_gateway_url = None
+        self.sequence_number = None
+
+    async def resume(self):
+        await self.send(
+            op.RESUME,
+            {
+                "token": self.token,
+                "session_id": self.session_id,
+                "seq": self.sequence_number,
+            },
+        )
+
+    def health(self) -> dict:
+        return {
+            "shard_id": self.shard_id,
+            "state": self.state,
+            "latency": self.latency,
+            "latency_p50": self.latency_percentile(50),
+            "latency_p99": self.latency_percentile(99),
+            "missed_acks": self.missed_acks,
+            "sequence": self.sequence_number,
+            "reconnects": self.reconnects,
+            "connected_at": self.connected_at,
+        }
+
+
+def shards_for_process(shard_count: int, processes: int, index: int) -> List[int]:
+    """
+    Returns the ids of the shards the index-th of processes worker processes
+    runs, spreading them evenly.
+    """
+    return list(range(index, shard_count, processes))
+
+
+def run_shard_process(
+    token: str,
+    url: str,
+    shard_ids: List[int],
+    shard_count: int,
+    interests: list,
+    identify_limiter: SharedIdentifyLimiter,
+    out_queue,
+    health_interval: float = 5.0,
+) -> None:
+    """
+    Entry point of a worker process running some of the shards. Accepted
+    dispatches are sent to the parent as ("event", data) on out_queue, and
+    every health_interval seconds the shards' health as ("health", list).
+    """
+
+    async def main():
+        event_queue = asyncio.Queue()
+        gateway_filter = GatewayFilter()
+        for event_type, content_prefix in interests:
+            gateway_filter.add(event_type, content_prefix)
+
+        shards = [
+            GatewayShard(
+                token,
+                event_queue,
+                gateway_filter,
+                shard_id,
+                shard_count,
+                identify_limiter,
+            )
+            for shard_id in shard_ids
+        ]
+
+        async def forward_events():
+            while True:
+                out_queue.put(("event", await event_queue.get()))
+
+        async def report_health():
+            while True:
+                out_queue.put(("health", [shard.health() for shard in shards]))
+                await asyncio.sleep(health_interval)
+
+        await asyncio.gather(
+            forward_events(),
+            report_health(),
+            *(shard.connect(url) for shard in shards),
+        )
+
+    asyncio.run(main())
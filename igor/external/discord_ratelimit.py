@@ -0,0 +1,231 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Mapping, Optional, Tuple
+from igor.client import HttpResponse
+from igor.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# path segments whose id is a "major parameter": Discord gives every
+# channel/guild/webhook its own copy of a route's bucket
+MAJOR_PARAMETERS = ("channels", "guilds", "webhooks")
+
+
+def route_key(method: str, path: str) -> str:
+    """
+    Returns the route a request belongs to, with every id that isn't a major
+    parameter replaced by a placeholder, e.g.
+    "DELETE channels/1/messages/{id}".
+    """
+    parts = path.strip("/").split("/")
+    route = [
+        (
+            "{id}"
+            if part.isdigit() and (i == 0 or parts[i - 1] not in MAJOR_PARAMETERS)
+            else part
+        )
+        for i, part in enumerate(parts)
+    ]
+    return f"{method.upper()} {'/'.join(route)}"
+
+
+def major_parameters(path: str) -> Tuple[str, ...]:
+    parts = path.strip("/").split("/")
+    return tuple(
+        parts[i + 1] for i, part in enumerate(parts[:-1]) if part in MAJOR_PARAMETERS
+    )
+
+
+class Bucket:
+    """
+    Rate limit state of one Discord bucket.
+
+    Until the first response reveals the bucket's limit, requests go out one
+    at a time. After that, requests are sent concurrently while the bucket
+    has remaining capacity, and wait for the reset otherwise. Remaining
+    capacity is counted locally, minus requests still in flight, so bursts
+    never exceed what Discord reported.
+    """
+
+    def __init__(self):
+        self.limit: Optional[int] = None
+        self.remaining = 1
+        self.reset_at = 0.0
+        self.inflight = 0
+        self._changed = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        async with self._changed:
+            while True:
+                now = loop.time()
+                if self.remaining <= 0 and now >= self.reset_at:
+                    # a bucket whose limit is still unknown (e.g. after a 429
+                    # with only Retry-After) goes back to probing one request
+                    # at a time
+                    limit = self.limit if self.limit is not None else 1
+                    self.remaining = max(0, limit - self.inflight)
+
+                if self.remaining > 0:
+                    self.remaining -= 1
+                    self.inflight += 1
+                    return
+
+                timeout = self.reset_at - now if self.reset_at > now else None
+                try:
+                    await asyncio.wait_for(self._changed.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def release(self, headers: Mapping[str, str], status: int) -> None:
+        loop = asyncio.get_running_loop()
+        async with self._changed:
+            self.inflight -= 1
+            limit = headers.get("X-RateLimit-Limit")
+            remaining = headers.get("X-RateLimit-Remaining")
+            reset_after = headers.get("X-RateLimit-Reset-After")
+
+            if limit is not None and remaining is not None and reset_after is not None:
+                self.limit = int(limit)
+                self.remaining = max(0, int(remaining) - self.inflight)
+                self.reset_at = loop.time() + float(reset_after)
+            elif self.limit is None:
+                # no rate limit information, let the next request probe
+                self.remaining += 1
+
+            if status == 429 and headers.get("X-RateLimit-Global") is None:
+                self.remaining = 0
+                self.reset_at = max(self.reset_at, loop.time() + retry_after(headers))
+
+            self._changed.notify_all()
+
+    async def cancel(self) -> None:
+        """
+        Gives back the capacity taken by a request that got no response.
+        """
+        async with self._changed:
+            self.inflight -= 1
+            self.remaining += 1
+            if self.limit is not None:
+                self.remaining = min(self.remaining, self.limit - self.inflight)
+            self._changed.notify_all()
+
+
+class GlobalLimiter:
+    """
+    Token bucket for Discord's global limit on requests per second.
+    """
+
+    def __init__(self, rate: float = 50):
+        self.rate = rate
+        self.tokens = rate
+        self.updated_at: Optional[float] = None
+        self.blocked_until = 0.0
+
+    async def acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            if self.updated_at is not None:
+                elapsed = now - self.updated_at
+                self.tokens = min(self.rate, self.tokens + elapsed * self.rate)
+            self.updated_at = now
+
+            if now < self.blocked_until:
+                await asyncio.sleep(self.blocked_until - now)
+            elif self.tokens >= 1:
+                self.tokens -= 1
+                return
+            else:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def block(self, seconds: float) -> None:
+        loop = asyncio.get_running_loop()
+        self.blocked_until = max(self.blocked_until, loop.time() + seconds)
+
+
+def retry_after(headers: Mapping[str, str]) -> float:
+    value = headers.get("Retry-After") or headers.get("X-RateLimit-Reset-After")
+    return float(value) if value is not None else 1.0
+
+
+class RateLimiter:
+    """
+    Outbound scheduler for Discord REST calls.
+
+    Requests are queued per bucket: routes are mapped to Discord's bucket
+    hash (X-RateLimit-Bucket) as soon as a response reveals it, so routes
+    that share a bucket also share its limit. Every request also takes a
+    token from the global limiter. Limits are honored before sending, so
+    429s only happen when Discord's limits change under us; those requests
+    are retried after Retry-After instead of being lost.
+
+    Attributes:
+        global_limiter (GlobalLimiter): The global requests-per-second limit.
+        max_retries (int): How often a request is retried after a 429.
+    """
+
+    def __init__(self, global_rate: float = 50, max_retries: int = 3):
+        self.global_limiter = GlobalLimiter(global_rate)
+        self.max_retries = max_retries
+        self._hashes: Dict[str, str] = {}
+        self._buckets: Dict[Hashable, Bucket] = {}
+
+    def bucket(self, method: str, path: str) -> Bucket:
+        route = route_key(method, path)
+        bucket_hash = self._hashes.get(route)
+        key = (bucket_hash, major_parameters(path)) if bucket_hash else route
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = Bucket()
+        return bucket
+
+    def learn(self, method: str, path: str, bucket: Bucket, headers) -> None:
+        """
+        Records the bucket hash Discord reported for a route, so later
+        requests on any route with that hash share the bucket.
+        """
+        bucket_hash = headers.get("X-RateLimit-Bucket")
+        route = route_key(method, path)
+        if bucket_hash is None or self._hashes.get(route) == bucket_hash:
+            return
+
+        self._hashes[route] = bucket_hash
+        self._buckets.setdefault((bucket_hash, major_parameters(path)), bucket)
+
+    async def request(
+        self, method: str, path: str, send: Callable[[], Awaitable[HttpResponse]]
+    ) -> HttpResponse:
+        """
+        Sends a request through its bucket and the global limit.
+
+        Args:
+            method (str): The HTTP method.
+            path (str): The API path, e.g. "channels/123/messages".
+            send (Callable): Coroutine function performing the request.
+        """
+        attempt = 0
+        while True:
+            bucket = self.bucket(method, path)
+            await bucket.acquire()
+            try:
+                await self.global_limiter.acquire()
+                response = await send()
+            except BaseException:
+                await bucket.cancel()
+                raise
+
+            await bucket.release(response.headers, response.status)
+            self.learn(method, path, bucket, response.headers)
+
+            if response.status != 429 or attempt >= self.max_retries:
+                return response
+
+            attempt += 1
+            delay = retry_after(response.headers)
+            if response.headers.get("X-RateLimit-Global") is not None:
+                self.global_limiter.block(delay)
+            logger.warning(
+                f"Rate limited on {method} {path}, retrying in {delay}s "
+                f"(attempt {attempt})"
+            )
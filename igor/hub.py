@@ -1,12 +1,57 @@
 import os
+import time
 import asyncio
+import inspect
 from igor.response import Response
 from igor.event import Event
-from igor.logging_config import get_logger
+from igor.logging_config import get_logger, get_rate_limited_logger
+from igor.router import Router
+from igor.event_queue import EventQueue
+from igor.dispatcher import LaneDispatcher
+from igor.executors import Executors, THREAD, PROCESS, handle_in_process
+from igor.registry import PluginRegistry, LazyReactor
+from igor.client import HttpClient, set_client
+from igor.metrics import REGISTRY, MetricsServer
+from igor.tracing import Tracer, get_tracer, set_tracer, tracer_from_config
 
 import toml
 
 logger = get_logger(__name__)
+# for messages about single events, which would flood the logs under load
+event_logger = get_rate_limited_logger(f"{__name__}.events")
+
+
+EVENTS = REGISTRY.counter(
+    "igor_events_total", "Events processed by the hub.", ("channel",)
+)
+UNHANDLED = REGISTRY.counter(
+    "igor_events_unhandled_total", "Events no reactor responded to.", ("channel",)
+)
+EVENT_SECONDS = REGISTRY.histogram(
+    "igor_event_duration_seconds",
+    "Time from processing an event to handing its response to the channel.",
+    ("channel",),
+)
+REACTOR_SECONDS = REGISTRY.histogram(
+    "igor_reactor_duration_seconds",
+    "Time reactors take to handle an event.",
+    ("reactor",),
+)
+REACTOR_ERRORS = REGISTRY.counter(
+    "igor_reactor_errors_total", "Exceptions raised by reactors.", ("reactor",)
+)
+QUEUE_DEPTH = REGISTRY.gauge(
+    "igor_queue_depth", "Events submitted to the hub and not processed yet."
+)
+QUEUE_SHED = REGISTRY.counter(
+    "igor_queue_shed_total",
+    "Events the hub's queue dropped or rejected because it was full.",
+)
+QUEUE_WAIT = REGISTRY.gauge(
+    "igor_queue_wait_p99_seconds",
+    "99th percentile of the time recent events waited in their lane to be "
+    "processed.",
+)
 
 
 class Hub:
@@ -19,10 +64,92 @@ class Hub:
     def __init__(self, config_file: str) -> None:
         self.config = self.load_config(config_file)
         self.channels = {}
-        self.reactors = []
+        self.router = Router()
+        self.registry = PluginRegistry()
         self.shutdown_event = asyncio.Event()
         self.tasks = []
 
+        hub_config = self.config.get("hub", {})
+        self.workers = hub_config.get("workers", 16)
+        self.setup_timeout = hub_config.get("setup_timeout", 30)
+        self.teardown_timeout = hub_config.get("teardown_timeout", 10)
+        self.setups = {}
+        self.http = HttpClient(**self.config.get("http", {}))
+        self.queue = EventQueue(
+            maxsize=hub_config.get("queue_size", 256),
+            overflow=hub_config.get("overflow", "block"),
+        )
+        self.lanes = LaneDispatcher(
+            lanes=self.workers, capacity=hub_config.get("queue_size", 256)
+        )
+        self.executors = Executors(
+            thread_workers=hub_config.get("thread_workers"),
+            process_workers=hub_config.get("process_workers"),
+        )
+
+        # metric children bound per channel and per reactor, so recording an
+        # event is a dict lookup and a few additions
+        self.channel_metrics = {}
+        self.reactor_metrics = {}
+        REGISTRY.add_collector(self.collect_metrics)
+        self.tracer = Tracer()
+        metrics_config = self.config.get("metrics", {})
+        self.metrics_server = None
+        if metrics_config.get("port") is not None:
+            self.metrics_server = MetricsServer(
+                REGISTRY,
+                metrics_config.get("host", "127.0.0.1"),
+                metrics_config["port"],
+            )
+
+    @property
+    def reactors(self) -> list:
+        """
+        The registered reactors, in the order they were registered.
+        """
+        return self.router.reactors
+
+    @reactors.setter
+    def reactors(self, reactors: list) -> None:
+        self.router = Router(reactors)
+
+    def register_reactor(self, reactor) -> None:
+        """
+        Adds a reactor to the hub and indexes its triggers for routing.
+        """
+        self.router.add(reactor)
+        if isinstance(reactor, LazyReactor):
+            self.bind_reactor_metrics(reactor.class_name)
+        else:
+            self.bind_reactor_metrics(type(reactor).__name__)
+
+    def bind_channel_metrics(self, channel_name: str) -> tuple:
+        metrics = (
+            EVENTS.labels(channel_name),
+            UNHANDLED.labels(channel_name),
+            EVENT_SECONDS.labels(channel_name),
+        )
+        self.channel_metrics[channel_name] = metrics
+        return metrics
+
+    def bind_reactor_metrics(self, reactor_name: str) -> tuple:
+        metrics = (
+            REACTOR_SECONDS.labels(reactor_name),
+            REACTOR_ERRORS.labels(reactor_name),
+        )
+        self.reactor_metrics[reactor_name] = metrics
+        return metrics
+
+    def collect_metrics(self) -> None:
+        """
+        Copies the queue's state into the metrics when they are scraped.
+        """
+        QUEUE_DEPTH.labels().set(self.queue.qsize() + len(self.lanes))
+        QUEUE_SHED.labels().set_total(self.queue.dropped + self.queue.rejected)
+        wait = self.lanes.wait_percentile(99)
+        if wait is not None:
+            QUEUE_WAIT.labels().set(wait)
+
     def load_config(self, path: str) -> dict:
         with open(path, "r", encoding="utf-8") as config_file:
             config = toml.load(config_file)
@@ -39,19 +166,58 @@ class Hub:
         """
         Kicks off the initialization of the channels and reactors
 
-        Iterates over all the channels registered with the hub and puts them in
-        listening mode.
+        Starts the worker that processes submitted events, then runs the setup
+        of every channel and reactor concurrently. Each channel starts
+        listening as soon as its own setup is done; events that need a
+        reactor still being set up wait for that reactor only.
         """
         self.initialize_channels()
         self.initialize_reactors()
+        self.registry.report()
+
+        await self.http.open()
+        set_client(self.http)
+        if self.metrics_server is not None:
+            await self.metrics_server.start()
+        self.tracer = tracer_from_config(self.config.get("tracing", {}))
+        set_tracer(self.tracer)
+
+        self.tasks.append(asyncio.create_task(self.worker()))
 
-        for channel in self.channels.values():
-            self.tasks.append(asyncio.create_task(channel.start_listening()))
+        self.start_reactors()
+
+        for channel_name, channel in self.channels.items():
+            self.tasks.append(
+                asyncio.create_task(self.start_channel(channel_name, channel))
+            )
 
         await self.shutdown_event.wait()
 
         await asyncio.gather(*self.tasks, return_exceptions=True)
 
+        await self.teardown()
+        self.executors.shutdown()
+
+    def start_reactors(self) -> None:
+        """
+        Starts the setup of every reactor that was imported at startup, and
+        of the lazy reactors configured with preload, which are imported in
+        the background first.
+        """
+        for reactor in self.reactors:
+            if not isinstance(reactor, LazyReactor):
+                self.setup_reactor(reactor)
+            elif reactor.preload:
+                self.tasks.append(asyncio.create_task(self.preload_reactor(reactor)))
+
+    async def preload_reactor(self, lazy: LazyReactor) -> None:
+        try:
+            reactor = await lazy.resolve()
+        except Exception as e:
+            logger.error(f"{lazy.class_name} preload failed: {e}", exc_info=True)
+            return
+        self.setup_reactor(reactor)
+
     def signal_shutdown(self):
         """
         Signal the shutdown event to stop all channels.
@@ -60,13 +226,95 @@ class Hub:
 
         for task in self.tasks:
             task.cancel()
+        self.lanes.close()
 
-    def get_class_by_name(self, type, class_name: str):
-        module = __import__(f"{type}.{class_name.lower()}", fromlist=[class_name])
+    async def start_channel(self, channel_name: str, channel) -> None:
+        """
+        Sets the channel up and puts it in listening mode.
+        """
+        if await self.run_setup(channel_name, channel):
+            await channel.start_listening()
+
+    def setup_reactor(self, reactor) -> asyncio.Task:
+        """
+        Starts the reactor's setup in the background, once.
+
+        Returns:
+            asyncio.Task: Resolves to True once the reactor is ready, or False
+            if its setup failed or timed out.
+        """
+        task = self.setups.get(reactor)
+        if task is None:
+            name = reactor.__class__.__name__
+            task = asyncio.create_task(self.run_setup(name, reactor))
+            self.setups[reactor] = task
+        return task
+
+    async def run_setup(self, name: str, component) -> bool:
+        """
+        Runs a channel's or reactor's setup() with its timeout (the
+        component's setup_timeout, or the hub's default).
+
+        Returns:
+            bool: True if the component is ready to be used.
+        """
+        timeout = getattr(component, "setup_timeout", None)
+        if not isinstance(timeout, (int, float)):
+            timeout = self.setup_timeout
+
+        start = time.perf_counter()
         try:
-            return getattr(module, class_name)
-        except AttributeError as e:
-            logger.error(f"Error getting class by name: {e}")
+            result = component.setup()
+            if inspect.isawaitable(result):
+                await asyncio.wait_for(result, timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"{name} setup timed out after {timeout}s")
+            return False
+        except Exception as e:
+            logger.error(f"{name} setup failed: {e}", exc_info=True)
+            return False
+
+        logger.info(f"{name} ready in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return True
+
+    async def teardown(self) -> None:
+        """
+        Flushes the channels' outgoing responses, then tears down every channel
+        and every reactor that was set up. Teardowns run concurrently, each
+        limited by the hub's teardown timeout. The shared HTTP client is
+        closed last.
+        """
+        # send the responses still buffered while the channels are up
+        await asyncio.gather(
+            *(channel.flush() for channel in self.channels.values()),
+            return_exceptions=True,
+        )
+
+        components = list(self.channels.values()) + list(self.setups)
+        results = await asyncio.gather(
+            *(self.run_teardown(component) for component in components),
+            return_exceptions=True,
+        )
+        for component, result in zip(components, results):
+            if isinstance(result, BaseException):
+                logger.error(
+                    f"{component.__class__.__name__} teardown failed: {result}"
+                )
+
+        if self.metrics_server is not None:
+            await self.metrics_server.stop()
+        self.tracer.close()
+        set_tracer(None)
+        # close the shared HTTP client last, teardowns may still use it
+        await self.http.close()
+
+    async def run_teardown(self, component) -> None:
+        result = component.teardown()
+        if inspect.isawaitable(result):
+            await asyncio.wait_for(result, self.teardown_timeout)
+
+    def get_class_by_name(self, type, class_name: str):
+        return self.registry.load_class(type, class_name)
 
     def initialize_channels(self) -> None:
         if "channels" in self.config:
@@ -78,34 +326,169 @@ class Hub:
                     del channel_config["class"]
                     channel = ChannelClass(self, **channel_config)
                     self.channels[channel_name] = channel
+                    self.bind_channel_metrics(channel_name)
                 logger.info(f"initialized {channel_name.capitalize()} channel")
 
     def initialize_reactors(self) -> None:
+        """
+        Registers the configured reactors. Reactors whose config lists their
+        triggers are registered as LazyReactor placeholders and only imported
+        when the first event for them arrives, or in the background at
+        startup with preload; those triggers replace the class's own for
+        routing. The others, including those with an empty
+        triggers list, are imported now and routed by the class's triggers or
+        can_handle(), since the hub needs them to decide which events they
+        handle.
+        """
         if "reactors" in self.config:
             for _, reactor_config in self.config["reactors"].items():
+                if reactor_config.get("triggers"):
+                    reactor = LazyReactor(
+                        self,
+                        reactor_config["class"],
+                        reactor_config["triggers"],
+                        reactor_config.get("event_types", ("message",)),
+                        reactor_config.get("preload", False),
+                    )
+                    self.register_reactor(reactor)
+                    logger.info(f"registered {reactor_config["class"]} reactor")
+                    continue
+
                 ReactorClass = self.get_class_by_name(
                     "reactors", reactor_config["class"]
                 )
                 if ReactorClass:
                     reactor = ReactorClass(self)
-                    self.reactors.append(reactor)
+                    self.register_reactor(reactor)
                 logger.info(f"initialized {reactor_config["class"]} reactor")
 
+    async def submit(self, event: Event) -> bool:
+        """
+        Queues an event for processing by the hub's workers. Channels should
+        use this instead of awaiting process_event, so they can go back to
+        listening while reactors run.
+
+        When the queue is full the configured overflow policy applies: "block"
+        waits for a free slot, "drop_oldest" discards the oldest queued event
+        and "reject" refuses the new one.
+
+        Returns:
+            bool: True if the event was queued, False if it was rejected.
+        """
+        queued = await self.queue.put(event)
+        if not queued:
+            event_logger.warning("Event queue full, rejected event: %s", event)
+        return queued
+
+    async def worker(self):
+        """
+        Takes events off the queue and hands them to their conversation's lane
+        until cancelled. Events from the same conversation are processed in
+        the order they were submitted; different conversations are processed
+        in parallel, and a busy conversation never holds up the others.
+        """
+        while True:
+            event = await self.queue.get()
+            await self.lanes.submit(event, self.process_queued_event)
+
+    async def process_queued_event(self, event: Event):
+        try:
+            await self.process_event(event)
+        except Exception as e:
+            logger.error(f"Error processing event {event}: {e}", exc_info=True)
+        finally:
+            self.queue.task_done()
+
+    async def drain(self):
+        """
+        Waits until every submitted event has been processed.
+        """
+        await self.queue.join()
+
     async def process_event(self, event: Event):
         """
         Processes events sent from channels. It checks if any reactors should
         react to the event, and if so, kicks off sending the event and response
         to the appropriate channel
         """
-        logger.info(f"Processing event: {event}")
-        for reactor in self.reactors:
-            if reactor.can_handle(event):
-                logger.info(f"Reactor {reactor.__class__.__name__} handling event")
-                response = await reactor.handle(event)
-                if response:
-                    await self.send_channel_response(event, response)
-                    return  # Stop after first matching reactor
-        logger.warning(f"No reactor found to handle event: {event}")
+        events, unhandled, seconds = self.channel_metrics.get(
+            event.channel
+        ) or self.bind_channel_metrics(event.channel)
+        events.inc()
+        start = time.perf_counter()
+        trace = event.trace
+        if trace is not None:
+            # from the channel creating the event to a worker picking it up
+            trace.add_span("hub.queue", trace.start, start)
+        responded = False
+        try:
+            logger.debug("Processing event: %s", event)
+            for reactor, matched in self.router.match(event):
+                if matched or reactor.can_handle(event):
+                    # the reactor's arguments follow the trigger it matched
+                    event.args = event.args_after(matched)
+                    if isinstance(reactor, LazyReactor):
+                        reactor = await reactor.resolve()
+                    if not await asyncio.shield(self.setup_reactor(reactor)):
+                        continue
+                    logger.debug("Reactor %s handling event", type(reactor).__name__)
+                    response = await self.run_reactor(reactor, event)
+                    if response:
+                        responded = True
+                        await self.send_channel_response(event, response)
+                        return  # Stop after first matching reactor
+            event_logger.warning("No reactor found to handle event: %s", event)
+            unhandled.inc()
+        finally:
+            end = time.perf_counter()
+            seconds.observe(end - start)
+            if not responded and event.channel in self.channels:
+                self.channels[event.channel].unanswered(event)
+            if trace is not None:
+                trace.add_span("hub.process", start, end)
+                # traces of answered events are finished once the response
+                # is sent
+                if not responded:
+                    get_tracer().finish(trace)
+
+    async def run_reactor(self, reactor, event: Event):
+        """
+        Runs the reactor's handle() according to its execution mode: on the
+        event loop for "async" (sync handlers are simply called), or in the
+        hub's thread or process pool for "thread" and "process".
+        """
+        name = type(reactor).__name__
+        latency, errors = self.reactor_metrics.get(name) or self.bind_reactor_metrics(
+            name
+        )
+        start = time.perf_counter()
+        error = None
+        try:
+            mode = getattr(reactor, "execution", None)
+            if mode == THREAD:
+                return await self.executors.run(THREAD, reactor.handle, event)
+            if mode == PROCESS:
+                return await self.executors.run(
+                    PROCESS, handle_in_process, type(reactor), event
+                )
+
+            response = reactor.handle(event)
+            if inspect.isawaitable(response):
+                response = await response
+            return response
+        except Exception as e:
+            errors.inc()
+            error = repr(e)
+            raise
+        finally:
+            end = time.perf_counter()
+            latency.observe(end - start)
+            trace = getattr(event, "trace", None)
+            if trace is not None:
+                attributes = {"reactor": name}
+                if error is not None:
+                    attributes["error"] = error
+                trace.add_span("reactor", start, end, attributes)
 
     async def send_channel_response(self, event: Event, response: Response):
         """
@@ -114,6 +497,8 @@ class Hub:
         channel_name = event.channel
         if channel_name in self.channels:
             channel = self.channels[channel_name]
-            await channel.send_response(event, response)
+            await channel.deliver(event, response)
         else:
-            logger.warning(f"Channel {channel_name} not found")
+            event_logger.warning("Channel %s not found", channel_name)
+            if event.trace is not None:
+                get_tracer().finish(event.trace)
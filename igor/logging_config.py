@@ -1,7 +1,11 @@
+import atexit
 import logging
 import logging.config
 import os
+import queue
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Tuple
 
 # determine environment
 ENV = os.environ.get("IGOR_ENV", "development")
@@ -45,11 +49,97 @@ elif ENV == "production":
 # add handlers for AWS cloudwatch and error emails
 
 
+class RateLimitFilter(logging.Filter):
+    """
+    Lets through at most `rate` records per `per` seconds from each call
+    site, so messages logged for every event can't flood the logs under
+    load. The next record let through from a call site says how many were
+    suppressed since the last one.
+
+    Attributes:
+        rate (int): Records let through per period and call site.
+        per (float): The period, in seconds.
+    """
+
+    def __init__(self, rate: int = 10, per: float = 1.0):
+        super().__init__()
+        self.rate = rate
+        self.per = per
+        # (pathname, lineno): [period start, records let through, suppressed]
+        self.sites: Dict[Tuple[str, int], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.pathname, record.lineno)
+        site = self.sites.get(key)
+        if site is None:
+            site = self.sites[key] = [record.created, 0, 0]
+        elif record.created - site[0] >= self.per:
+            site[0] = record.created
+            site[1] = 0
+
+        if site[1] >= self.rate:
+            site[2] += 1
+            return False
+
+        site[1] += 1
+        if site[2]:
+            record.msg = f"{record.msg} ({site[2]} similar messages suppressed)"
+            site[2] = 0
+        return True
+
+
+_listener: Optional[QueueListener] = None
+
+
 def setup_logging():
+    """
+    Configures logging for the environment. Records are put on a queue by
+    the handler attached to the root logger and written out by a listener
+    thread, so slow streams and disk I/O never block the event loop.
+    Calling it again stops the running listener and replaces it.
+    """
+    global _listener
+    # writes out what the old listener still has queued before dictConfig
+    # closes its handlers
+    stop_logging()
     logging.config.dictConfig(BASE_CONFIG)
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    for handler in handlers:
+        root.removeHandler(handler)
+
+    log_queue = queue.SimpleQueue()
+    root.addHandler(QueueHandler(log_queue))
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    # registered once, however often logging is set up
+    atexit.unregister(stop_logging)
+    atexit.register(stop_logging)
+
     logger = logging.getLogger(__name__)
-    logger.info(f"Logger set up in {ENV} environment")
+    logger.info("Logger set up in %s environment", ENV)
+
+
+def stop_logging():
+    """
+    Writes out the records still queued and stops the listener thread.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
 
 def get_logger(name):
     return logging.getLogger(name)
+
+
+def get_rate_limited_logger(name, rate: int = 10, per: float = 1.0):
+    """
+    Returns a logger whose records are rate limited per call site, see
+    RateLimitFilter. Meant for messages logged for every event.
+    """
+    logger = logging.getLogger(name)
+    if not any(isinstance(f, RateLimitFilter) for f in logger.filters):
+        logger.addFilter(RateLimitFilter(rate, per))
+    return logger
@@ -0,0 +1,314 @@
+import inspect
+from abc import ABC, abstractmethod
+import math
+import weakref
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+from aiohttp import web
+from igor.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# seconds; most reactors answer in a few milliseconds, the ones calling
+# other services in up to a few seconds
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class CounterChild:
+    """
+    One labelled series of a counter.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def set_total(self, value: float) -> None:
+        """
+        Sets the total, for counts kept by another object and copied in by a
+        collector at scrape time.
+        """
+        self.value = value
+
+    def samples(self, name: str, labels: str):
+        yield name, labels, self.value
+
+
+class GaugeChild:
+    """
+    One labelled series of a gauge.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def samples(self, name: str, labels: str):
+        yield name, labels, self.value
+
+
+class HistogramChild:
+    """
+    One labelled series of a histogram. Bucket counts are kept per bucket
+    and only made cumulative when rendered, so observe() is a bisect and two
+    additions.
+    """
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # the last slot counts observations above the highest bound
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def samples(self, name: str, labels: str):
+        separator = "," if labels else ""
+        total = 0
+        for bound, count in zip(self.bounds + (math.inf,), self.counts):
+            total += count
+            bucket_labels = f'{labels}{separator}le="{format_value(bound)}"'
+            yield f"{name}_bucket", bucket_labels, total
+        yield f"{name}_sum", labels, self.sum
+        yield f"{name}_count", labels, total
+
+
+class Metric(ABC):
+    """
+    A named metric with a fixed set of label names and one child series per
+    combination of label values.
+
+    Children should be bound once with labels() and kept, e.g. per channel
+    or reactor when it is registered, so recording a value on the hot path
+    is a single method call.
+
+    Attributes:
+        name (str): The metric name, e.g. "igor_events_total".
+        help (str): The description shown in the exposition.
+        labelnames (tuple): The label names.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.children: Dict[Tuple[str, ...], object] = {}
+
+    @abstractmethod
+    def new_child(self):
+        """
+        Returns a new child series of this metric's type.
+        """
+        pass
+
+    def labels(self, *values):
+        """
+        Returns the child for the given label values, creating it on first
+        use.
+        """
+        child = self.children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(
+                    f"{self.name} expects labels {self.labelnames}, got {values}"
+                )
+            child = self.children[values] = self.new_child()
+        return child
+
+    def render(self, lines: List[str]) -> None:
+        lines.append(f"# HELP {self.name} {self.help}")
+        lines.append(f"# TYPE {self.name} {self.type}")
+        for values, child in self.children.items():
+            labels = ",".join(
+                f'{label}="{escape_label(str(value))}"'
+                for label, value in zip(self.labelnames, values)
+            )
+            for name, sample_labels, value in child.samples(self.name, labels):
+                if sample_labels:
+                    lines.append(f"{name}{{{sample_labels}}} {format_value(value)}")
+                else:
+                    lines.append(f"{name} {format_value(value)}")
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def new_child(self):
+        return CounterChild()
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def new_child(self):
+        return GaugeChild()
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def new_child(self):
+        return HistogramChild(self.buckets)
+
+
+class Registry:
+    """
+    Holds the metrics of the process and renders them in the Prometheus text
+    format.
+
+    Values owned by other objects, e.g. queue depths, are copied into the
+    metrics by collectors, callbacks run right before rendering, so they cost
+    nothing between scrapes. Bound methods are held weakly and dropped with
+    their object.
+    """
+
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+        # callables returning the collector, or None once it is gone
+        self.collectors: List[Callable] = []
+
+    def _get_or_create(self, cls, name, *args, **kwargs):
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = cls(name, *args, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"{name} is already registered as a {metric.type}")
+        return metric
+
+    def counter(self, name: str, help: str, labelnames=()) -> Counter:
+        return self._get_or_create(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames=()) -> Gauge:
+        return self._get_or_create(Gauge, name, help, labelnames)
+
+    def histogram(
+        self, name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, help, labelnames, buckets=buckets)
+
+    def add_collector(self, callback: Callable[[], None]) -> None:
+        if inspect.ismethod(callback):
+            self.collectors.append(weakref.WeakMethod(callback))
+        else:
+            self.collectors.append(lambda: callback)
+
+    def collect(self) -> None:
+        """
+        Runs the collectors, forgetting those whose object is gone.
+        """
+        alive = []
+        for reference in self.collectors:
+            callback = reference()
+            if callback is None:
+                continue
+            alive.append(reference)
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Metrics collector failed: {e}")
+        self.collectors = alive
+
+    def render(self) -> str:
+        self.collect()
+        lines: List[str] = []
+        for metric in self.metrics.values():
+            metric.render(lines)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class MetricsServer:
+    """
+    Serves a registry's metrics over HTTP at /metrics, for Prometheus to
+    scrape.
+    """
+
+    def __init__(self, registry: Registry, host: str = "127.0.0.1", port: int = 9464):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.runner: Optional[web.AppRunner] = None
+
+    async def handle(self, request: web.Request) -> web.Response:
+        return web.Response(
+            body=self.registry.render().encode(),
+            headers={"Content-Type": CONTENT_TYPE},
+        )
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/metrics", self.handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        # port 0 picks a free port
+        self.port = self.runner.addresses[0][1]
+        logger.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self) -> None:
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
@@ -0,0 +1,140 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional
+from igor.event import Event
+from igor.response import Response
+from igor.logging_config import get_logger
+from igor.tracing import get_tracer
+
+logger = get_logger(__name__)
+
+
+def split_message(content: str, limit: Optional[int]) -> List[str]:
+    """
+    Splits content into as few messages of at most limit characters as
+    possible. Each message is cut at the last space that fits, or at the
+    last line break if it is in the last fifth of the message (or after the
+    last space), and only mid-word if a single word is too long.
+
+    Args:
+        content (str): The text to split.
+        limit (int): Maximum message length, None for no limit.
+    """
+    if limit is None or len(content) <= limit:
+        return [content]
+
+    # a line break this close to the limit is worth a slightly shorter message
+    slack = limit // 5
+    chunks = []
+    while len(content) > limit:
+        window = content[: limit + 1]
+        cut = window.rfind(" ")
+        line_break = window.rfind("\n")
+        if line_break > 0 and (line_break > cut or line_break >= limit - slack):
+            cut = line_break
+        if cut <= 0:
+            chunks.append(content[:limit])
+            content = content[limit:]
+        else:
+            chunks.append(content[:cut])
+            # drop the separator we cut at
+            content = content[cut + 1 :]
+    if content:
+        chunks.append(content)
+    return chunks
+
+
+class _Outbox:
+    __slots__ = ("pending", "task")
+
+    def __init__(self):
+        self.pending = deque()
+        self.task: Optional[asyncio.Task] = None
+
+
+class OutboundBuffer:
+    """
+    Buffers outgoing responses per destination (a Discord channel, a Telegram
+    chat, ...), so a burst of responses goes out as few messages as possible.
+
+    Responses for a destination that arrive within window seconds of the
+    first one are joined with line breaks and sent together, split into
+    messages of at most max_length characters. Each destination is flushed
+    by one task, so messages go out in the order they were delivered.
+
+    Attributes:
+        send (Callable): Sends one message, e.g. Channel.send_response.
+        window (float): Seconds to wait for more responses before sending.
+        max_length (int): The platform's message length limit, None for none.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[Event, Response], Awaitable[None]],
+        window: float = 0.0,
+        max_length: Optional[int] = None,
+    ):
+        self.send = send
+        self.window = window
+        self.max_length = max_length
+        self._outboxes: Dict[Hashable, _Outbox] = {}
+
+    def deliver(self, destination: Hashable, event: Event, response: Response) -> None:
+        """
+        Queues a response for the destination. Returns right away; the
+        response is sent by the destination's flush task.
+        """
+        outbox = self._outboxes.get(destination)
+        if outbox is None:
+            outbox = self._outboxes[destination] = _Outbox()
+
+        outbox.pending.append((event, response))
+        if outbox.task is None:
+            outbox.task = asyncio.create_task(self._drain(destination, outbox))
+
+    async def flush(self) -> None:
+        """
+        Waits until everything delivered so far has been sent.
+        """
+        tasks = [outbox.task for outbox in self._outboxes.values() if outbox.task]
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _drain(self, destination: Hashable, outbox: _Outbox) -> None:
+        try:
+            while outbox.pending:
+                if self.window > 0:
+                    await asyncio.sleep(self.window)
+
+                batch = list(outbox.pending)
+                outbox.pending.clear()
+                await self._send_batch(batch)
+        finally:
+            outbox.task = None
+            if not outbox.pending:
+                del self._outboxes[destination]
+
+    async def _send_batch(self, batch) -> None:
+        # reply in the context of the latest event, they all share the
+        # destination
+        event, first = batch[-1][0], batch[0][1]
+        content = "\n".join(response.content for _, response in batch)
+
+        chunks = split_message(content, self.max_length)
+        start = time.perf_counter()
+        error = None
+        for chunk in chunks:
+            try:
+                await self.send(event, Response(content=chunk, channel=first.channel))
+            except Exception as e:
+                error = repr(e)
+                logger.error(f"Failed to send response to {event.channel}: {e}")
+        end = time.perf_counter()
+
+        for traced, _ in batch:
+            if traced.trace is not None:
+                attributes = {"messages": len(chunks), "batch": len(batch)}
+                if error is not None:
+                    attributes["error"] = error
+                traced.trace.add_span("channel.send", start, end, attributes)
+                get_tracer().finish(traced.trace)
@@ -2,6 +2,8 @@ from abc import ABC, abstractmethod
 from igor.event import Event
 from igor.response import Response
 from igor.hub import Hub
+from igor.router import tokenize_triggers
+from igor.executors import ASYNC
 
 
 class Reactor(ABC):
@@ -14,8 +16,26 @@ class Reactor(ABC):
 
     Attributes:
         hub (Hub): The central hub that manages all channels and reactors.
+        triggers (tuple): Static command phrases (e.g. "igor cat pic") the
+            reactor responds to. The hub indexes them so events are routed
+            without calling can_handle(). Leave empty to be asked through
+            can_handle() for every event instead.
+        event_types (tuple): The event types the triggers apply to.
+        execution (str): Where the hub runs handle(). "async" runs it on the
+            event loop (a plain function is called directly), "thread" runs
+            it in the hub's thread pool for blocking I/O, and "process" runs
+            it in the hub's process pool for CPU-bound work. Process-mode
+            reactors are instantiated inside the pool process without a hub,
+            so their handle() must be synchronous and not rely on self.hub.
+        setup_timeout (float): Seconds setup() may take, None for the hub's
+            default.
     """
 
+    triggers: tuple = ()
+    event_types: tuple = ("message",)
+    execution: str = ASYNC
+    setup_timeout = None
+
     def __init__(self, hub: Hub):
         """
         Initialize a new Reactor instance.
@@ -25,13 +45,33 @@ class Reactor(ABC):
         """
         self.hub = hub
 
-    @abstractmethod
+    async def setup(self) -> None:
+        """
+        Prepare the reactor for use, e.g. open connections or load data.
+
+        The hub runs the setup of all channels and reactors concurrently, and
+        events routed to this reactor wait until it has finished.
+
+        If it raises or takes longer than setup_timeout seconds (the hub's
+        default when None), the reactor is left out.
+        """
+        pass
+
+    async def teardown(self) -> None:
+        """
+        Release the resources acquired in setup(). Called by the hub when Igor
+        is shutting down.
+        """
+        pass
+
     def can_handle(self, event: Event) -> bool:
         """
         Determine if this reactor can handle the given event.
 
         This method should return True if the reactor can handle the event,
-        and False otherwise.
+        and False otherwise. The default implementation matches the event
+        against the reactor's triggers; reactors without static triggers
+        should override it.
 
         Args:
             event (Event): The event to be checked.
@@ -39,7 +79,12 @@ class Reactor(ABC):
         Returns:
             bool: True if this reactor can handle the event, False otherwise.
         """
-        pass
+        if event.event_type not in self.event_types:
+            return False
+        for trigger_tokens in tokenize_triggers(tuple(self.triggers)):
+            if event.tokens[: len(trigger_tokens)] == trigger_tokens:
+                return True
+        return False
 
     @abstractmethod
     async def handle(self, event: Event) -> Response:
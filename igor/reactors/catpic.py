@@ -1,33 +1,174 @@
+import os
+import time
+import asyncio
+from collections import OrderedDict, deque
+from typing import List, Optional
 from igor.response import Response
 from igor.reactors.base_reactor import Reactor
-import aiohttp
+from igor.client import send_request
 from igor.logging_config import get_logger
 
 logger = get_logger(__name__)
 
 
+class CatPicPrefetcher:
+    """
+    Keeps a pool of cat pic URLs ready so replies never wait on the API.
+
+    A background task fetches URLs in bulk (using the API's limit parameter)
+    whenever the pool drops below low_water, until it holds capacity URLs.
+    Each URL is handed out once; URLs already seen recently are skipped. When
+    the API fails, returns nothing new, or takes longer than slow_after
+    seconds, the task backs off exponentially up to max_backoff seconds.
+
+    Attributes:
+        url (str): The image search endpoint.
+        capacity (int): Maximum number of URLs kept ready.
+        low_water (int): Pool size below which a refill starts.
+        batch (int): Number of URLs requested per call.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        capacity: int = 20,
+        low_water: int = 5,
+        batch: int = 10,
+        slow_after: float = 2.0,
+        min_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        headers: Optional[dict] = None,
+    ):
+        self.url = url
+        self.capacity = capacity
+        self.low_water = low_water
+        self.batch = batch
+        self.slow_after = slow_after
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.headers = headers
+        self.backoff = 0.0
+        self.pool = deque()
+        self._seen = OrderedDict()
+        self._refill = asyncio.Event()
+        self._filled = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._refill.set()
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def get(self, timeout: float = 5.0) -> Optional[str]:
+        """
+        Returns a URL from the pool, waiting up to timeout seconds for a
+        refill if the pool is empty.
+
+        Returns:
+            str: A URL never handed out before, or None on timeout.
+        """
+        try:
+            async with asyncio.timeout(timeout):
+                while not self.pool:
+                    self._refill.set()
+                    await self._filled.wait()
+        except TimeoutError:
+            return None
+
+        url = self.pool.popleft()
+        if not self.pool:
+            self._filled.clear()
+        if len(self.pool) < self.low_water:
+            self._refill.set()
+        return url
+
+    async def run(self) -> None:
+        while True:
+            await self._refill.wait()
+            if self.backoff:
+                await asyncio.sleep(self.backoff)
+
+            start = time.monotonic()
+            try:
+                urls = await self.fetch()
+            except Exception as e:
+                logger.warning(f"Catpic prefetch failed: {e}")
+                urls = []
+            added = self.add(urls)
+
+            if not added or time.monotonic() - start > self.slow_after:
+                self.backoff = min(
+                    max(self.backoff * 2, self.min_backoff), self.max_backoff
+                )
+                logger.debug(f"Catpic prefetch backing off for {self.backoff}s")
+            else:
+                self.backoff = 0.0
+
+            if len(self.pool) >= self.capacity:
+                self._refill.clear()
+
+    async def fetch(self) -> List[str]:
+        res = await send_request(
+            "get", self.url, {"limit": self.batch}, optional_headers=self.headers
+        )
+        if not res:
+            return []
+        return [image["url"] for image in res if "url" in image]
+
+    def add(self, urls: List[str]) -> int:
+        """
+        Adds new URLs to the pool, skipping ones seen before.
+
+        Returns:
+            int: How many URLs were added.
+        """
+        added = 0
+        for url in urls:
+            if len(self.pool) >= self.capacity:
+                break
+            if url in self._seen:
+                continue
+            self._seen[url] = None
+            if len(self._seen) > self.capacity * 50:
+                self._seen.popitem(last=False)
+            self.pool.append(url)
+            added += 1
+
+        if self.pool:
+            self._filled.set()
+        return added
+
+
 class CatPic(Reactor):
+    triggers = ("igor cat pic",)
+
     def __init__(self, hub):
         super().__init__(hub)
         self.url = "https://api.thecatapi.com/v1/images/search"
 
-    def can_handle(self, event):
-        return event.event_type == "message" and event.content.lower().startswith(
-            "igor cat pic"
-        )
+        # an API key raises the number of images per request
+        api_key = os.getenv("CAT_API_KEY")
+        headers = {"x-api-key": api_key} if api_key else None
+        self.prefetcher = CatPicPrefetcher(self.url, headers=headers)
 
-    async def send_request(self):
-        headers = {
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-        }
+    async def setup(self):
+        self.prefetcher.start()
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(self.url, headers=headers) as response:
-                if response.status == 200:
-                    return await response.json()
+    async def teardown(self):
+        await self.prefetcher.stop()
 
     async def handle(self, event):
-        res = await self.send_request()
-        logger.info(f"Catpic res: {res[0]["url"]}")
-        return Response(content=res[0]["url"], channel=event.channel)
+        url = await self.prefetcher.get()
+        if url is None:
+            return Response(
+                content="I couldn't find a cat pic right now, try again later",
+                channel=event.channel,
+            )
+        logger.debug("Catpic res: %s", url)
+        return Response(content=url, channel=event.channel)
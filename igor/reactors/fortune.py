@@ -4,6 +4,8 @@ from igor.reactors.base_reactor import Reactor
 
 
 class Fortune(Reactor):
+    triggers = ("igor fortune",)
+
     def __init__(self, hub):
         super().__init__(hub)
         self.fortunes = [
@@ -11,11 +13,6 @@ class Fortune(Reactor):
             "Anything that you do, any accomplishment that you make, you have to work for",
         ]
 
-    def can_handle(self, event):
-        return event.event_type == "message" and event.content.lower().startswith(
-            "igor fortune"
-        )
-
     async def handle(self, event):
         fortune = random.choice(self.fortunes)
         return Response(content=fortune, channel=event.channel)
@@ -3,14 +3,11 @@ from igor.reactors.base_reactor import Reactor
 
 
 class Help(Reactor):
+    triggers = ("igor help",)
+
     def __init__(self, hub):
         super().__init__(hub)
 
-    def can_handle(self, event):
-        return event.event_type == "message" and event.content.lower().startswith(
-            "igor help"
-        )
-
     async def handle(self, event):
         help_text = """
 I'm a bot. Here are some things you can ask me:
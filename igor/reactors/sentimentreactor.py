@@ -1,33 +1,41 @@
+import asyncio
 from igor.reactors.base_reactor import Reactor
 from igor.response import Response
-from nltk.sentiment import SentimentIntensityAnalyzer
-import nltk
-
-nltk.download("vader_lexicon")
+from igor.executors import PROCESS
+from igor.sentiment import SentimentBatcher, ensure_lexicon, score_texts
 
 
 class SentimentReactor(Reactor):
+    triggers = ("igor sentiment",)
+
     def __init__(self, hub):
         super().__init__(hub)
-        self.sia = SentimentIntensityAnalyzer()
+        self.lexicon_dir = None
+        self.batcher = SentimentBatcher(self.score_batch)
+
+    async def setup(self):
+        self.lexicon_dir = await asyncio.to_thread(ensure_lexicon)
+        # start a pool process and map the lexicon before the first request
+        await self.score_batch([""])
 
-    def can_handle(self, event):
-        return event.event_type == "message" and event.content.lower().startswith(
-            "igor sentiment"
+    async def score_batch(self, texts):
+        # scoring is CPU-bound, keep it off the event loop
+        return await self.hub.executors.run(
+            PROCESS, score_texts, self.lexicon_dir, texts
         )
 
     async def handle(self, event):
-        text = event.content.lower().replace("igor sentiment", "").strip()
-        sentiment = self.sia.polarity_scores(text)
+        text = event.args.lower().strip()
+        compound = await self.batcher.score(text)
 
-        if sentiment["compound"] >= 0.05:
+        if compound >= 0.05:
             sentiment_str = "positive"
-        elif sentiment["compound"] <= -0.05:
+        elif compound <= -0.05:
             sentiment_str = "negative"
         else:
             sentiment_str = "neutral"
 
         return Response(
-            content=f"The sentiment of '{text}' is {sentiment_str} (score: {sentiment['compound']:.2f})",
+            content=f"The sentiment of '{text}' is {sentiment_str} (score: {compound:.2f})",
             channel=event.channel,
         )
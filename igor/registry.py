@@ -0,0 +1,117 @@
+import asyncio
+import importlib
+import time
+from typing import Dict, Optional
+from igor.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class PluginRegistry:
+    """
+    Imports channel and reactor classes by name and keeps track of how long
+    each import took, so cold-start cost can be attributed to plugins.
+
+    Attributes:
+        import_times (dict): Seconds spent importing each plugin module.
+    """
+
+    def __init__(self):
+        self.import_times: Dict[str, float] = {}
+
+    def load_class(self, kind: str, class_name: str) -> Optional[type]:
+        """
+        Imports igor.<kind>.<class_name lowercased> and returns the class.
+
+        Args:
+            kind (str): "channels" or "reactors".
+            class_name (str): The class to load, e.g. "CatPic".
+        """
+        module_name = f"igor.{kind}.{class_name.lower()}"
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        self.import_times.setdefault(module_name, time.perf_counter() - start)
+
+        try:
+            return getattr(module, class_name)
+        except AttributeError as e:
+            logger.error(f"Error getting class by name: {e}")
+
+    def report(self) -> None:
+        """
+        Logs the import time of every plugin loaded so far, slowest first.
+        """
+        for module_name, seconds in sorted(
+            self.import_times.items(), key=lambda item: item[1], reverse=True
+        ):
+            logger.info(f"import {module_name}: {seconds * 1000:.1f} ms")
+
+
+class LazyReactor:
+    """
+    Stands in for a reactor whose config declares its triggers, so the hub
+    can route to it without importing its module. The module is imported and
+    the reactor instantiated the first time an event needs it.
+
+    Routing uses the config's triggers only, also once the reactor is
+    loaded; the class's own triggers are ignored, with a warning if they
+    differ. A placeholder can't be asked through can_handle(), so it needs
+    at least one trigger.
+
+    Attributes:
+        class_name (str): The reactor class to load.
+        triggers (tuple): Trigger phrases from the config.
+        event_types (tuple): Event types from the config.
+        preload (bool): Whether the hub loads and sets up the reactor at
+            startup anyway, for reactors that warm up in setup().
+    """
+
+    def __init__(
+        self,
+        hub,
+        class_name: str,
+        triggers,
+        event_types=("message",),
+        preload: bool = False,
+    ):
+        self.hub = hub
+        self.class_name = class_name
+        self.triggers = tuple(triggers)
+        if not self.triggers:
+            raise ValueError(f"LazyReactor for {class_name} needs triggers")
+        self.event_types = tuple(event_types)
+        self.preload = preload
+        self.reactor = None
+        self._lock = asyncio.Lock()
+
+    async def resolve(self):
+        """
+        Returns the real reactor, importing and instantiating it on first use.
+        The import runs in a thread so the event loop keeps serving other
+        events meanwhile; the time it took is logged, since report() runs
+        before any lazy reactor is loaded.
+        """
+        if self.reactor is not None:
+            return self.reactor
+
+        async with self._lock:
+            if self.reactor is None:
+                start = time.perf_counter()
+                ReactorClass = await asyncio.to_thread(
+                    self.hub.get_class_by_name, "reactors", self.class_name
+                )
+                if ReactorClass is None:
+                    raise LookupError(f"Reactor {self.class_name} not found")
+                self.reactor = ReactorClass(self.hub)
+                elapsed = time.perf_counter() - start
+                logger.info(
+                    f"initialized {self.class_name} reactor on demand "
+                    f"in {elapsed * 1000:.1f} ms"
+                )
+                own_triggers = getattr(self.reactor, "triggers", ())
+                if own_triggers and set(own_triggers) != set(self.triggers):
+                    logger.warning(
+                        f"{self.class_name} is routed by its configured triggers "
+                        f"{list(self.triggers)}, not its own {list(own_triggers)}"
+                    )
+        return self.reactor
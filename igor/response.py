@@ -1,4 +1,6 @@
 class Response:
+    __slots__ = ("content", "channel")
+
     def __init__(self, content: str, channel: str):
         self.content = content
         self.channel = channel
@@ -0,0 +1,116 @@
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from igor.event import Event
+
+
+class _Node:
+    __slots__ = ("children", "reactors")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        # (reactor index, number of trigger tokens) of the triggers ending here
+        self.reactors: List[Tuple[int, int]] = []
+
+
+class Router:
+    """
+    Routing index that maps events to the reactors that may handle them.
+
+    Reactors declare their static trigger phrases (e.g. "igor cat pic") and the
+    event types they react to. The phrases are stored in a token trie per
+    event type, so finding the candidates for an event is a single walk over
+    the first few words of its content, no matter how many reactors are
+    registered. Reactors without triggers are kept on a fallback list and are
+    asked through can_handle() as before.
+
+    Candidates are always returned in registration order, so the first
+    reactor listed in the config still wins.
+    """
+
+    def __init__(self, reactors=None):
+        self.reactors = []
+        self._tries: Dict[str, _Node] = {}
+        self._fallback: List[int] = []
+        self._depth = 0
+
+        for reactor in reactors or []:
+            self.add(reactor)
+
+    def add(self, reactor) -> None:
+        """
+        Registers a reactor in the index.
+
+        Args:
+            reactor (Reactor): The reactor to register.
+        """
+        index = len(self.reactors)
+        self.reactors.append(reactor)
+
+        triggers = tuple(getattr(reactor, "triggers", ()) or ())
+        if not triggers:
+            self._fallback.append(index)
+            return
+
+        for event_type in getattr(reactor, "event_types", ("message",)):
+            root = self._tries.setdefault(event_type, _Node())
+            for tokens in tokenize_triggers(triggers):
+                self._depth = max(self._depth, len(tokens))
+                node = root
+                for token in tokens:
+                    node = node.children.setdefault(token, _Node())
+                node.reactors.append((index, len(tokens)))
+
+    def match(self, event: Event) -> List[Tuple[Any, int]]:
+        """
+        Returns the reactors that should be offered the event, in registration
+        order, each paired with the number of words of the trigger it was
+        matched through (the longest, if several match), or 0 for fallback
+        reactors. Matched reactors need no further check; fallback reactors
+        still have to be asked through can_handle().
+
+        Args:
+            event (Event): The event to route.
+
+        Returns:
+            list: (reactor, trigger length) pairs.
+        """
+        matched = self._walk(event)
+        if not matched:
+            return [(self.reactors[i], 0) for i in self._fallback]
+
+        candidates = list(matched.items())
+        candidates.extend((i, 0) for i in self._fallback)
+        candidates.sort()
+        return [(self.reactors[i], length) for i, length in candidates]
+
+    def _walk(self, event: Event) -> Dict[int, int]:
+        node: Optional[_Node] = self._tries.get(event.event_type)
+        if node is None:
+            return {}
+
+        # deeper nodes come later, so a longer trigger of the same reactor
+        # overrides a shorter one
+        matched = {}
+        for token in event.tokens[: self._depth]:
+            node = node.children.get(token)
+            if node is None:
+                break
+            matched.update(node.reactors)
+        return matched
+
+
+def tokenize(text: str, depth: int = -1) -> List[str]:
+    """
+    Normalizes text into the tokens used as trie keys. Only the first `depth`
+    words are split off, the rest of the text is left as one trailing item.
+    """
+    return text.lower().split(None, depth)
+
+
+@lru_cache(maxsize=None)
+def tokenize_triggers(triggers: Tuple[str, ...]) -> Tuple[List[str], ...]:
+    """
+    Returns the tokens of each trigger phrase, computed once per set of
+    triggers.
+    """
+    return tuple(tokenize(trigger) for trigger in triggers)
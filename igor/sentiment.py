@@ -0,0 +1,493 @@
+"""
+Batch sentiment scoring with a precompiled VADER lexicon.
+
+The VADER lexicon is compiled once into two NumPy arrays (sorted words and
+their valences) that are memory-mapped on load, so every process that scores
+text shares the same pages and startup needs neither NLTK nor the network.
+Lexicon lookups for a whole batch of texts are done with a single vectorized
+search; the VADER rules (boosters, negation, "but", idioms, emphasis) are then
+applied per text exactly as NLTK's SentimentIntensityAnalyzer does, so the
+compound scores are identical.
+
+To compile the lexicon from the NLTK data (or a vader_lexicon.txt file):
+
+    python -m igor.sentiment compile [lexicon.txt] [target_dir]
+"""
+
+import asyncio
+import os
+import re
+import string
+import sys
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from igor.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+NLTK_LEXICON = "sentiment/vader_lexicon.zip/vader_lexicon/vader_lexicon.txt"
+DEFAULT_LEXICON_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+    "igor",
+    "vader_lexicon",
+)
+WORDS_FILE = "words.npy"
+VALENCES_FILE = "valences.npy"
+
+# VADER constants, see nltk.sentiment.vader.VaderConstants
+B_INCR = 0.293
+B_DECR = -0.293
+C_INCR = 0.733
+N_SCALAR = -0.74
+ALPHA = 15
+
+# fmt: off
+NEGATE = {
+    "aint", "arent", "cannot", "cant", "couldnt", "darent", "didnt", "doesnt",
+    "ain't", "aren't", "can't", "couldn't", "daren't", "didn't", "doesn't",
+    "dont", "hadnt", "hasnt", "havent", "isnt", "mightnt", "mustnt", "neither",
+    "don't", "hadn't", "hasn't", "haven't", "isn't", "mightn't", "mustn't",
+    "neednt", "needn't", "never", "none", "nope", "nor", "not", "nothing",
+    "nowhere", "oughtnt", "shant", "shouldnt", "uhuh", "wasnt", "werent",
+    "oughtn't", "shan't", "shouldn't", "uh-uh", "wasn't", "weren't", "without",
+    "wont", "wouldnt", "won't", "wouldn't", "rarely", "seldom", "despite",
+}
+
+BOOSTER_DICT = {
+    **dict.fromkeys(
+        [
+            "absolutely", "amazingly", "awfully", "completely", "considerably",
+            "decidedly", "deeply", "effing", "enormously", "entirely",
+            "especially", "exceptionally", "extremely", "fabulously", "flipping",
+            "flippin", "fricking", "frickin", "frigging", "friggin", "fully",
+            "fucking", "greatly", "hella", "highly", "hugely", "incredibly",
+            "intensely", "majorly", "more", "most", "particularly", "purely",
+            "quite", "really", "remarkably", "so", "substantially", "thoroughly",
+            "totally", "tremendously", "uber", "unbelievably", "unusually",
+            "utterly", "very",
+        ],
+        B_INCR,
+    ),
+    **dict.fromkeys(
+        [
+            "almost", "barely", "hardly", "just enough", "kind of", "kinda",
+            "kindof", "kind-of", "less", "little", "marginally", "occasionally",
+            "partly", "scarcely", "slightly", "somewhat", "sort of", "sorta",
+            "sortof", "sort-of",
+        ],
+        B_DECR,
+    ),
+}
+
+PUNC_SET = {
+    ".", "!", "?", ",", ";", ":", "-", "'", '"', "!!", "!!!", "??", "???",
+    "?!?", "!?!", "?!?!", "!?!?",
+}
+# fmt: on
+
+SPECIAL_CASE_IDIOMS = {
+    "the shit": 3,
+    "the bomb": 3,
+    "bad ass": 1.5,
+    "yeah right": -2,
+    "cut the mustard": 2,
+    "kiss of death": -1.5,
+    "hand to mouth": -2,
+}
+
+REGEX_REMOVE_PUNCTUATION = re.compile(f"[{re.escape(string.punctuation)}]")
+
+
+def compile_lexicon(
+    source: Optional[str] = None, target_dir: str = DEFAULT_LEXICON_DIR
+):
+    """
+    Compiles a VADER lexicon file into the array form used by SentimentEngine.
+
+    Args:
+        source (str): Path to vader_lexicon.txt. Defaults to the copy in the
+            local NLTK data, which must already be downloaded.
+        target_dir (str): Directory the compiled arrays are written to.
+
+    Returns:
+        str: The target directory.
+    """
+    if source is None:
+        import nltk.data
+
+        text = nltk.data.load(NLTK_LEXICON)
+    else:
+        with open(source, encoding="utf-8") as lexicon_file:
+            text = lexicon_file.read()
+
+    lexicon = {}
+    for line in text.split("\n"):
+        if not line.strip():
+            continue
+        word, measure = line.strip().split("\t")[0:2]
+        lexicon[word] = float(measure)
+
+    words = sorted(lexicon)
+    os.makedirs(target_dir, exist_ok=True)
+    np.save(os.path.join(target_dir, WORDS_FILE), np.array(words, dtype=str))
+    np.save(
+        os.path.join(target_dir, VALENCES_FILE),
+        np.array([lexicon[word] for word in words], dtype=np.float64),
+    )
+    logger.info(f"Compiled {len(words)} lexicon entries into {target_dir}")
+    return target_dir
+
+
+def ensure_lexicon(target_dir: str = DEFAULT_LEXICON_DIR) -> str:
+    """
+    Returns the compiled lexicon directory, compiling it from the local NLTK
+    data first if it does not exist yet. Never downloads anything.
+    """
+    if not os.path.exists(os.path.join(target_dir, VALENCES_FILE)):
+        try:
+            compile_lexicon(target_dir=target_dir)
+        except LookupError as e:
+            raise LookupError(
+                "VADER lexicon not found. Run `python -m igor.sentiment compile "
+                "path/to/vader_lexicon.txt` or download it with "
+                "`python -m nltk.downloader vader_lexicon` first."
+            ) from e
+    return target_dir
+
+
+class SentimentEngine:
+    """
+    Scores texts with the VADER algorithm against a compiled lexicon.
+
+    Attributes:
+        words (np.ndarray): Sorted lexicon words (memory-mapped).
+        valences (np.ndarray): Valence of each word in `words` (memory-mapped).
+    """
+
+    def __init__(self, lexicon_dir: str = DEFAULT_LEXICON_DIR):
+        self.words = np.load(os.path.join(lexicon_dir, WORDS_FILE), mmap_mode="r")
+        self.valences = np.load(os.path.join(lexicon_dir, VALENCES_FILE), mmap_mode="r")
+
+    def compound_scores(self, texts: Sequence[str]) -> List[float]:
+        """
+        Returns the VADER compound score of each text, rounded to four
+        decimals like SentimentIntensityAnalyzer.polarity_scores().
+        """
+        tokenized = [words_and_emoticons(text) for text in texts]
+
+        flat = [word.lower() for words in tokenized for word in words]
+        valences, in_lexicon = self.lookup(flat)
+
+        sums = np.zeros(len(texts))
+        amplifiers = np.zeros(len(texts))
+        scored = np.zeros(len(texts), dtype=bool)
+        offset = 0
+        for n, (words, text) in enumerate(zip(tokenized, texts)):
+            count = len(words)
+            if count:
+                sentiments = self._sentiments(
+                    words,
+                    valences[offset : offset + count],
+                    in_lexicon[offset : offset + count],
+                )
+                sums[n] = float(sum(sentiments))
+                amplifiers[n] = punctuation_emphasis(text)
+                scored[n] = True
+            offset += count
+
+        sums = np.where(sums > 0, sums + amplifiers, sums)
+        sums = np.where(sums < 0, sums - amplifiers, sums)
+        compound = sums / np.sqrt(sums * sums + ALPHA)
+
+        return [
+            round(float(score), 4) if is_scored else 0.0
+            for score, is_scored in zip(compound, scored)
+        ]
+
+    def compound_score(self, text: str) -> float:
+        return self.compound_scores([text])[0]
+
+    def lookup(self, words: List[str]) -> Tuple[List[float], List[bool]]:
+        """
+        Looks up the valence of every word with one vectorized binary search
+        over the lexicon.
+
+        Returns:
+            tuple: (valences, in_lexicon) lists aligned with `words`;
+            valences are 0.0 for words not in the lexicon.
+        """
+        if not words:
+            return [], []
+
+        query = np.array(words, dtype=str)
+        positions = np.searchsorted(self.words, query)
+        positions = np.minimum(positions, len(self.words) - 1)
+        found = self.words[positions] == query
+        valences = np.where(found, self.valences[positions], 0.0)
+        return valences.tolist(), found.tolist()
+
+    def _sentiments(
+        self, words: List[str], valences: List[float], in_lexicon: List[bool]
+    ) -> List[float]:
+        """
+        Applies the VADER rules to one tokenized text, see
+        SentimentIntensityAnalyzer.polarity_scores() and sentiment_valence().
+        """
+        lowered = [word.lower() for word in words]
+        is_cap_diff = allcap_differential(words)
+
+        # NLTK scores every occurrence of a word as its first occurrence
+        first_index: Dict[str, int] = {}
+        for idx, token in enumerate(words):
+            first_index.setdefault(token, idx)
+
+        sentiments = []
+        for item in words:
+            i = first_index[item]
+            item_lower = lowered[i]
+            if (
+                i < len(words) - 1 and item_lower == "kind" and lowered[i + 1] == "of"
+            ) or item_lower in BOOSTER_DICT:
+                sentiments.append(0)
+                continue
+
+            if not in_lexicon[i]:
+                sentiments.append(0)
+                continue
+
+            valence = valences[i]
+            if item.isupper() and is_cap_diff:
+                if valence > 0:
+                    valence += C_INCR
+                else:
+                    valence -= C_INCR
+
+            for start_i in range(0, 3):
+                if i > start_i and not in_lexicon[i - (start_i + 1)]:
+                    s = scalar_inc_dec(words[i - (start_i + 1)], valence, is_cap_diff)
+                    if start_i == 1 and s != 0:
+                        s = s * 0.95
+                    if start_i == 2 and s != 0:
+                        s = s * 0.9
+                    valence = valence + s
+                    valence = never_check(valence, words, start_i, i)
+                    if start_i == 2:
+                        valence = idioms_check(valence, words, i)
+
+            valence = least_check(valence, lowered, in_lexicon, i)
+            sentiments.append(valence)
+
+        return but_check(lowered, sentiments)
+
+
+def words_and_emoticons(text: str) -> List[str]:
+    """
+    Splits text into words, stripping one leading or trailing punctuation
+    mark while leaving contractions and most emoticons intact. Equivalent to
+    nltk's SentiText._words_and_emoticons(), without building the
+    word/punctuation product table.
+    """
+    words = []
+    for word in text.split():
+        if len(word) <= 1:
+            continue
+        stripped = REGEX_REMOVE_PUNCTUATION.sub("", word)
+        if len(stripped) > 1 and stripped != word:
+            if word.endswith(stripped) and word[: -len(stripped)] in PUNC_SET:
+                word = stripped
+            elif word.startswith(stripped) and word[len(stripped) :] in PUNC_SET:
+                word = stripped
+        words.append(word)
+    return words
+
+
+def allcap_differential(words: List[str]) -> bool:
+    allcap_words = sum(1 for word in words if word.isupper())
+    return 0 < len(words) - allcap_words < len(words)
+
+
+def negated(word: str) -> bool:
+    word = word.lower()
+    return word in NEGATE or "n't" in word
+
+
+def scalar_inc_dec(word: str, valence: float, is_cap_diff: bool) -> float:
+    scalar = 0.0
+    word_lower = word.lower()
+    if word_lower in BOOSTER_DICT:
+        scalar = BOOSTER_DICT[word_lower]
+        if valence < 0:
+            scalar *= -1
+        if word.isupper() and is_cap_diff:
+            if valence > 0:
+                scalar += C_INCR
+            else:
+                scalar -= C_INCR
+    return scalar
+
+
+def never_check(valence: float, words: List[str], start_i: int, i: int) -> float:
+    if start_i == 0:
+        if negated(words[i - 1]):
+            valence = valence * N_SCALAR
+    if start_i == 1:
+        if words[i - 2] == "never" and (words[i - 1] == "so" or words[i - 1] == "this"):
+            valence = valence * 1.5
+        elif negated(words[i - (start_i + 1)]):
+            valence = valence * N_SCALAR
+    if start_i == 2:
+        if (
+            words[i - 3] == "never"
+            and (words[i - 2] == "so" or words[i - 2] == "this")
+            or (words[i - 1] == "so" or words[i - 1] == "this")
+        ):
+            valence = valence * 1.25
+        elif negated(words[i - (start_i + 1)]):
+            valence = valence * N_SCALAR
+    return valence
+
+
+def idioms_check(valence: float, words: List[str], i: int) -> float:
+    onezero = f"{words[i - 1]} {words[i]}"
+    twoonezero = f"{words[i - 2]} {words[i - 1]} {words[i]}"
+    twoone = f"{words[i - 2]} {words[i - 1]}"
+    threetwoone = f"{words[i - 3]} {words[i - 2]} {words[i - 1]}"
+    threetwo = f"{words[i - 3]} {words[i - 2]}"
+
+    for seq in (onezero, twoonezero, twoone, threetwoone, threetwo):
+        if seq in SPECIAL_CASE_IDIOMS:
+            valence = SPECIAL_CASE_IDIOMS[seq]
+            break
+
+    if len(words) - 1 > i:
+        zeroone = f"{words[i]} {words[i + 1]}"
+        if zeroone in SPECIAL_CASE_IDIOMS:
+            valence = SPECIAL_CASE_IDIOMS[zeroone]
+    if len(words) - 1 > i + 1:
+        zeroonetwo = f"{words[i]} {words[i + 1]} {words[i + 2]}"
+        if zeroonetwo in SPECIAL_CASE_IDIOMS:
+            valence = SPECIAL_CASE_IDIOMS[zeroonetwo]
+
+    if threetwo in BOOSTER_DICT or twoone in BOOSTER_DICT:
+        valence = valence + B_DECR
+    return valence
+
+
+def least_check(
+    valence: float, lowered: List[str], in_lexicon: List[bool], i: int
+) -> float:
+    if i > 1 and not in_lexicon[i - 1] and lowered[i - 1] == "least":
+        if lowered[i - 2] != "at" and lowered[i - 2] != "very":
+            valence = valence * N_SCALAR
+    elif i > 0 and not in_lexicon[i - 1] and lowered[i - 1] == "least":
+        valence = valence * N_SCALAR
+    return valence
+
+
+def but_check(lowered: List[str], sentiments: List[float]) -> List[float]:
+    if "but" in lowered:
+        bi = lowered.index("but")
+        for sidx, sentiment in enumerate(sentiments):
+            if sidx < bi:
+                sentiments[sidx] = sentiment * 0.5
+            elif sidx > bi:
+                sentiments[sidx] = sentiment * 1.5
+    return sentiments
+
+
+def punctuation_emphasis(text: str) -> float:
+    ep_amplifier = min(text.count("!"), 4) * 0.292
+    qm_count = text.count("?")
+    qm_amplifier = 0
+    if qm_count > 1:
+        qm_amplifier = qm_count * 0.18 if qm_count <= 3 else 0.96
+    return ep_amplifier + qm_amplifier
+
+
+# engines loaded inside pool processes, one per lexicon directory
+_engines: Dict[str, SentimentEngine] = {}
+
+
+def score_texts(lexicon_dir: str, texts: Sequence[str]) -> List[float]:
+    """
+    Scores a batch of texts with a process-local engine. Meant to be run in
+    the hub's process pool; the lexicon is only mapped once per process.
+    """
+    engine = _engines.get(lexicon_dir)
+    if engine is None:
+        engine = _engines[lexicon_dir] = SentimentEngine(lexicon_dir)
+    return engine.compound_scores(texts)
+
+
+class SentimentBatcher:
+    """
+    Collects texts scored concurrently into micro-batches.
+
+    The first text starts a short window; everything that arrives within it
+    (up to max_batch texts) is scored with one call to score_batch.
+
+    Attributes:
+        score_batch (Callable): Coroutine function scoring a list of texts.
+        max_batch (int): Batch size that triggers an immediate flush.
+        window (float): Seconds to wait for more texts before flushing.
+    """
+
+    def __init__(
+        self,
+        score_batch: Callable[[List[str]], Awaitable[List[float]]],
+        max_batch: int = 64,
+        window: float = 0.005,
+    ):
+        self.score_batch = score_batch
+        self.max_batch = max_batch
+        self.window = window
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._batches = set()
+
+    async def score(self, text: str) -> float:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self.flush)
+
+        return await future
+
+    def flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.create_task(self._run(batch))
+        # keep a reference so the task isn't garbage collected mid-flight
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        try:
+            scores = await self.score_batch([text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), score in zip(batch, scores):
+            if not future.done():
+                future.set_result(score)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "compile":
+        print("usage: python -m igor.sentiment compile [lexicon.txt] [target_dir]")
+        sys.exit(1)
+    compile_lexicon(*sys.argv[2:4])
@@ -0,0 +1,176 @@
+import importlib
+from abc import ABC, abstractmethod
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from igor import codec
+from igor.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class Trace:
+    """
+    The timeline of one event, from the channel that received it to the
+    response being sent.
+
+    Spans are kept as (name, start, end, attributes) with perf_counter
+    times; they are only converted when the trace is exported.
+
+    Attributes:
+        trace_id (str): Random 64-bit id, in hex.
+        channel (str): The channel that received the event.
+        started_at (float): Wall clock time the trace started, for the export.
+        start (float): perf_counter time the trace started.
+        spans (list): The recorded spans.
+    """
+
+    __slots__ = ("trace_id", "channel", "started_at", "start", "spans")
+
+    def __init__(self, channel: str):
+        self.trace_id = f"{random.getrandbits(64):016x}"
+        self.channel = channel
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.spans: List[Tuple[str, float, float, Optional[dict]]] = []
+
+    def add_span(
+        self, name: str, start: float, end: float, attributes: Optional[dict] = None
+    ) -> None:
+        self.spans.append((name, start, end, attributes))
+
+    def to_record(self) -> dict:
+        end = max((span[2] for span in self.spans), default=self.start)
+        return {
+            "trace_id": self.trace_id,
+            "channel": self.channel,
+            "start": self.started_at,
+            "duration_ms": (end - self.start) * 1000,
+            "spans": [
+                {
+                    "name": name,
+                    "start_ms": (start - self.start) * 1000,
+                    "duration_ms": (end - start) * 1000,
+                    **(attributes or {}),
+                }
+                for name, start, end, attributes in self.spans
+            ],
+        }
+
+
+class Sink(ABC):
+    """
+    Where finished traces go. Subclasses implement export(), and override
+    close() if they hold resources.
+    """
+
+    @abstractmethod
+    def export(self, record: dict) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class NullSink(Sink):
+    def export(self, record: dict) -> None:
+        pass
+
+
+class JsonLinesSink(Sink):
+    """
+    Appends every trace to a file as one line of JSON. Writes go through the
+    file's buffer, so exporting rarely costs a system call.
+    """
+
+    def __init__(self, path: str = "igor-traces.jsonl"):
+        self.path = path
+        self.file = open(path, "ab")
+
+    def export(self, record: dict) -> None:
+        self.file.write(codec.dumps(record) + b"\n")
+
+    def close(self) -> None:
+        self.file.close()
+
+
+SINKS = {"jsonl": JsonLinesSink, "null": NullSink}
+
+
+def load_sink(name: str, **options) -> Sink:
+    """
+    Creates a sink by its name in SINKS, or by its import path, e.g.
+    "mypackage.sinks.OtlpSink".
+    """
+    cls = SINKS.get(name)
+    if cls is None:
+        module_name, _, class_name = name.rpartition(".")
+        cls = getattr(importlib.import_module(module_name), class_name)
+    return cls(**options)
+
+
+class Tracer:
+    """
+    Starts traces for a sample of the events and exports the finished ones
+    to a sink.
+
+    Events that aren't sampled get no trace at all, so at a low sample rate
+    tracing costs one random number per event.
+
+    Attributes:
+        sample_rate (float): Share of the events to trace, from 0 to 1.
+        sink (Sink): Where finished traces are exported.
+    """
+
+    def __init__(self, sample_rate: float = 0.0, sink: Optional[Sink] = None):
+        self.sample_rate = sample_rate
+        self.sink = sink if sink is not None else NullSink()
+
+    def start(self, channel: str) -> Optional[Trace]:
+        """
+        Returns a new trace if the event is sampled, None otherwise.
+        """
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return None
+        return Trace(channel)
+
+    def finish(self, trace: Trace) -> None:
+        try:
+            self.sink.export(trace.to_record())
+        except Exception as e:
+            logger.error(f"Failed to export trace {trace.trace_id}: {e}")
+
+    def close(self) -> None:
+        self.sink.close()
+
+
+def tracer_from_config(config: Dict[str, Any]) -> Tracer:
+    """
+    Builds a tracer from the [tracing] config section: sample_rate, sink
+    and the sink's own options.
+    """
+    options = dict(config)
+    sample_rate = options.pop("sample_rate", 0.0)
+    sink = options.pop("sink", "jsonl")
+    if sample_rate <= 0:
+        return Tracer()
+    return Tracer(sample_rate, load_sink(sink, **options))
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """
+    Returns the tracer installed by the hub, one that traces nothing before
+    that.
+    """
+    return _tracer
+
+
+def set_tracer(tracer: Optional[Tracer]) -> None:
+    """
+    Installs the tracer channels start their events' traces with.
+    """
+    global _tracer
+    _tracer = tracer if tracer is not None else Tracer()
@@ -0,0 +1,11 @@
+from typing import Optional, Sequence
+
+
+def percentile(ordered: Sequence[float], percentile: float) -> Optional[float]:
+    """
+    Returns a percentile (0-100) of an already sorted sequence, by nearest
+    rank, or None if it is empty.
+    """
+    if not ordered:
+        return None
+    return ordered[round(percentile / 100 * (len(ordered) - 1))]
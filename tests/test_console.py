@@ -35,12 +35,12 @@ async def test_start_listening(hub_with_mocked_process):
         listen_task.cancel()
         await asyncio.gather(listen_task, return_exceptions=True)
 
-    # Verify that process_event was called with the correct event
+    # Verify that submit was called with the correct event
     hub = hub_with_mocked_process
-    hub.process_event.assert_called_once()
+    hub.submit.assert_called_once()
     hub.signal_shutdown.assert_called_once()
 
-    called_event = hub.process_event.call_args[0][0]
+    called_event = hub.submit.call_args[0][0]
     assert isinstance(called_event, Event)
     assert called_event.content == "igor hello"
     assert called_event.channel == "console"
@@ -0,0 +1,97 @@
+import asyncio
+import pytest
+from igor.cache import ResponseCache
+
+
+def test_cache_put_and_get():
+    cache = ResponseCache()
+    cache.put("key", {"a": 1}, ttl=60, etag='"v1"', size=10)
+
+    entry = cache.get("key")
+    assert entry.value == {"a": 1}
+    assert entry.etag == '"v1"'
+    assert entry.fresh()
+    assert cache.size == 10
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ResponseCache(max_bytes=25)
+    cache.put("a", 1, ttl=60, size=10)
+    cache.put("b", 2, ttl=60, size=10)
+    cache.get("a")
+    cache.put("c", 3, ttl=60, size=10)
+
+    assert cache.get("b") is None
+    assert cache.get("a").value == 1
+    assert cache.get("c").value == 3
+    assert cache.evictions == 1
+    assert cache.size == 20
+
+
+def test_cache_skips_entries_larger_than_cap():
+    cache = ResponseCache(max_bytes=5)
+    cache.put("big", "value", ttl=60, size=10)
+
+    assert len(cache) == 0
+
+
+def test_cache_keeps_expired_entries_for_revalidation():
+    cache = ResponseCache()
+    cache.put("key", 1, ttl=-1)
+
+    entry = cache.get("key")
+    assert entry is not None
+    assert not entry.fresh()
+
+
+@pytest.mark.asyncio
+async def test_cache_get_or_fetch_hits_after_miss():
+    cache = ResponseCache()
+    calls = []
+
+    async def fetch(stale):
+        calls.append(stale)
+        cache.put("key", "value", ttl=60)
+        return "value"
+
+    assert await cache.get_or_fetch("key", fetch) == "value"
+    assert await cache.get_or_fetch("key", fetch) == "value"
+
+    assert calls == [None]
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_coalesces_concurrent_fetches():
+    cache = ResponseCache()
+    release = asyncio.Event()
+    calls = 0
+
+    async def fetch(stale):
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "value"
+
+    waiters = [asyncio.create_task(cache.get_or_fetch("key", fetch)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == ["value"] * 3
+    assert calls == 1
+    assert cache.coalesced == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_passes_stale_entry_to_fetch():
+    cache = ResponseCache()
+    cache.put("key", "old", ttl=-1, etag='"v1"')
+    seen = []
+
+    async def fetch(stale):
+        seen.append(stale.etag)
+        return "new"
+
+    assert await cache.get_or_fetch("key", fetch) == "new"
+    assert seen == ['"v1"']
@@ -0,0 +1,101 @@
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+from igor.event import Event
+from igor.reactors.catpic import CatPic, CatPicPrefetcher
+
+
+def make_prefetcher(**kwargs):
+    kwargs.setdefault("capacity", 4)
+    kwargs.setdefault("low_water", 2)
+    kwargs.setdefault("min_backoff", 0.01)
+    return CatPicPrefetcher("https://example.com/cats", **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_prefetcher_serves_each_url_once():
+    prefetcher = make_prefetcher()
+    batches = iter([["a", "b", "a"], ["b", "c", "d", "e"], ["f"]])
+
+    async def fetch():
+        return next(batches, [])
+
+    prefetcher.fetch = fetch
+    prefetcher.start()
+    try:
+        urls = [await prefetcher.get(timeout=1.0) for _ in range(5)]
+    finally:
+        await prefetcher.stop()
+
+    assert urls == ["a", "b", "c", "d", "f"]
+
+
+@pytest.mark.asyncio
+async def test_prefetcher_refills_below_low_water():
+    prefetcher = make_prefetcher()
+    fetches = 0
+
+    async def fetch():
+        nonlocal fetches
+        fetches += 1
+        return [f"{fetches}-{n}" for n in range(4)]
+
+    prefetcher.fetch = fetch
+    prefetcher.start()
+    try:
+        await prefetcher.get(timeout=1.0)
+        await asyncio.sleep(0.01)
+        # one URL taken, pool still above the low-water mark
+        assert fetches == 1
+
+        await prefetcher.get(timeout=1.0)
+        await prefetcher.get(timeout=1.0)
+        await asyncio.sleep(0.01)
+        assert fetches == 2
+        assert len(prefetcher.pool) == 4
+    finally:
+        await prefetcher.stop()
+
+
+@pytest.mark.asyncio
+async def test_prefetcher_backs_off_on_failure():
+    prefetcher = make_prefetcher(min_backoff=0.01, max_backoff=0.04)
+    attempts = 0
+    backoffs = []
+
+    async def fetch():
+        nonlocal attempts
+        attempts += 1
+        backoffs.append(prefetcher.backoff)
+        if attempts < 4:
+            raise ConnectionError("upstream down")
+        return ["cat"]
+
+    prefetcher.fetch = fetch
+    prefetcher.start()
+    try:
+        assert await prefetcher.get(timeout=1.0) == "cat"
+    finally:
+        await prefetcher.stop()
+
+    assert backoffs[:4] == [0.0, 0.01, 0.02, 0.04]
+
+
+@pytest.mark.asyncio
+async def test_prefetcher_get_times_out_when_empty():
+    prefetcher = make_prefetcher()
+
+    assert await prefetcher.get(timeout=0.01) is None
+
+
+@pytest.mark.asyncio
+async def test_catpic_handle_without_cat_pics():
+    reactor = CatPic(MagicMock())
+
+    async def get():
+        return None
+
+    reactor.prefetcher.get = get
+    response = await reactor.handle(Event("message", "igor cat pic", "console"))
+
+    assert "couldn't find a cat pic" in response.content
@@ -0,0 +1,133 @@
+import asyncio
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from igor import client
+from igor.client import HttpClient, send_request
+
+
+@pytest.fixture
+async def server():
+    peers = set()
+
+    async def echo(request):
+        peers.add(request.transport.get_extra_info("peername"))
+        body = await request.json() if request.can_read_body else None
+        return web.json_response({"query": dict(request.query), "body": body})
+
+    async def etag(request):
+        server.etag_requests += 1
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.json_response({"version": 1}, headers={"ETag": '"v1"'})
+
+    async def fail(request):
+        return web.Response(status=500, text="boom")
+
+    app = web.Application()
+    app.router.add_get("/echo", echo)
+    app.router.add_post("/echo", echo)
+    app.router.add_get("/etag", etag)
+    app.router.add_get("/fail", fail)
+
+    server = TestServer(app)
+    await server.start_server()
+    server.peers = peers
+    server.etag_requests = 0
+    yield server
+    await server.close()
+
+
+@pytest.fixture
+async def http_client():
+    http_client = HttpClient(limit_per_host=2)
+    client.set_client(http_client)
+    yield http_client
+    await http_client.close()
+    client.set_client(None)
+
+
+@pytest.mark.asyncio
+async def test_send_request_get_and_post(server, http_client):
+    url = str(server.make_url("/echo"))
+
+    assert await send_request("get", url, {"a": "1"}) == {
+        "query": {"a": "1"},
+        "body": None,
+    }
+    assert await send_request("post", url, {"b": 2}) == {"query": {}, "body": {"b": 2}}
+
+
+@pytest.mark.asyncio
+async def test_send_request_reuses_connections(server, http_client):
+    url = str(server.make_url("/echo"))
+
+    for _ in range(5):
+        await send_request("get", url)
+
+    assert len(server.peers) == 1
+
+
+@pytest.mark.asyncio
+async def test_send_request_failure_returns_none(server, http_client):
+    assert await send_request("get", str(server.make_url("/fail"))) is None
+
+
+@pytest.mark.asyncio
+async def test_send_request_unsupported_type(http_client):
+    with pytest.raises(ValueError):
+        await send_request("delete", "http://localhost/")
+
+
+@pytest.mark.asyncio
+async def test_http_client_reopens_after_close(server, http_client):
+    url = str(server.make_url("/echo"))
+
+    await http_client.close()
+    response = await http_client.request("GET", url)
+
+    assert response.status == 200
+    assert response.json()["query"] == {}
+
+
+@pytest.mark.asyncio
+async def test_send_request_cache_ttl(server, http_client):
+    url = str(server.make_url("/etag"))
+
+    first = await send_request("get", url, cache_ttl=60)
+    second = await send_request("get", url, cache_ttl=60)
+
+    assert first == second == {"version": 1}
+    assert server.etag_requests == 1
+    assert http_client.cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_send_request_cache_revalidates_with_etag(server, http_client):
+    url = str(server.make_url("/etag"))
+
+    assert await send_request("get", url, cache_ttl=0) == {"version": 1}
+    assert await send_request("get", url, cache_ttl=0) == {"version": 1}
+
+    assert server.etag_requests == 2
+    assert http_client.cache.revalidations == 1
+
+
+@pytest.mark.asyncio
+async def test_send_request_cache_coalesces_identical_gets(server, http_client):
+    url = str(server.make_url("/etag"))
+
+    results = await asyncio.gather(
+        *(send_request("get", url, cache_ttl=60) for _ in range(5))
+    )
+
+    assert results == [{"version": 1}] * 5
+    assert server.etag_requests == 1
+
+
+@pytest.mark.asyncio
+async def test_send_request_does_not_cache_failures(server, http_client):
+    url = str(server.make_url("/fail"))
+
+    assert await send_request("get", url, cache_ttl=60) is None
+    assert len(http_client.cache) == 0
@@ -0,0 +1,43 @@
+import pytest
+from igor import codec
+from igor.codec import FACTORIES, get_codec
+
+
+def available():
+    names = []
+    for name in FACTORIES:
+        try:
+            get_codec(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+@pytest.mark.parametrize("name", available())
+def test_codec_round_trips_gateway_payloads(name):
+    json_codec = get_codec(name)
+    payload = {
+        "op": 0,
+        "t": "MESSAGE_CREATE",
+        "s": 42,
+        "d": {"content": "igor echo héllo 👍", "mentions": [], "nonce": None},
+    }
+
+    encoded = json_codec.dumps(payload)
+
+    assert isinstance(encoded, bytes)
+    assert json_codec.loads(encoded) == payload
+    assert json_codec.loads(bytearray(encoded)) == payload
+    assert json_codec.loads(encoded.decode()) == payload
+
+
+@pytest.mark.parametrize("name", available())
+def test_codec_rejects_invalid_json(name):
+    with pytest.raises(ValueError):
+        get_codec(name).loads(b'{"op": ')
+
+
+def test_default_codec_is_fastest_installed():
+    assert codec.codec.name == available()[0]
+    assert codec.loads(b"[1, 2]") == [1, 2]
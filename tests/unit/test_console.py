@@ -1,6 +1,9 @@
+import asyncio
+import os
+import sys
 import pytest
 from unittest.mock import AsyncMock, MagicMock
-from igor.channels.console import Console
+from igor.channels.console import Console, REJECTED
 from igor.event import Event
 from igor.response import Response
 
@@ -31,15 +34,15 @@ async def test_console_channel_start_listening(console_channel, monkeypatch):
 
     monkeypatch.setattr(console_channel, "async_input", mock_async_input)
 
-    # Mock the hub's process_event method
-    console_channel.hub.process_event = AsyncMock()
+    # Mock the hub's submit method
+    console_channel.hub.submit = AsyncMock()
 
     # Run start_listening
     await console_channel.start_listening()
 
-    # Check that process_event was called once with the correct event
-    console_channel.hub.process_event.assert_called_once()
-    called_event = console_channel.hub.process_event.call_args[0][0]
+    # Check that submit was called once with the correct event
+    console_channel.hub.submit.assert_called_once()
+    called_event = console_channel.hub.submit.call_args[0][0]
     assert isinstance(called_event, Event)
     assert called_event.event_type == "message"
     assert called_event.content == "igor test"
@@ -73,3 +76,111 @@ async def test_console_channel_event_conversion(console_channel):
     assert igor_event.event_type == "message"
     assert igor_event.content == "test message"
     assert igor_event.channel == "console"
+
+
+@pytest.mark.asyncio
+async def test_console_async_input_reads_stdin_without_threads(
+    console_channel, monkeypatch
+):
+    read_fd, write_fd = os.pipe()
+    monkeypatch.setattr(sys, "stdin", os.fdopen(read_fd, "r"))
+    os.write(write_fd, b"igor fortune\nq\n")
+    os.close(write_fd)
+
+    assert await console_channel.async_input("> ") == "igor fortune"
+    assert await console_channel.async_input("> ") == "q"
+    assert await console_channel.async_input("> ") is None
+
+
+class BatchHub:
+    """
+    Answers every event after a delay that shrinks with each event, so
+    replies arrive in reverse order.
+    """
+
+    def __init__(self):
+        self.channel = None
+        self.pending = []
+        self.signal_shutdown = MagicMock()
+
+    async def submit(self, event):
+        if "reject" in event.content:
+            return False
+        delay = 0.05 - 0.01 * len(self.pending)
+        self.pending.append(asyncio.create_task(self.answer(event, delay)))
+        return True
+
+    async def answer(self, event, delay):
+        await asyncio.sleep(delay)
+        if "silence" in event.content:
+            self.channel.unanswered(event)
+        else:
+            content = event.content.upper().replace(" ", "\n")
+            response = Response(content=content, channel="console")
+            await self.channel.deliver(event, response)
+
+    async def drain(self):
+        await asyncio.gather(*self.pending)
+
+
+@pytest.mark.asyncio
+async def test_console_batch_mode_writes_replies_in_order(tmp_path, capsys):
+    messages = tmp_path / "messages.txt"
+    messages.write_text("igor one\nnot for igor\nigor two\nigor silence\nigor three\n")
+    hub = BatchHub()
+    hub.channel = Console(hub, mode="batch", input_path=str(messages))
+
+    await hub.channel.start_listening()
+
+    # one line per message for Igor, replies' line breaks escaped
+    assert capsys.readouterr().out == "IGOR\\nONE\nIGOR\\nTWO\n\nIGOR\\nTHREE\n"
+    assert len(hub.pending) == 4
+    hub.signal_shutdown.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_console_batch_mode_writes_error_for_rejected_lines(tmp_path, capsys):
+    messages = tmp_path / "messages.txt"
+    messages.write_text("igor one\nigor reject\nigor two\n")
+    hub = BatchHub()
+    hub.channel = Console(hub, mode="batch", input_path=str(messages))
+
+    await hub.channel.start_listening()
+
+    assert capsys.readouterr().out == f"IGOR\\nONE\n{REJECTED}\nIGOR\\nTWO\n"
+    assert len(hub.pending) == 2
+
+
+@pytest.mark.asyncio
+async def test_console_batch_mode_writes_past_unanswered_lines(capsys):
+    console = Console(MagicMock(), mode="batch")
+    console.expected.extend([0, 1])
+    first = console.channel_event_to_igor_event("igor silence")
+    first.extra["conversation_id"] = 0
+    second = console.channel_event_to_igor_event("igor two")
+    second.extra["conversation_id"] = 1
+
+    await console.send_response(second, Response(content="two", channel="console"))
+    assert capsys.readouterr().out == ""
+
+    # the reply to the second line goes out as soon as the first is done
+    console.unanswered(first)
+    assert capsys.readouterr().out == "\ntwo\n"
+
+
+@pytest.mark.asyncio
+async def test_console_reads_tty_in_thread(console_channel, monkeypatch):
+    pty = pytest.importorskip("pty")
+    controller, terminal = pty.openpty()
+    monkeypatch.setattr(sys, "stdin", os.fdopen(terminal, "r"))
+    os.write(controller, b"igor fortune\n")
+
+    assert await console_channel.async_input("> ") == "igor fortune"
+    # stdout shares the tty, it must stay blocking
+    assert os.get_blocking(terminal)
+    os.close(controller)
+
+
+def test_console_rejects_unknown_mode(hub):
+    with pytest.raises(ValueError):
+        Console(hub, mode="telepathy")
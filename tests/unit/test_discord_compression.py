@@ -0,0 +1,70 @@
+import asyncio
+import json
+import zlib
+import pytest
+from unittest.mock import AsyncMock
+from igor.external.discord_gateway import GatewayShard
+from igor.external.discord_compression import (
+    ZLIB_SUFFIX,
+    ZlibStreamInflator,
+    gateway_url,
+)
+
+
+def compressed_stream(*messages):
+    # compress like the gateway: one stream, flushed after every message
+    deflator = zlib.compressobj()
+    return [
+        deflator.compress(json.dumps(message).encode())
+        + deflator.flush(zlib.Z_SYNC_FLUSH)
+        for message in messages
+    ]
+
+
+def test_gateway_url_requests_zlib_stream():
+    assert (
+        gateway_url("wss://gateway.discord.gg")
+        == "wss://gateway.discord.gg/?v=10&encoding=json&compress=zlib-stream"
+    )
+
+
+def test_inflator_keeps_context_across_messages():
+    messages = [{"op": 0, "t": "MESSAGE_CREATE", "d": {"content": "igor"}}] * 3
+    frames = compressed_stream(*messages)
+    inflator = ZlibStreamInflator()
+
+    decoded = [json.loads(inflator.feed(frame)) for frame in frames]
+
+    assert decoded == messages
+    # the repeated messages are only back-references into the stream
+    assert len(frames[2]) < len(frames[0])
+    assert inflator.ratio() > 1
+
+
+def test_inflator_joins_split_frames():
+    (frame,) = compressed_stream({"op": 10, "d": {"heartbeat_interval": 41250}})
+    inflator = ZlibStreamInflator()
+
+    assert frame.endswith(ZLIB_SUFFIX)
+    assert inflator.feed(frame[:5]) is None
+    assert inflator.feed(frame[5:-2]) is None
+    assert json.loads(inflator.feed(frame[-2:])) == {
+        "op": 10,
+        "d": {"heartbeat_interval": 41250},
+    }
+
+
+def test_inflator_passes_text_frames_through():
+    assert ZlibStreamInflator().feed('{"op": 11}') == '{"op": 11}'
+
+
+@pytest.mark.asyncio
+async def test_gateway_shard_recv_decompresses_gateway_messages():
+    frames = compressed_stream({"op": 10, "d": {}}, {"op": 11})
+    shard = GatewayShard("token", asyncio.Queue())
+    shard.inflator = ZlibStreamInflator()
+    shard.websocket = AsyncMock()
+    shard.websocket.recv.side_effect = [frames[0][:3], frames[0][3:], frames[1]]
+
+    assert await shard.recv() == {"op": 10, "d": {}}
+    assert await shard.recv() == {"op": 11}
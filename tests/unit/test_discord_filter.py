@@ -0,0 +1,104 @@
+import asyncio
+import zlib
+import pytest
+from unittest.mock import AsyncMock
+from igor import codec
+from igor.external.discord_gateway import GatewayShard
+from igor.external.discord_compression import ZlibStreamInflator
+from igor.external.discord_filter import GatewayFilter
+
+
+def dispatch(event_type, sequence, **d):
+    return codec.dumps({"t": event_type, "s": sequence, "op": 0, "d": d})
+
+
+def test_filter_skips_dispatches_without_interest():
+    gateway_filter = GatewayFilter()
+    gateway_filter.add("MESSAGE_CREATE", content_prefix="igor")
+
+    assert gateway_filter.inspect(dispatch("TYPING_START", 7, user_id="1")) == (
+        True,
+        7,
+    )
+    assert gateway_filter.inspect(dispatch("MESSAGE_CREATE", 8, content="hi")) == (
+        True,
+        8,
+    )
+    assert gateway_filter.skipped == 2
+
+
+def test_filter_keeps_interesting_and_required_frames():
+    gateway_filter = GatewayFilter()
+    gateway_filter.add("MESSAGE_CREATE", content_prefix="igor")
+
+    assert not gateway_filter.inspect(
+        dispatch("MESSAGE_CREATE", 1, content="Igor fortune")
+    )[0]
+    assert not gateway_filter.inspect(dispatch("READY", 1, session_id="abc"))[0]
+    assert not gateway_filter.inspect(codec.dumps({"op": 11, "d": None}))[0]
+
+
+def test_filter_decodes_frames_it_cannot_inspect():
+    gateway_filter = GatewayFilter()
+    gateway_filter.add("MESSAGE_CREATE")
+
+    # d before the top level keys: "t" inside d must not be trusted
+    frame = codec.dumps({"d": {"t": "TYPING_START"}, "op": 0, "t": "MESSAGE_CREATE"})
+
+    assert gateway_filter.inspect(frame) == (False, None)
+
+
+def test_filter_checks_decoded_content_exactly():
+    gateway_filter = GatewayFilter()
+    gateway_filter.add("MESSAGE_CREATE", content_prefix="igor")
+    quoted = codec.loads(
+        dispatch(
+            "MESSAGE_CREATE",
+            3,
+            content="what did igor say?",
+            referenced_message={"content": "igor fortune"},
+        )
+    )
+
+    # the quoted message lets the frame through, the exact check drops it
+    assert not gateway_filter.inspect(codec.dumps(quoted))[0]
+    assert not gateway_filter.accepts(quoted)
+
+
+def test_filter_without_interests_keeps_messages():
+    gateway_filter = GatewayFilter()
+
+    assert not gateway_filter.inspect(dispatch("MESSAGE_CREATE", 1, content="x"))[0]
+    assert gateway_filter.inspect(dispatch("PRESENCE_UPDATE", 2))[0]
+
+
+@pytest.mark.asyncio
+async def test_gateway_shard_queues_only_interesting_messages():
+    gateway_filter = GatewayFilter()
+    gateway_filter.add("MESSAGE_CREATE", content_prefix="igor")
+    shard = GatewayShard("token", asyncio.Queue(), gateway_filter)
+    shard.inflator = ZlibStreamInflator()
+    deflator = zlib.compressobj()
+    frames = [
+        deflator.compress(message) + deflator.flush(zlib.Z_SYNC_FLUSH)
+        for message in [
+            dispatch("PRESENCE_UPDATE", 1, status="online"),
+            dispatch("MESSAGE_CREATE", 2, content="lol"),
+            dispatch("MESSAGE_CREATE", 3, content="igor echo hi"),
+            dispatch("TYPING_START", 4),
+        ]
+    ]
+    shard.websocket = AsyncMock()
+    shard.websocket.recv.side_effect = [
+        *frames,
+        # receive() survives errors, stop it by cancelling
+        asyncio.CancelledError(),
+    ]
+
+    with pytest.raises(asyncio.CancelledError):
+        await shard.receive()
+
+    assert shard.event_queue.qsize() == 1
+    assert (await shard.event_queue.get())["d"]["content"] == "igor echo hi"
+    assert shard.sequence_number == 4
+    assert shard.gateway_filter.skipped == 3
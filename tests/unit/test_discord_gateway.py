@@ -0,0 +1,317 @@
+import asyncio
+import json
+import queue
+import threading
+import pytest
+from unittest.mock import AsyncMock, patch
+from igor.external.discord_api import DiscordAPI, read_process_queue
+from igor.external.discord_compression import ZlibStreamInflator
+from igor.external.discord_gateway import (
+    GatewayReconnect,
+    GatewayShard,
+    IdentifyLimiter,
+    SharedIdentifyLimiter,
+    shards_for_process,
+)
+from igor.utils import op
+
+GATEWAY_BOT = {
+    "url": "wss://gateway.discord.gg",
+    "shards": 4,
+    "session_start_limit": {"max_concurrency": 2},
+}
+SEND_REQUEST = "igor.external.discord_api.send_request"
+
+
+def test_shards_for_process_spreads_shards_evenly():
+    assigned = [shards_for_process(10, 3, index) for index in range(3)]
+
+    assert assigned == [[0, 3, 6, 9], [1, 4, 7], [2, 5, 8]]
+
+
+@pytest.mark.asyncio
+async def test_identify_limiter_spaces_shards_sharing_a_key():
+    limiter = IdentifyLimiter(max_concurrency=2, interval=0.05)
+    loop = asyncio.get_running_loop()
+    identified = {}
+
+    async def identify(shard_id):
+        await limiter.wait(shard_id)
+        identified[shard_id] = loop.time()
+
+    start = loop.time()
+    await asyncio.gather(*(identify(shard_id) for shard_id in range(4)))
+
+    # shards 0 and 1 have different keys and go at once, 2 and 3 wait
+    assert identified[0] - start < 0.04 and identified[1] - start < 0.04
+    assert identified[2] - identified[0] >= 0.045
+    assert identified[3] - identified[1] >= 0.045
+
+
+@pytest.mark.asyncio
+async def test_shared_identify_limiter_spaces_shards():
+    limiter = SharedIdentifyLimiter(max_concurrency=1, interval=0.05)
+    loop = asyncio.get_running_loop()
+
+    start = loop.time()
+    await limiter.wait(0)
+    await limiter.wait(1)
+
+    assert loop.time() - start >= 0.045
+
+
+@pytest.mark.asyncio
+async def test_gateway_shard_identifies_with_its_shard():
+    shard = GatewayShard("token", asyncio.Queue(), shard_id=3, shard_count=4)
+    shard.websocket = AsyncMock()
+
+    await shard.identify()
+
+    payload = json.loads(shard.websocket.send.await_args.args[0])
+    assert payload["d"]["shard"] == [3, 4]
+
+
+@pytest.mark.asyncio
+async def test_discord_api_connects_recommended_shards():
+    api = DiscordAPI("token")
+
+    with (
+        patch(SEND_REQUEST, AsyncMock(return_value=GATEWAY_BOT)) as send_request,
+        patch.object(GatewayShard, "connect", AsyncMock()) as connect,
+    ):
+        await api.connect()
+
+    assert sorted(api.shards) == [0, 1, 2, 3]
+    assert all(shard.shard_count == 4 for shard in api.shards.values())
+    assert all(shard.event_queue is api.event_queue for shard in api.shards.values())
+    connect.assert_awaited_with("wss://gateway.discord.gg")
+    # /gateway/bot goes through the response cache
+    assert send_request.await_args.kwargs["cache_ttl"] == 3600
+    assert api.shards[1].identify_limiter.max_concurrency == 2
+
+
+@pytest.mark.asyncio
+async def test_discord_api_runs_chosen_shards():
+    api = DiscordAPI("token")
+
+    with (
+        patch(SEND_REQUEST, AsyncMock(return_value=GATEWAY_BOT)),
+        patch.object(GatewayShard, "connect", AsyncMock()),
+    ):
+        await api.connect(shard_count=8, shard_ids=[5, 7])
+
+    assert sorted(api.shards) == [5, 7]
+    assert api.shards[5].shard_count == 8
+
+
+@pytest.mark.asyncio
+async def test_discord_api_cancels_other_shards_when_one_fails():
+    api = DiscordAPI("token")
+    cancelled = []
+
+    async def connect(shard, url):
+        if shard.shard_id == 0:
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(shard.shard_id)
+            raise
+
+    with (
+        patch(SEND_REQUEST, AsyncMock(return_value=GATEWAY_BOT)),
+        patch.object(GatewayShard, "connect", connect),
+    ):
+        with pytest.raises(RuntimeError):
+            await api.connect()
+
+    assert sorted(cancelled) == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_read_process_queue_forwards_messages():
+    out_queue = queue.Queue()
+    inbox = asyncio.Queue()
+    stop = threading.Event()
+    reader = threading.Thread(
+        target=read_process_queue,
+        args=(out_queue, asyncio.get_running_loop(), inbox, stop),
+    )
+    reader.start()
+
+    out_queue.put(("event", {"content": "igor echo"}))
+    out_queue.put(("health", []))
+    try:
+        assert await asyncio.wait_for(inbox.get(), 1) == (
+            "event",
+            {"content": "igor echo"},
+        )
+        assert await asyncio.wait_for(inbox.get(), 1) == ("health", [])
+    finally:
+        stop.set()
+        await asyncio.to_thread(reader.join)
+
+
+def test_discord_api_health_includes_worker_shards():
+    api = DiscordAPI("token")
+    api.shards = {0: GatewayShard("token", None, shard_id=0)}
+    api.shards[0].latency = 0.1
+    api.shard_health = {1: {"shard_id": 1, "state": "ready", "latency": 0.3}}
+
+    health = api.health()
+
+    assert health[0]["state"] == "disconnected"
+    assert health[1]["state"] == "ready"
+    assert api.latency == pytest.approx(0.2)
+
+
+class FakeWebSocket:
+    def __init__(self, messages):
+        self.messages = asyncio.Queue()
+        for message in messages:
+            self.messages.put_nowait(json.dumps(message))
+        self.sent = []
+        self.closed_with = None
+
+    async def recv(self):
+        return await self.messages.get()
+
+    async def send(self, data):
+        self.sent.append(json.loads(data))
+
+    async def close(self, code=1000, reason=""):
+        self.closed_with = code
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+def fake_gateway(shard, *connections):
+    opened = []
+
+    def open_gateway(url):
+        shard.inflator = ZlibStreamInflator()
+        websocket = connections[len(opened)]
+        opened.append((url, websocket))
+        return websocket
+
+    shard.open_gateway = open_gateway
+    return opened
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_detects_zombie_connection():
+    shard = GatewayShard("token", asyncio.Queue())
+    shard.websocket = FakeWebSocket([])
+    shard.heartbeat_interval = 10
+
+    with pytest.raises(GatewayReconnect) as reconnect:
+        await shard.heartbeat()
+
+    assert reconnect.value.resumable
+    assert shard.missed_acks == 1
+    assert [message["op"] for message in shard.websocket.sent] == [op.HEARTBEAT]
+
+
+@pytest.mark.asyncio
+async def test_first_heartbeat_is_jittered():
+    shard = GatewayShard("token", asyncio.Queue())
+    shard.websocket = FakeWebSocket([])
+    shard.heartbeat_interval = 100
+    loop = asyncio.get_running_loop()
+
+    with patch("igor.external.discord_gateway.random.random", return_value=0.5):
+        start = loop.time()
+        task = asyncio.create_task(shard.heartbeat())
+        while not shard.websocket.sent:
+            await asyncio.sleep(0.005)
+        elapsed = loop.time() - start
+        task.cancel()
+
+    assert 0.045 <= elapsed < 0.09
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_ack_records_latency():
+    shard = GatewayShard("token", asyncio.Queue())
+    shard.websocket = FakeWebSocket([])
+    shard.latencies.extend([0.01, 0.02, 0.03, 0.5])
+
+    await shard.send_heartbeat()
+    await shard.handle_frame(json.dumps({"op": op.HEARTBEAT_ACK}))
+
+    assert shard.heartbeat_acked
+    assert shard.latency == shard.latencies[-1]
+    assert shard.latency_percentile(99) == 0.5
+    assert shard.health()["latency_p50"] == 0.02
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_request_is_answered_immediately():
+    shard = GatewayShard("token", asyncio.Queue())
+    shard.websocket = FakeWebSocket([])
+    shard.sequence_number = 41
+
+    await shard.handle_frame(json.dumps({"op": op.HEARTBEAT, "d": None}))
+
+    assert shard.websocket.sent == [{"op": op.HEARTBEAT, "d": 41}]
+
+
+@pytest.mark.asyncio
+async def test_invalid_session_is_not_resumed():
+    shard = GatewayShard("token", asyncio.Queue())
+
+    with patch("igor.external.discord_gateway.random.uniform", return_value=0):
+        with pytest.raises(GatewayReconnect) as reconnect:
+            await shard.handle_frame(json.dumps({"op": op.INVALID_SESSION, "d": False}))
+    assert not reconnect.value.resumable
+
+    with pytest.raises(GatewayReconnect) as reconnect:
+        await shard.handle_frame(json.dumps({"op": op.RECONNECT, "d": None}))
+    assert reconnect.value.resumable
+
+
+@pytest.mark.asyncio
+async def test_shard_resumes_after_zombie_connection():
+    shard = GatewayShard("token", asyncio.Queue(), identify_limiter=IdentifyLimiter())
+    hello = {"op": op.HELLO, "d": {"heartbeat_interval": 20}}
+    ready = {
+        "op": op.DISPATCH,
+        "t": "READY",
+        "s": 1,
+        "d": {"session_id": "abc", "resume_gateway_url": "wss://resume.discord.gg"},
+    }
+    # the first connection never acknowledges a heartbeat
+    zombie = FakeWebSocket([hello, ready])
+    fresh = FakeWebSocket([hello])
+    opened = fake_gateway(shard, zombie, fresh)
+
+    task = asyncio.create_task(shard.connect("wss://gateway.discord.gg"))
+    while len(opened) < 2 or not fresh.sent:
+        await asyncio.sleep(0.005)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    assert zombie.closed_with == 4000
+    assert opened[1][0] == "wss://resume.discord.gg"
+    assert fresh.sent[0] == {
+        "op": op.RESUME,
+        "d": {"token": "token", "session_id": "abc", "seq": 1},
+    }
+    assert shard.reconnects == 1
+
+
+@pytest.mark.asyncio
+async def test_discord_api_sheds_oldest_events_when_behind():
+    api = DiscordAPI("token", queue_size=2)
+    for sequence in range(3):
+        await api.event_queue.put({"s": sequence})
+
+    assert (await api.get_next_event())["s"] == 1
+    stats = api.queue_stats()
+    assert stats["dropped"] == 1
+    assert stats["depth"] == 1
@@ -0,0 +1,184 @@
+import asyncio
+import pytest
+from multidict import CIMultiDict
+from igor.client import HttpResponse
+from igor.external.discord_ratelimit import (
+    GlobalLimiter,
+    RateLimiter,
+    major_parameters,
+    route_key,
+)
+
+
+def response(status=200, **headers):
+    return HttpResponse(
+        status,
+        b"{}",
+        CIMultiDict({k.replace("_", "-"): str(v) for k, v in headers.items()}),
+    )
+
+
+def limited(remaining, reset_after=0.05, limit=2, bucket="abc", status=200):
+    return response(
+        status,
+        **{
+            "X-RateLimit-Bucket": bucket,
+            "X-RateLimit-Limit": limit,
+            "X-RateLimit-Remaining": remaining,
+            "X-RateLimit-Reset-After": reset_after,
+        },
+    )
+
+
+def test_route_key_keeps_major_parameters():
+    assert route_key("post", "channels/1/messages") == "POST channels/1/messages"
+    assert (
+        route_key("delete", "/channels/1/messages/99")
+        == "DELETE channels/1/messages/{id}"
+    )
+    assert major_parameters("guilds/5/members/7") == ("5",)
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_waits_for_bucket_reset():
+    limiter = RateLimiter()
+    loop = asyncio.get_running_loop()
+    sent_at = []
+    remaining = iter([1, 0, 1, 0])
+
+    async def send():
+        sent_at.append(loop.time())
+        return limited(next(remaining), reset_after=0.05)
+
+    for _ in range(3):
+        await limiter.request("post", "channels/1/messages", send)
+
+    # two requests fit in the first window, the third waits for the reset
+    assert sent_at[2] - sent_at[0] >= 0.045
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_sends_concurrently_within_limit():
+    limiter = RateLimiter()
+    inflight = 0
+    peak = 0
+    remaining = iter(range(10, 0, -1))
+
+    async def send():
+        nonlocal inflight, peak
+        inflight += 1
+        peak = max(peak, inflight)
+        await asyncio.sleep(0.01)
+        inflight -= 1
+        return limited(next(remaining), limit=10, reset_after=5)
+
+    # the first request discovers the limit, the rest can go out together
+    await limiter.request("post", "channels/1/messages", send)
+    await asyncio.gather(
+        *(limiter.request("post", "channels/1/messages", send) for _ in range(5))
+    )
+
+    assert peak == 5
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_retries_after_429():
+    limiter = RateLimiter()
+    responses = iter(
+        [
+            limited(0, status=429, reset_after=0.01, **{}),
+            limited(1),
+        ]
+    )
+
+    async def send():
+        return next(responses)
+
+    result = await limiter.request("post", "channels/1/messages", send)
+
+    assert result.status == 200
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_shares_buckets_by_hash():
+    limiter = RateLimiter()
+
+    async def send():
+        return limited(1, bucket="shared")
+
+    await limiter.request("post", "channels/1/messages", send)
+    await limiter.request("patch", "channels/1/messages/5", send)
+
+    assert limiter.bucket("post", "channels/1/messages") is limiter.bucket(
+        "patch", "channels/1/messages/6"
+    )
+    assert limiter.bucket("post", "channels/1/messages") is not limiter.bucket(
+        "post", "channels/2/messages"
+    )
+
+
+@pytest.mark.asyncio
+async def test_global_limiter_spaces_requests():
+    limiter = GlobalLimiter(rate=100)
+    limiter.tokens = 0
+    loop = asyncio.get_running_loop()
+
+    start = loop.time()
+    for _ in range(3):
+        await limiter.acquire()
+
+    assert loop.time() - start >= 0.025
+
+
+@pytest.mark.asyncio
+async def test_global_limiter_block():
+    limiter = GlobalLimiter()
+    loop = asyncio.get_running_loop()
+    limiter.block(0.02)
+
+    start = loop.time()
+    await limiter.acquire()
+
+    assert loop.time() - start >= 0.015
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_recovers_from_429_with_only_retry_after():
+    limiter = RateLimiter()
+    responses = iter(
+        [response(429, **{"Retry-After": 0.05}), response(200), response(200)]
+    )
+
+    async def send():
+        return next(responses)
+
+    first = await asyncio.wait_for(
+        limiter.request("post", "channels/1/messages", send), 1
+    )
+    second = await asyncio.wait_for(
+        limiter.request("post", "channels/1/messages", send), 1
+    )
+
+    assert (first.status, second.status) == (200, 200)
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_gives_back_capacity_of_failed_requests():
+    limiter = RateLimiter()
+    await limiter.request("post", "channels/1/messages", _limited_send(1))
+    bucket = limiter.bucket("post", "channels/1/messages")
+
+    async def fail():
+        raise ConnectionError("reset")
+
+    with pytest.raises(ConnectionError):
+        await limiter.request("post", "channels/1/messages", fail)
+
+    assert (bucket.remaining, bucket.inflight) == (1, 0)
+
+
+def _limited_send(remaining):
+    async def send():
+        return limited(remaining, reset_after=10)
+
+    return send
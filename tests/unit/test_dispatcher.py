@@ -0,0 +1,164 @@
+import asyncio
+import pytest
+from igor.dispatcher import LaneDispatcher, conversation_key
+from igor.event import Event
+
+
+def make_event(content, channel="discord", **extra):
+    return Event(event_type="message", content=content, channel=channel, extra=extra)
+
+
+def test_conversation_key():
+    assert conversation_key(make_event("a", discord_channel_id="1")) == (
+        "discord",
+        "1",
+    )
+    assert conversation_key(make_event("a", channel="telegram", chat_id=5)) == (
+        "telegram",
+        5,
+    )
+    assert conversation_key(make_event("a", channel="console")) == ("console", None)
+
+
+async def settle(dispatcher):
+    """
+    Waits until the dispatcher has handled every submitted event.
+    """
+    async with asyncio.timeout(1):
+        while len(dispatcher):
+            await asyncio.sleep(0.001)
+
+
+@pytest.mark.asyncio
+async def test_lane_dispatcher_serializes_same_conversation():
+    dispatcher = LaneDispatcher()
+    order = []
+
+    async def handler(event):
+        order.append(f"start {event.content}")
+        await asyncio.sleep(0.01)
+        order.append(f"end {event.content}")
+
+    await dispatcher.submit(make_event("1", discord_channel_id="a"), handler)
+    await dispatcher.submit(make_event("2", discord_channel_id="a"), handler)
+    await settle(dispatcher)
+
+    assert order == ["start 1", "end 1", "start 2", "end 2"]
+
+
+def distinct_lanes(dispatcher, count):
+    """
+    Returns events of conversations hashed to different lanes.
+    """
+    events = {}
+    conversation = 0
+    while len(events) < count:
+        event = make_event("x", discord_channel_id=str(conversation))
+        events.setdefault(dispatcher.lane(event), event)
+        conversation += 1
+    return list(events.values())
+
+
+@pytest.mark.asyncio
+async def test_lane_dispatcher_runs_conversations_in_parallel():
+    dispatcher = LaneDispatcher(lanes=8)
+    running = 0
+    peak = 0
+
+    async def handler(event):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    for event in distinct_lanes(dispatcher, 5):
+        await dispatcher.submit(event, handler)
+    await settle(dispatcher)
+
+    assert peak == 5
+    dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_lane_dispatcher_submit_does_not_wait_for_busy_lane():
+    dispatcher = LaneDispatcher(lanes=4)
+    busy, other = distinct_lanes(dispatcher, 2)
+    release = asyncio.Event()
+    handled = []
+
+    async def handler(event):
+        if event is busy:
+            await release.wait()
+        handled.append(event)
+
+    # a burst in one conversation is queued in its lane without blocking
+    for _ in range(10):
+        await asyncio.wait_for(dispatcher.submit(busy, handler), timeout=0.1)
+    await dispatcher.submit(other, handler)
+    await asyncio.sleep(0.01)
+
+    assert handled == [other]
+    assert len(dispatcher) == 10
+
+    release.set()
+    await asyncio.sleep(0.01)
+    assert len(handled) == 11
+    assert len(dispatcher) == 0
+    dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_lane_dispatcher_waits_at_capacity():
+    dispatcher = LaneDispatcher(lanes=4, capacity=1)
+    release = asyncio.Event()
+
+    async def handler(event):
+        await release.wait()
+
+    await dispatcher.submit(make_event("1", chat_id=1), handler)
+    second = asyncio.create_task(dispatcher.submit(make_event("2", chat_id=2), handler))
+    await asyncio.sleep(0.01)
+    assert not second.done()
+
+    release.set()
+    await asyncio.wait_for(second, timeout=1.0)
+    dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_lane_dispatcher_keeps_lane_going_after_error():
+    dispatcher = LaneDispatcher()
+    handled = []
+
+    async def handler(event):
+        handled.append(event.content)
+        if event.content == "1":
+            raise RuntimeError("boom")
+
+    # the error is logged, the events after it are still handled
+    for content in ("1", "2", "3"):
+        await dispatcher.submit(make_event(content, chat_id=1), handler)
+    await settle(dispatcher)
+
+    assert handled == ["1", "2", "3"]
+    assert len(dispatcher) == 0
+    dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_lane_dispatcher_records_lane_waits():
+    dispatcher = LaneDispatcher(lanes=1)
+
+    async def handler(event):
+        await asyncio.sleep(0.02)
+
+    assert dispatcher.wait_percentile(99) is None
+    await dispatcher.submit(make_event("1", chat_id=1), handler)
+    await dispatcher.submit(make_event("2", chat_id=1), handler)
+    await settle(dispatcher)
+
+    # the second event waited for the first one in the lane
+    assert dispatcher.wait_percentile(0) < 0.01
+    assert dispatcher.wait_percentile(100) >= 0.015
+    dispatcher.close()
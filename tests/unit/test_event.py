@@ -0,0 +1,51 @@
+import pickle
+import pytest
+from igor.event import Event, is_for_igor
+from igor.response import Response
+
+
+def test_event_is_normalized_once():
+    event = Event("message", "Igor Echo Hello  World", "console")
+
+    assert event.tokens == ["igor", "echo", "hello", "world"]
+    # until a trigger matched, the arguments are the whole content
+    assert event.args == "Igor Echo Hello  World"
+
+
+@pytest.mark.parametrize(
+    "content, count, args",
+    [
+        ("Igor Echo Hello  World", 2, "Hello  World"),
+        ("igor   cat pic Please", 3, "Please"),
+        ("igor cat pic", 3, ""),
+        ("hello igor", 0, "hello igor"),
+    ],
+)
+def test_event_args_after(content, count, args):
+    assert Event("message", content, "console").args_after(count) == args
+
+
+def test_event_and_response_have_slots():
+    event = Event("message", "igor echo hi", "console")
+    with pytest.raises(AttributeError):
+        event.context = []
+    with pytest.raises(AttributeError):
+        Response("hi", "console").context = []
+
+
+def test_event_pickles_with_derived_fields():
+    event = Event("message", "igor echo Hi", "console", extra={"chat_id": 1})
+
+    event.args = event.args_after(2)
+    copy = pickle.loads(pickle.dumps(event))
+
+    assert copy == event
+    assert copy.args == "Hi"
+    assert copy.tokens == ["igor", "echo", "hi"]
+
+
+def test_is_for_igor():
+    assert is_for_igor("Igor help")
+    assert is_for_igor("IGOR")
+    assert not is_for_igor("igo")
+    assert not is_for_igor("help igor")
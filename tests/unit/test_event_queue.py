@@ -0,0 +1,93 @@
+import asyncio
+import pytest
+from igor.event_queue import EventQueue
+
+
+def test_event_queue_rejects_unknown_policy():
+    with pytest.raises(ValueError):
+        EventQueue(maxsize=1, overflow="explode")
+
+
+@pytest.mark.asyncio
+async def test_event_queue_fifo():
+    queue = EventQueue(maxsize=3)
+    for item in range(3):
+        assert await queue.put(item)
+
+    assert [await queue.get() for _ in range(3)] == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_event_queue_block_waits_for_free_slot():
+    queue = EventQueue(maxsize=1, overflow="block")
+    await queue.put("first")
+
+    put_task = asyncio.create_task(queue.put("second"))
+    await asyncio.sleep(0)
+    assert not put_task.done()
+
+    assert await queue.get() == "first"
+    assert await asyncio.wait_for(put_task, timeout=1.0)
+    assert await queue.get() == "second"
+
+
+@pytest.mark.asyncio
+async def test_event_queue_drop_oldest():
+    queue = EventQueue(maxsize=2, overflow="drop_oldest")
+    for item in range(3):
+        assert await queue.put(item)
+
+    assert queue.dropped == 1
+    assert [await queue.get() for _ in range(2)] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_event_queue_reject():
+    queue = EventQueue(maxsize=1, overflow="reject")
+
+    assert await queue.put("first")
+    assert not await queue.put("second")
+    assert queue.rejected == 1
+    assert await queue.get() == "first"
+
+
+@pytest.mark.asyncio
+async def test_event_queue_join():
+    queue = EventQueue(maxsize=2)
+    await queue.put("item")
+
+    join_task = asyncio.create_task(queue.join())
+    await asyncio.sleep(0)
+    assert not join_task.done()
+
+    await queue.get()
+    queue.task_done()
+    await asyncio.wait_for(join_task, timeout=1.0)
+
+
+@pytest.mark.asyncio
+async def test_event_queue_drop_newest():
+    queue = EventQueue(maxsize=1, overflow="drop_newest")
+
+    assert await queue.put("first")
+    assert not await queue.put("second")
+    assert queue.stats()["rejected"] == 1
+    assert await queue.get() == "first"
+
+
+@pytest.mark.asyncio
+async def test_event_queue_records_wait_time():
+    queue = EventQueue(maxsize=4)
+    await queue.put("stale")
+    await asyncio.sleep(0.02)
+    await queue.put("fresh")
+
+    await queue.get()
+    assert queue.last_wait >= 0.02
+    await queue.get()
+    assert queue.last_wait < 0.02
+
+    stats = queue.stats()
+    assert stats["depth"] == 0
+    assert stats["wait_p99"] >= 0.02
+    assert stats["wait_p50"] is not None
@@ -0,0 +1,56 @@
+import os
+import threading
+import pytest
+from igor.executors import Executors, ASYNC, THREAD, PROCESS, handle_in_process
+
+
+class PidReactor:
+    instances = 0
+
+    def __init__(self, hub):
+        self.hub = hub
+        PidReactor.instances += 1
+
+    def handle(self, event):
+        return (os.getpid(), event, PidReactor.instances)
+
+
+@pytest.fixture
+def executors():
+    executors = Executors(thread_workers=2, process_workers=1)
+    yield executors
+    executors.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_executors_run_in_thread(executors):
+    thread_name = await executors.run(THREAD, lambda: threading.current_thread().name)
+
+    assert thread_name != threading.current_thread().name
+    assert thread_name.startswith("igor")
+
+
+@pytest.mark.asyncio
+async def test_executors_run_in_process(executors):
+    pid, event, instances = await executors.run(
+        PROCESS, handle_in_process, PidReactor, "event"
+    )
+    _, _, instances_again = await executors.run(
+        PROCESS, handle_in_process, PidReactor, "event"
+    )
+
+    assert pid != os.getpid()
+    assert event == "event"
+    # the reactor is built once per pool process and then reused
+    assert instances == instances_again == 1
+
+
+def test_executors_have_no_async_pool(executors):
+    with pytest.raises(ValueError):
+        executors.pool(ASYNC)
+
+
+def test_executors_shutdown_is_idempotent(executors):
+    executors.pool(THREAD)
+    executors.shutdown()
+    executors.shutdown()
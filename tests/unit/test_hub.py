@@ -1,9 +1,13 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock
 import asyncio
+import os
+import threading
+import igor.hub
 from igor.hub import Hub
 from igor.event import Event
 from igor.response import Response
+from igor.registry import LazyReactor
 
 
 @pytest.fixture
@@ -99,6 +103,18 @@ async def test_hub_process_event_no_handler(hub):
     hub.send_channel_response.assert_not_called()
 
 
+@pytest.mark.asyncio
+async def test_hub_process_event_tells_channel_about_unanswered_event(hub):
+    channel = MagicMock()
+    hub.channels = {"test_channel": channel}
+    hub.reactors = []
+    event = Event(event_type="message", content="igor what", channel="test_channel")
+
+    await hub.process_event(event)
+
+    channel.unanswered.assert_called_once_with(event)
+
+
 @pytest.mark.asyncio
 async def test_hub_start(hub, monkeypatch):
     mock_channel = AsyncMock()
@@ -129,3 +145,317 @@ async def test_hub_signal_shutdown(hub):
     assert hub.shutdown_event.is_set()
     for task in hub.tasks:
         task.cancel.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_hub_process_event_routes_by_trigger(hub):
+    event = Event(event_type="message", content="igor echo hi", channel="test_channel")
+    fortune = MagicMock(triggers=("igor fortune",), event_types=("message",))
+    echo = MagicMock(triggers=("igor echo",), event_types=("message",))
+    echo.handle = AsyncMock(return_value=Response(content="hi", channel="test_channel"))
+    hub.register_reactor(fortune)
+    hub.register_reactor(echo)
+
+    await hub.process_event(event)
+
+    fortune.can_handle.assert_not_called()
+    fortune.handle.assert_not_called()
+    echo.can_handle.assert_not_called()
+    echo.handle.assert_awaited_once_with(event)
+    hub.send_channel_response.assert_awaited_once_with(event, echo.handle.return_value)
+
+
+@pytest.mark.asyncio
+async def test_hub_submit_processes_events_concurrently(hub):
+    started = []
+    release = asyncio.Event()
+
+    async def slow_process_event(event):
+        started.append(event)
+        await release.wait()
+
+    hub.process_event = slow_process_event
+    worker = asyncio.create_task(hub.worker())
+
+    first = Event(
+        event_type="message",
+        content="igor one",
+        channel="test_channel",
+        extra={"chat_id": 1},
+    )
+    # a chat on another lane than the first one, chat ids are hashed
+    second = next(
+        event
+        for event in (
+            Event(
+                event_type="message",
+                content="igor two",
+                channel="test_channel",
+                extra={"chat_id": chat_id},
+            )
+            for chat_id in range(2, 100)
+        )
+        if hub.lanes.lane(event) != hub.lanes.lane(first)
+    )
+    assert await hub.submit(first)
+    assert await hub.submit(second)
+
+    await asyncio.sleep(0.01)
+    assert started == [first, second]
+
+    release.set()
+    await asyncio.wait_for(hub.drain(), timeout=1.0)
+
+    worker.cancel()
+    hub.lanes.close()
+    await asyncio.gather(worker, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_hub_keeps_conversation_order(hub):
+    processed = []
+
+    async def process_event(event):
+        # later events finish faster, so only the lane keeps them in order
+        await asyncio.sleep(0.03 - 0.01 * int(event.content))
+        processed.append(event.content)
+
+    hub.process_event = process_event
+    worker = asyncio.create_task(hub.worker())
+
+    for content in ("0", "1", "2"):
+        await hub.submit(
+            Event(
+                event_type="message",
+                content=content,
+                channel="discord",
+                extra={"discord_channel_id": "1234"},
+            )
+        )
+    await asyncio.wait_for(hub.drain(), timeout=1.0)
+
+    assert processed == ["0", "1", "2"]
+    assert len(hub.lanes) == 0
+
+    worker.cancel()
+    hub.lanes.close()
+    await asyncio.gather(worker, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_hub_submit_rejects_when_full(tmp_path):
+    config = tmp_path / "config.toml"
+    config.write_text(
+        """
+[hub]
+queue_size = 1
+overflow = "reject"
+        """
+    )
+    hub = Hub(str(config))
+    event = Event(event_type="message", content="igor echo", channel="test_channel")
+
+    assert await hub.submit(event)
+    assert not await hub.submit(event)
+
+
+@pytest.mark.asyncio
+async def test_hub_run_reactor_sync_handler(hub):
+    reactor = MagicMock(execution="async")
+    reactor.handle = MagicMock(return_value="sync response")
+
+    assert await hub.run_reactor(reactor, "event") == "sync response"
+
+
+@pytest.mark.asyncio
+async def test_hub_run_reactor_in_thread(hub):
+    reactor = MagicMock(execution="thread")
+    reactor.handle = lambda event: threading.current_thread().name
+
+    try:
+        thread_name = await hub.run_reactor(reactor, "event")
+    finally:
+        hub.executors.shutdown()
+
+    assert thread_name != threading.current_thread().name
+
+
+@pytest.mark.asyncio
+async def test_hub_defers_reactors_with_configured_triggers(tmp_path, monkeypatch):
+    config = tmp_path / "config.toml"
+    config.write_text(
+        """
+[reactors.fortune]
+class = "Fortune"
+triggers = ["igor fortune"]
+        """
+    )
+    hub = Hub(str(config))
+    hub.send_channel_response = AsyncMock()
+    reactor = MagicMock()
+    reactor.handle = AsyncMock(return_value=Response("fortune", "test_channel"))
+    get_class_by_name = MagicMock(return_value=lambda hub: reactor)
+    monkeypatch.setattr(hub, "get_class_by_name", get_class_by_name)
+
+    hub.initialize_reactors()
+    get_class_by_name.assert_not_called()
+
+    await hub.process_event(Event("message", "igor fortune", "test_channel"))
+    await hub.process_event(Event("message", "igor fortune", "test_channel"))
+
+    get_class_by_name.assert_called_once_with("reactors", "Fortune")
+    assert reactor.handle.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_hub_loads_reactors_with_empty_triggers_eagerly(tmp_path):
+    config = tmp_path / "config.toml"
+    config.write_text(
+        """
+[reactors.echo]
+class = "EchoReactor"
+triggers = []
+        """
+    )
+    hub = Hub(str(config))
+    hub.send_channel_response = AsyncMock()
+
+    hub.initialize_reactors()
+    await hub.process_event(Event("message", "igor echo hi", "test_channel"))
+
+    assert not isinstance(hub.reactors[0], LazyReactor)
+    hub.send_channel_response.assert_awaited_once()
+
+
+class LifecycleComponent:
+    setup_timeout = None
+
+    def __init__(self, release, started):
+        self.release = release
+        self.started = started
+        self.listening = False
+        self.torn_down = False
+
+    async def setup(self):
+        self.started.append(self)
+        await self.release.wait()
+
+    async def teardown(self):
+        self.torn_down = True
+
+    async def start_listening(self):
+        self.listening = True
+
+
+@pytest.mark.asyncio
+async def test_hub_sets_up_channels_concurrently(hub):
+    release = asyncio.Event()
+    started = []
+    first = LifecycleComponent(release, started)
+    second = LifecycleComponent(release, started)
+
+    tasks = [
+        asyncio.create_task(hub.start_channel("first", first)),
+        asyncio.create_task(hub.start_channel("second", second)),
+    ]
+    await asyncio.sleep(0.01)
+
+    # both setups are running before either has finished
+    assert started == [first, second]
+    assert not first.listening
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert first.listening and second.listening
+
+
+@pytest.mark.asyncio
+async def test_hub_skips_channel_when_setup_times_out(hub):
+    channel = LifecycleComponent(asyncio.Event(), [])
+    channel.setup_timeout = 0.01
+
+    await hub.start_channel("slow", channel)
+
+    assert not channel.listening
+
+
+@pytest.mark.asyncio
+async def test_hub_process_event_waits_for_reactor_setup(hub):
+    release = asyncio.Event()
+    reactor = LifecycleComponent(release, [])
+    reactor.triggers = ("igor echo",)
+    reactor.handle = AsyncMock(return_value=Response("hi", "test_channel"))
+    hub.register_reactor(reactor)
+    hub.setup_reactor(reactor)
+
+    event = Event("message", "igor echo hi", "test_channel")
+    processing = asyncio.create_task(hub.process_event(event))
+    await asyncio.sleep(0.01)
+    reactor.handle.assert_not_awaited()
+
+    release.set()
+    await processing
+    reactor.handle.assert_awaited_once_with(event)
+
+    await hub.teardown()
+    assert reactor.torn_down
+
+
+@pytest.mark.asyncio
+async def test_hub_skips_reactor_when_setup_fails(hub):
+    reactor = MagicMock(triggers=("igor echo",), event_types=("message",))
+    reactor.setup = AsyncMock(side_effect=RuntimeError("no lexicon"))
+    reactor.handle = AsyncMock()
+    hub.register_reactor(reactor)
+
+    await hub.process_event(Event("message", "igor echo hi", "test_channel"))
+
+    reactor.handle.assert_not_awaited()
+    hub.send_channel_response.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_hub_preloads_warming_reactors_with_shipped_config(monkeypatch):
+    from igor.reactors.catpic import CatPicPrefetcher
+    from igor.reactors.sentimentreactor import SentimentReactor
+
+    monkeypatch.setattr(CatPicPrefetcher, "fetch", AsyncMock(return_value=[]))
+    monkeypatch.setattr(SentimentReactor, "setup", AsyncMock())
+    config = os.path.join(os.path.dirname(igor.hub.__file__), "config.toml")
+    hub = Hub(config)
+
+    hub.initialize_reactors()
+    hub.start_reactors()
+    await asyncio.gather(*hub.tasks)
+    await asyncio.gather(*hub.setups.values())
+
+    lazy = {reactor.class_name: reactor for reactor in hub.reactors}
+    catpic = lazy["CatPic"].reactor
+    # the pool is being filled before any event arrived
+    assert catpic.prefetcher._task is not None
+    SentimentReactor.setup.assert_awaited_once()
+    # reactors without preload still wait for their first event
+    assert lazy["Fortune"].reactor is None
+
+    await catpic.prefetcher.stop()
+
+
+@pytest.mark.asyncio
+async def test_hub_passes_arguments_after_the_matched_trigger(hub):
+    received = []
+
+    class CatPic:
+        triggers = ("igor cat pic",)
+        event_types = ("message",)
+
+        async def setup(self):
+            pass
+
+        async def handle(self, event):
+            received.append(event.args)
+            return Response("meow", event.channel)
+
+    hub.reactors = [CatPic()]
+    await hub.process_event(Event("message", "Igor Cat Pic Fluffy One", "test"))
+
+    assert received == ["Fluffy One"]
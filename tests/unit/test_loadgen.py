@@ -0,0 +1,78 @@
+import pytest
+from unittest.mock import MagicMock
+from igor.channels.loadgen import LoadGen, SUBMIT
+from igor.response import Response
+
+
+class ReplyingHub:
+    """
+    Replies to every message except "igor nothing", straight through the
+    channel, and records the events it was given.
+    """
+
+    def __init__(self):
+        self.channel = None
+        self.events = []
+        self.signal_shutdown = MagicMock()
+
+    async def process_event(self, event):
+        self.events.append(event)
+        if event.content != "igor nothing":
+            await self.channel.deliver(event, Response(content="ok", channel="loadgen"))
+
+    async def submit(self, event):
+        await self.process_event(event)
+        return True
+
+    async def drain(self):
+        pass
+
+
+def make_loadgen(**options):
+    hub = ReplyingHub()
+    mix = {"echo": ("igor echo hi", 3), "none": ("igor nothing", 1)}
+    hub.channel = LoadGen(hub, mix=mix, seed=1, **options)
+    return hub, hub.channel
+
+
+@pytest.mark.asyncio
+async def test_loadgen_counts_replies_per_label():
+    hub, loadgen = make_loadgen(count=200, concurrency=8)
+
+    results = await loadgen.run()
+
+    assert results["events"] == 200
+    assert results["errors"] == 0
+    echo, none = results["reactors"]["echo"], results["reactors"]["none"]
+    assert echo["sent"] + none["sent"] == 200
+    assert echo["replies"] == echo["sent"]
+    assert none["replies"] == 0
+    assert none["p50_ms"] is None
+    assert 0 <= echo["p50_ms"] <= echo["p99_ms"] <= echo["max_ms"]
+    # every message is its own conversation
+    assert len({event.extra["conversation_id"] for event in hub.events}) == 200
+
+
+@pytest.mark.asyncio
+async def test_loadgen_submit_path_and_shutdown():
+    hub, loadgen = make_loadgen(count=10, path=SUBMIT, exit_when_done=True)
+
+    await loadgen.start_listening()
+
+    assert loadgen.results["events"] == 10
+    hub.signal_shutdown.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_loadgen_keeps_to_rate():
+    _, loadgen = make_loadgen(count=5, rate=100)
+
+    results = await loadgen.run()
+
+    # 5 messages at 100/s: the last one is sent 40 ms after the first
+    assert results["seconds"] >= 0.04
+
+
+def test_loadgen_rejects_unknown_path():
+    with pytest.raises(ValueError):
+        LoadGen(MagicMock(), path="telepathy")
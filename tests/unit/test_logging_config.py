@@ -0,0 +1,88 @@
+import logging
+import pytest
+from logging.handlers import QueueHandler
+from igor import logging_config
+from igor.logging_config import (
+    RateLimitFilter,
+    get_rate_limited_logger,
+    setup_logging,
+    stop_logging,
+)
+
+
+def make_record(created, lineno=10):
+    record = logging.LogRecord(
+        "igor.test", logging.WARNING, "hub.py", lineno, "m", (), None
+    )
+    record.created = created
+    return record
+
+
+def test_rate_limit_filter_limits_each_call_site():
+    limiter = RateLimitFilter(rate=2, per=1.0)
+
+    passed = [limiter.filter(make_record(100.0 + i * 0.1)) for i in range(5)]
+    other_site = limiter.filter(make_record(100.5, lineno=20))
+
+    assert passed == [True, True, False, False, False]
+    assert other_site
+
+
+def test_rate_limit_filter_reports_suppressed_records():
+    limiter = RateLimitFilter(rate=1, per=1.0)
+    for i in range(4):
+        limiter.filter(make_record(100.0 + i * 0.1))
+
+    record = make_record(101.0)
+
+    assert limiter.filter(record)
+    assert record.getMessage() == "m (3 similar messages suppressed)"
+
+
+def test_rate_limited_logger_gets_one_filter():
+    logger = get_rate_limited_logger("igor.test.events")
+    assert get_rate_limited_logger("igor.test.events") is logger
+    assert len(logger.filters) == 1
+
+
+@pytest.fixture
+def root_logger():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield root
+    stop_logging()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def test_setup_logging_writes_through_a_queue(root_logger, monkeypatch):
+    written = []
+
+    class ListHandler(logging.Handler):
+        def emit(self, record):
+            written.append(record.getMessage())
+
+    config = dict(logging_config.BASE_CONFIG)
+    config["handlers"] = {"default": {"()": ListHandler, "level": "DEBUG"}}
+    monkeypatch.setattr(logging_config, "BASE_CONFIG", config)
+
+    setup_logging()
+    logging.getLogger("igor.test").warning("queued %s", "record")
+    stop_logging()
+
+    assert [type(handler) for handler in root_logger.handlers] == [QueueHandler]
+    assert "queued record" in written
+
+
+def test_setup_logging_twice_replaces_the_listener(root_logger):
+    setup_logging()
+    first = logging_config._listener
+    setup_logging()
+
+    assert logging_config._listener is not first
+    # a stopped listener has no thread left
+    assert first._thread is None
+    assert [type(handler) for handler in root_logger.handlers] == [QueueHandler]
@@ -0,0 +1,123 @@
+import aiohttp
+import pytest
+from igor.event import Event
+from igor.hub import Hub
+from igor.metrics import CONTENT_TYPE, MetricsServer, Registry
+from igor.reactors.base_reactor import Reactor
+from igor.response import Response
+
+
+@pytest.fixture
+def registry():
+    return Registry()
+
+
+def test_counter_and_gauge_render(registry):
+    events = registry.counter("events_total", "Events.", ("channel",))
+    depth = registry.gauge("depth", "Depth.")
+    events.labels("discord").inc()
+    events.labels("discord").inc(2)
+    events.labels('we"ird').inc()
+    depth.labels().set(3)
+
+    text = registry.render()
+
+    assert "# TYPE events_total counter" in text
+    assert 'events_total{channel="discord"} 3.0' in text
+    assert 'events_total{channel="we\\"ird"} 1.0' in text
+    assert "# TYPE depth gauge" in text
+    assert "depth 3.0" in text
+
+
+def test_labels_returns_the_same_child(registry):
+    events = registry.counter("events_total", "Events.", ("channel",))
+    assert events.labels("discord") is events.labels("discord")
+    assert registry.counter("events_total", "Events.", ("channel",)) is events
+
+
+def test_labels_checks_label_count(registry):
+    events = registry.counter("events_total", "Events.", ("channel",))
+    with pytest.raises(ValueError):
+        events.labels()
+
+
+def test_name_clash_between_types(registry):
+    registry.counter("things", "Things.")
+    with pytest.raises(ValueError):
+        registry.gauge("things", "Things.")
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    child = latency.labels()
+    for value in (0.05, 0.1, 0.5, 2.0):
+        child.observe(value)
+
+    text = registry.render()
+
+    assert 'latency_seconds_bucket{le="0.1"} 2.0' in text
+    assert 'latency_seconds_bucket{le="1.0"} 3.0' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 4.0' in text
+    assert "latency_seconds_sum 2.65" in text
+    assert "latency_seconds_count 4.0" in text
+
+
+def test_collectors_run_on_render_and_are_held_weakly(registry):
+    depth = registry.gauge("depth", "Depth.")
+
+    class Owner:
+        def collect(self):
+            depth.labels().set(7)
+
+    owner = Owner()
+    registry.add_collector(owner.collect)
+    assert "depth 7.0" in registry.render()
+
+    del owner
+    registry.render()
+    assert registry.collectors == []
+
+
+@pytest.mark.asyncio
+async def test_metrics_server(registry):
+    registry.counter("events_total", "Events.").labels().inc()
+    server = MetricsServer(registry, port=0)
+    await server.start()
+    try:
+        async with aiohttp.ClientSession() as session:
+            url = f"http://127.0.0.1:{server.port}/metrics"
+            async with session.get(url) as response:
+                assert response.headers["Content-Type"] == CONTENT_TYPE
+                assert "events_total 1.0" in await response.text()
+    finally:
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_hub_records_events_and_reactors(tmp_path):
+    config = tmp_path / "config.toml"
+    config.write_text("")
+    hub = Hub(str(config))
+
+    async def send(*args):
+        pass
+
+    hub.send_channel_response = send
+
+    class Answering(Reactor):
+        triggers = ("igor answer",)
+
+        async def handle(self, event):
+            return Response(content="42", channel=event.channel)
+
+    hub.register_reactor(Answering(hub))
+    events, unhandled, seconds = hub.bind_channel_metrics("metrics_test")
+    latency, errors = hub.reactor_metrics["Answering"]
+    before = (events.value, unhandled.value, seconds.count, latency.count)
+
+    await hub.process_event(Event("message", "igor answer", "metrics_test"))
+    await hub.process_event(Event("message", "igor question", "metrics_test"))
+
+    after = (events.value, unhandled.value, seconds.count, latency.count)
+    assert [b - a for a, b in zip(before, after)] == [2, 1, 2, 1]
+    assert errors.value == 0
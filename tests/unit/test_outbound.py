@@ -0,0 +1,122 @@
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+from igor.channels.base_channel import Channel
+from igor.event import Event
+from igor.outbound import OutboundBuffer, split_message
+from igor.response import Response
+
+
+class RecordingChannel(Channel):
+    max_message_length = 20
+    coalesce_window = 0.01
+
+    def __init__(self, hub, **options):
+        super().__init__(hub, **options)
+        self.sent = []
+
+    async def start_listening(self):
+        pass
+
+    async def stop_listening(self):
+        pass
+
+    def channel_event_to_igor_event(self, event):
+        return Event(event_type="message", content=event, channel="test")
+
+    async def send_response(self, event, response):
+        await asyncio.sleep(0)
+        self.sent.append((event.extra["chat_id"], response.content))
+
+
+def event_for(chat_id):
+    return Event("message", "igor echo", "test", extra={"chat_id": chat_id})
+
+
+def test_split_message_short_content_is_kept():
+    assert split_message("hello", 10) == ["hello"]
+    assert split_message("x" * 50, None) == ["x" * 50]
+
+
+def test_split_message_prefers_line_breaks():
+    content = "first line\nsecond line\nthird"
+    assert split_message(content, 22) == ["first line\nsecond line", "third"]
+    assert split_message(content, 15) == ["first line", "second line", "third"]
+
+
+def test_split_message_falls_back_to_words_and_hard_cuts():
+    assert split_message("aaa bbb ccc", 7) == ["aaa bbb", "ccc"]
+    assert split_message("abcdefghij", 4) == ["abcd", "efgh", "ij"]
+
+
+def test_split_message_ignores_early_line_breaks():
+    content = "Results:\n" + " ".join(["abc"] * 997)
+    chunks = split_message(content, 2000)
+    assert len(chunks) == 2
+    assert all(len(chunk) <= 2000 for chunk in chunks)
+    assert " ".join(chunks) == content
+
+
+def test_split_message_respects_limit():
+    content = " ".join(f"word{i}" for i in range(500))
+    chunks = split_message(content, 100)
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert " ".join(chunks) == content
+    # words are at most 7 characters, so every message is nearly full
+    assert all(len(chunk) > 100 - 8 for chunk in chunks[:-1])
+
+
+@pytest.mark.asyncio
+async def test_channel_coalesces_responses_per_destination():
+    channel = RecordingChannel(MagicMock())
+
+    await channel.deliver(event_for(1), Response("one", "test"))
+    await channel.deliver(event_for(2), Response("other", "test"))
+    await channel.deliver(event_for(1), Response("two", "test"))
+    await channel.flush()
+
+    assert sorted(channel.sent) == [(1, "one\ntwo"), (2, "other")]
+
+
+@pytest.mark.asyncio
+async def test_channel_splits_coalesced_responses_in_order():
+    channel = RecordingChannel(MagicMock())
+
+    for word in ["alpha", "bravo", "charlie", "delta", "echo"]:
+        await channel.deliver(event_for(1), Response(word, "test"))
+    await channel.flush()
+
+    assert channel.sent == [
+        (1, "alpha\nbravo\ncharlie"),
+        (1, "delta\necho"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_channel_without_window_sends_each_response():
+    channel = RecordingChannel(MagicMock(), coalesce_window=0)
+
+    await channel.deliver(event_for(1), Response("one", "test"))
+    await asyncio.sleep(0.01)
+    await channel.deliver(event_for(1), Response("two", "test"))
+    await channel.flush()
+
+    assert channel.sent == [(1, "one"), (1, "two")]
+
+
+@pytest.mark.asyncio
+async def test_outbound_buffer_keeps_sending_after_failure():
+    sent = []
+
+    async def send(event, response):
+        if response.content == "boom":
+            raise RuntimeError("send failed")
+        sent.append(response.content)
+
+    buffer = OutboundBuffer(send)
+    buffer.deliver("chat", event_for(1), Response("boom", "test"))
+    await buffer.flush()
+    buffer.deliver("chat", event_for(1), Response("ok", "test"))
+    await buffer.flush()
+
+    assert sent == ["ok"]
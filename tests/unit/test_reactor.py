@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import MagicMock
 from igor.reactors.base_reactor import Reactor
+from igor.reactors.echoreactor import EchoReactor
 from igor.event import Event
 from igor.response import Response
 from igor.hub import Hub
@@ -69,3 +70,40 @@ async def test_reactor_in_hub(hub, reactor):
     assert isinstance(called_response, Response)
     assert called_response.content == "Handled: test content"
     assert called_response.channel == "test_channel"
+
+
+class TriggeredReactor(Reactor):
+    triggers = ("igor cat pic",)
+
+    async def handle(self, event: Event) -> Response:
+        return Response(content="cat", channel=event.channel)
+
+
+def test_reactor_default_can_handle_uses_triggers(hub):
+    reactor = TriggeredReactor(hub)
+
+    assert reactor.can_handle(
+        Event(event_type="message", content="IGOR cat pic", channel="test_channel")
+    )
+    assert not reactor.can_handle(
+        Event(event_type="message", content="igor cat", channel="test_channel")
+    )
+    assert not reactor.can_handle(
+        Event(event_type="other", content="igor cat pic", channel="test_channel")
+    )
+
+
+def test_echo_keeps_original_casing(hub):
+    echo = EchoReactor(hub)
+
+    def routed(content):
+        # the hub sets the arguments after the trigger that matched
+        event = Event("message", content, "console")
+        event.args = event.args_after(2)
+        return event
+
+    reply = echo.handle(routed("IGOR echo Hello World"))
+    empty = echo.handle(routed("igor echo "))
+
+    assert reply.content == "Hello World"
+    assert empty.content == "You didn't say anything"
@@ -0,0 +1,64 @@
+import asyncio
+import pytest
+from unittest.mock import MagicMock, patch
+from igor.registry import PluginRegistry, LazyReactor
+from igor.reactors.fortune import Fortune
+
+
+def test_registry_load_class_records_import_time():
+    registry = PluginRegistry()
+
+    assert registry.load_class("reactors", "Fortune") is Fortune
+    assert "igor.reactors.fortune" in registry.import_times
+    assert registry.import_times["igor.reactors.fortune"] >= 0
+
+
+def test_registry_load_class_missing_module():
+    registry = PluginRegistry()
+
+    with pytest.raises(ModuleNotFoundError):
+        registry.load_class("reactors", "NoSuchReactor")
+
+
+@pytest.mark.asyncio
+async def test_lazy_reactor_resolves_once():
+    hub = MagicMock()
+    ReactorClass = MagicMock()
+    hub.get_class_by_name = MagicMock(return_value=ReactorClass)
+    lazy = LazyReactor(hub, "Fortune", ["igor fortune"])
+
+    first, second = await asyncio.gather(lazy.resolve(), lazy.resolve())
+
+    assert first is second is ReactorClass.return_value
+    hub.get_class_by_name.assert_called_once_with("reactors", "Fortune")
+    ReactorClass.assert_called_once_with(hub)
+    assert lazy.triggers == ("igor fortune",)
+
+
+@pytest.mark.asyncio
+async def test_lazy_reactor_logs_import_time():
+    hub = MagicMock()
+    hub.get_class_by_name = MagicMock(return_value=MagicMock())
+    lazy = LazyReactor(hub, "Fortune", ["igor fortune"])
+
+    with patch("igor.registry.logger") as logger:
+        await lazy.resolve()
+
+    message = logger.info.call_args[0][0]
+    assert message.startswith("initialized Fortune reactor on demand in ")
+    assert message.endswith(" ms")
+
+
+@pytest.mark.asyncio
+async def test_lazy_reactor_unknown_class():
+    hub = MagicMock()
+    hub.get_class_by_name = MagicMock(return_value=None)
+    lazy = LazyReactor(hub, "Missing", ["igor missing"])
+
+    with pytest.raises(LookupError):
+        await lazy.resolve()
+
+
+def test_lazy_reactor_needs_triggers():
+    with pytest.raises(ValueError):
+        LazyReactor(MagicMock(), "Fortune", [])
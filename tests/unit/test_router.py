@@ -0,0 +1,77 @@
+import pytest
+from unittest.mock import MagicMock
+from igor.router import Router, tokenize
+from igor.event import Event
+
+
+class StaticReactor:
+    def __init__(self, *triggers, event_types=("message",)):
+        self.triggers = triggers
+        self.event_types = event_types
+
+
+@pytest.fixture
+def fallback_reactor():
+    reactor = MagicMock()
+    reactor.triggers = ()
+    return reactor
+
+
+def message(content):
+    return Event(event_type="message", content=content, channel="test_channel")
+
+
+def test_tokenize():
+    assert tokenize("  Igor Cat   pic ") == ["igor", "cat", "pic"]
+    assert tokenize("igor echo hello there", 2) == ["igor", "echo", "hello there"]
+
+
+def test_router_matches_trigger():
+    echo = StaticReactor("igor echo")
+    catpic = StaticReactor("igor cat pic")
+    router = Router([echo, catpic])
+
+    assert router.match(message("IGOR echo hello")) == [(echo, 2)]
+    assert router.match(message("igor cat pic please")) == [(catpic, 3)]
+    assert router.match(message("igor cat")) == []
+    assert router.match(message("hello igor echo")) == []
+
+
+def test_router_matches_whole_tokens_only():
+    router = Router([StaticReactor("igor echo")])
+
+    assert router.match(message("igor echoes")) == []
+
+
+def test_router_respects_event_types():
+    echo = StaticReactor("igor echo")
+    router = Router([echo])
+
+    event = Event(event_type="command", content="igor echo hi", channel="test")
+    assert router.match(event) == []
+
+
+def test_router_keeps_registration_order(fallback_reactor):
+    broad = StaticReactor("igor")
+    narrow = StaticReactor("igor cat pic")
+    router = Router([narrow, fallback_reactor, broad])
+
+    assert router.match(message("igor cat pic")) == [
+        (narrow, 3),
+        (fallback_reactor, 0),
+        (broad, 1),
+    ]
+
+
+def test_router_falls_back_for_reactors_without_triggers(fallback_reactor):
+    router = Router([StaticReactor("igor echo"), fallback_reactor])
+
+    assert router.match(message("anything at all")) == [(fallback_reactor, 0)]
+
+
+def test_router_reports_longest_trigger_of_a_reactor():
+    cat = StaticReactor("igor cat", "igor cat pic")
+    router = Router([cat])
+
+    assert router.match(message("igor cat pic please")) == [(cat, 3)]
+    assert router.match(message("igor cat please")) == [(cat, 2)]
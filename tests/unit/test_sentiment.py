@@ -0,0 +1,126 @@
+import asyncio
+import pytest
+from igor.sentiment import (
+    SentimentBatcher,
+    SentimentEngine,
+    compile_lexicon,
+    words_and_emoticons,
+)
+
+LEXICON = """good\t1.9\t0.9434\t[2, 1, 2, 2, 3, 2, 2, 2, 1, 2]
+great\t3.1\t0.7\t[3, 3, 3, 3, 3, 3, 4, 3, 3, 3]
+bad\t-2.5\t0.67082\t[-3, -2, -2, -3, -3, -3, -2, -2, -3, -2]
+hate\t-2.7\t1.00499\t[-4, -3, -4, -4, -2, -2, -2, -2, -1, -3]
+love\t3.2\t0.4\t[3, 3, 3, 3, 3, 3, 3, 4, 4, 3]
+:)\t2.0\t1.18322\t[2, 2, 1, 1, 1, 1, 4, 3, 4, 1]
+mustard\t0.0\t0.0\t[0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
+death\t-2.9\t0.83066\t[-3, -3, -3, -3, -3, -2, -4, -3, -3, -2]"""
+
+TEXTS = [
+    "",
+    "good",
+    "This is GOOD",
+    "this is not good",
+    "I really love it!!!",
+    "very very good, but bad",
+    "it was kind of good",
+    "never so good",
+    "least good thing",
+    "at least good",
+    "that was the bomb good",
+    "kiss of death",
+    "I HATE this bad bad day???",
+    "good, great! :)",
+    "'good' isn't great",
+    "hardly good",
+]
+
+
+@pytest.fixture
+def lexicon_file(tmp_path):
+    path = tmp_path / "vader_lexicon.txt"
+    path.write_text(LEXICON, encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def engine(lexicon_file, tmp_path):
+    return SentimentEngine(compile_lexicon(str(lexicon_file), str(tmp_path / "lex")))
+
+
+def test_words_and_emoticons():
+    assert words_and_emoticons("Hello, world! :) a 'quoted' can't,") == [
+        "Hello",
+        "world",
+        ":)",
+        "'quoted'",
+        "can't,",
+    ]
+
+
+def test_engine_lookup(engine):
+    valences, found = engine.lookup(["good", "missing", ":)", "zzzzzzzzzzzzzzzzzzzz"])
+
+    assert valences == [1.9, 0.0, 2.0, 0.0]
+    assert found == [True, False, True, False]
+
+
+def test_engine_matches_nltk_vader(engine):
+    vader = pytest.importorskip("nltk.sentiment.vader")
+    # build the analyzer around the test lexicon instead of the NLTK data
+    sia = vader.SentimentIntensityAnalyzer.__new__(vader.SentimentIntensityAnalyzer)
+    sia.lexicon_file = LEXICON
+    sia.lexicon = sia.make_lex_dict()
+    sia.constants = vader.VaderConstants()
+
+    expected = [sia.polarity_scores(text)["compound"] for text in TEXTS]
+
+    assert engine.compound_scores(TEXTS) == expected
+
+
+def test_engine_single_text(engine):
+    assert engine.compound_score("good") > 0
+    assert engine.compound_score("bad") < 0
+    assert engine.compound_score("") == 0.0
+
+
+@pytest.mark.asyncio
+async def test_batcher_groups_concurrent_requests():
+    batches = []
+
+    async def score_batch(texts):
+        batches.append(list(texts))
+        return [len(text) for text in texts]
+
+    batcher = SentimentBatcher(score_batch, max_batch=10, window=0.01)
+    scores = await asyncio.gather(*(batcher.score(text) for text in ["a", "bb", "ccc"]))
+
+    assert scores == [1, 2, 3]
+    assert batches == [["a", "bb", "ccc"]]
+
+
+@pytest.mark.asyncio
+async def test_batcher_flushes_full_batches():
+    batches = []
+
+    async def score_batch(texts):
+        batches.append(list(texts))
+        return [0.0] * len(texts)
+
+    batcher = SentimentBatcher(score_batch, max_batch=2, window=10)
+    await asyncio.wait_for(
+        asyncio.gather(*(batcher.score(text) for text in "abcd")), timeout=1.0
+    )
+
+    assert batches == [["a", "b"], ["c", "d"]]
+
+
+@pytest.mark.asyncio
+async def test_batcher_propagates_errors():
+    async def score_batch(texts):
+        raise RuntimeError("scoring failed")
+
+    batcher = SentimentBatcher(score_batch, window=0)
+
+    with pytest.raises(RuntimeError):
+        await batcher.score("text")
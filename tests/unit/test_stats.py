@@ -0,0 +1,8 @@
+from igor.utils.stats import percentile
+
+
+def test_percentile():
+    assert percentile([], 50) is None
+    assert percentile([1.0, 2.0, 3.0, 4.0, 5.0], 50) == 3.0
+    assert percentile([1.0, 2.0, 3.0, 4.0, 5.0], 100) == 5.0
+    assert percentile([1.0, 2.0, 3.0, 4.0, 5.0], 0) == 1.0
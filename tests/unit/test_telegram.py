@@ -0,0 +1,220 @@
+import asyncio
+import time
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer, unused_port
+from unittest.mock import MagicMock
+from igor.channels.telegram import SECRET_HEADER, Telegram
+
+TOKEN = "123:abc"
+
+
+class BotApiStandIn:
+    """
+    Local stand-in for the Telegram Bot API: answers long polls from its
+    update queue, or posts the updates to the registered webhook.
+    """
+
+    def __init__(self):
+        self.updates = asyncio.Queue()
+        self.webhook = None
+        self.next_update_id = 1
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self.handle)
+        self.server = TestServer(app)
+
+    @property
+    def base_url(self):
+        return str(self.server.make_url("/bot"))
+
+    def push(self, text, chat_id=42):
+        update = {
+            "update_id": self.next_update_id,
+            "message": {
+                "message_id": self.next_update_id,
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "text": text,
+            },
+        }
+        self.next_update_id += 1
+        if self.webhook is None:
+            self.updates.put_nowait(update)
+        else:
+            asyncio.create_task(self.post_to_webhook(update))
+
+    async def post_to_webhook(self, update):
+        url, secret = self.webhook
+        async with aiohttp.ClientSession() as session:
+            await session.post(url, json=update, headers={SECRET_HEADER: secret})
+
+    async def handle(self, request):
+        method = request.match_info["method"]
+        params = dict(await request.post())
+        result = True
+        if method == "getMe":
+            result = {"id": 1, "is_bot": True, "first_name": "Igor"}
+        elif method == "setWebhook":
+            self.webhook = (params["url"], params["secret_token"])
+        elif method == "deleteWebhook":
+            self.webhook = None
+        elif method == "getUpdates":
+            try:
+                timeout = float(params.get("timeout", 0))
+                result = [await asyncio.wait_for(self.updates.get(), timeout)]
+            except TimeoutError:
+                result = []
+        return web.json_response({"ok": True, "result": result})
+
+
+@pytest.fixture
+async def bot_api():
+    stand_in = BotApiStandIn()
+    await stand_in.server.start_server()
+    yield stand_in
+    await stand_in.server.close()
+
+
+@pytest.fixture
+def hub():
+    hub = MagicMock()
+    hub.submitted = asyncio.Queue()
+
+    async def submit(event):
+        hub.submitted.put_nowait((time.perf_counter(), event))
+        return True
+
+    hub.submit = submit
+    return hub
+
+
+async def start_channel(monkeypatch, hub, bot_api, **options):
+    monkeypatch.setenv("TELEGRAM_BOT_TOKEN", TOKEN)
+    channel = Telegram(hub, base_url=bot_api.base_url, **options)
+    await channel.setup()
+    await channel.start_listening()
+    return channel
+
+
+async def delivery_latency(hub, bot_api, text):
+    start = time.perf_counter()
+    bot_api.push(text)
+    delivered_at, event = await asyncio.wait_for(hub.submitted.get(), 5)
+    assert event.content == text
+    assert event.extra["chat_id"] == 42
+    return delivered_at - start
+
+
+@pytest.mark.asyncio
+async def test_telegram_polling_submits_messages(monkeypatch, hub, bot_api):
+    channel = await start_channel(monkeypatch, hub, bot_api)
+    try:
+        latency = await delivery_latency(hub, bot_api, "igor fortune")
+    finally:
+        await channel.teardown()
+
+    # a long poll hands the update over as soon as it is pushed
+    assert latency < 1.0
+
+
+@pytest.mark.asyncio
+async def test_telegram_webhook_submits_messages(monkeypatch, hub, bot_api):
+    port = unused_port()
+    channel = await start_channel(
+        monkeypatch,
+        hub,
+        bot_api,
+        mode="webhook",
+        webhook_url=f"http://127.0.0.1:{port}/telegram",
+        port=port,
+    )
+    try:
+        assert bot_api.webhook == (channel.webhook_url, channel.secret_token)
+        latencies = [
+            await delivery_latency(hub, bot_api, f"igor echo {i}") for i in range(5)
+        ]
+    finally:
+        await channel.teardown()
+
+    # the update is posted as soon as it is pushed
+    assert max(latencies) < 1.0
+
+
+@pytest.mark.asyncio
+async def test_telegram_webhook_rejects_wrong_secret(monkeypatch, hub, bot_api):
+    port = unused_port()
+    channel = await start_channel(
+        monkeypatch,
+        hub,
+        bot_api,
+        mode="webhook",
+        webhook_url=f"http://127.0.0.1:{port}/telegram",
+        port=port,
+    )
+    update = {
+        "update_id": 1,
+        "message": {
+            "message_id": 1,
+            "date": 0,
+            "chat": {"id": 1, "type": "private"},
+            "text": "igor fortune",
+        },
+    }
+    try:
+        async with aiohttp.ClientSession() as session:
+            forged = await session.post(
+                channel.webhook_url, json=update, headers={SECRET_HEADER: "guess"}
+            )
+            missing = await session.post(channel.webhook_url, json=update)
+            garbage = await session.post(
+                channel.webhook_url,
+                data=b"{not json",
+                headers={SECRET_HEADER: channel.secret_token},
+            )
+            not_objects = [
+                await session.post(
+                    channel.webhook_url,
+                    data=body,
+                    headers={SECRET_HEADER: channel.secret_token},
+                )
+                for body in (b"[]", b"1", b"{}")
+            ]
+    finally:
+        await channel.teardown()
+
+    assert forged.status == 403
+    assert missing.status == 403
+    assert garbage.status == 400
+    assert [response.status for response in not_objects] == [400, 400, 400]
+    assert hub.submitted.empty()
+
+
+def test_telegram_webhook_mode_needs_url(monkeypatch):
+    monkeypatch.setenv("TELEGRAM_BOT_TOKEN", TOKEN)
+
+    with pytest.raises(ValueError):
+        Telegram(MagicMock(), mode="webhook")
+    with pytest.raises(ValueError):
+        Telegram(MagicMock(), mode="carrier_pigeon")
+
+
+@pytest.mark.asyncio
+async def test_telegram_teardown_stops_and_shuts_down(monkeypatch, hub, bot_api):
+    channel = await start_channel(monkeypatch, hub, bot_api)
+    application = channel.application
+
+    await channel.teardown()
+
+    assert not application.running
+    assert not application.updater.running
+    assert channel.application is None
+
+
+@pytest.mark.asyncio
+async def test_telegram_stop_listening_without_setup(monkeypatch):
+    monkeypatch.setenv("TELEGRAM_BOT_TOKEN", TOKEN)
+    channel = Telegram(MagicMock())
+
+    await channel.stop_listening()
+    await channel.teardown()
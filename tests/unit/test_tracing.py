@@ -0,0 +1,108 @@
+import json
+import pytest
+from igor.channels.loadgen import LoadGen
+from igor.hub import Hub
+from igor.reactors.base_reactor import Reactor
+from igor.response import Response
+from igor.tracing import (
+    JsonLinesSink,
+    NullSink,
+    Sink,
+    Trace,
+    Tracer,
+    load_sink,
+    set_tracer,
+    tracer_from_config,
+)
+
+
+class ListSink(Sink):
+    def __init__(self):
+        self.records = []
+
+    def export(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def sink():
+    sink = ListSink()
+    set_tracer(Tracer(1.0, sink))
+    yield sink
+    set_tracer(None)
+
+
+def test_sampling():
+    assert Tracer(0).start("console") is None
+    assert isinstance(Tracer(1.0).start("console"), Trace)
+    traced = sum(Tracer(0.5).start("console") is not None for _ in range(2000))
+    assert 800 < traced < 1200
+
+
+def test_trace_record():
+    trace = Trace("console")
+    trace.add_span("ok", trace.start, trace.start + 0.002, {"size": 3})
+    trace.add_span("failing", trace.start + 0.002, trace.start + 0.005)
+
+    record = trace.to_record()
+
+    assert record["channel"] == "console"
+    ok, failing = record["spans"]
+    assert ok["name"] == "ok" and ok["size"] == 3
+    assert failing["start_ms"] == pytest.approx(2)
+    assert record["duration_ms"] == pytest.approx(5)
+
+
+def test_json_lines_sink(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer(1.0, JsonLinesSink(str(path)))
+    for _ in range(3):
+        tracer.finish(tracer.start("console"))
+    tracer.close()
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [record["channel"] for record in records] == ["console"] * 3
+    assert len({record["trace_id"] for record in records}) == 3
+
+
+def test_load_sink_by_name_and_path(tmp_path):
+    assert isinstance(load_sink("null"), NullSink)
+    assert isinstance(load_sink("igor.tracing.NullSink"), NullSink)
+    tracer = tracer_from_config({"sample_rate": 0.1, "path": str(tmp_path / "t")})
+    assert isinstance(tracer.sink, JsonLinesSink)
+    tracer.close()
+    assert tracer_from_config({}).sample_rate == 0
+
+
+@pytest.mark.asyncio
+async def test_hub_traces_event_to_response(tmp_path, sink):
+    config = tmp_path / "config.toml"
+    config.write_text("")
+    hub = Hub(str(config))
+
+    class Answering(Reactor):
+        triggers = ("igor answer",)
+
+        async def handle(self, event):
+            return Response(content="42", channel=event.channel)
+
+    hub.register_reactor(Answering(hub))
+    channel = hub.channels["loadgen"] = LoadGen(hub)
+
+    await hub.process_event(channel.channel_event_to_igor_event("igor answer"))
+    await hub.process_event(channel.channel_event_to_igor_event("igor question"))
+    await channel.flush()
+
+    unanswered, answered = sink.records
+    assert [span["name"] for span in answered["spans"]] == [
+        "hub.queue",
+        "reactor",
+        "hub.process",
+        "channel.send",
+    ]
+    assert answered["spans"][1]["reactor"] == "Answering"
+    assert answered["spans"][3]["messages"] == 1
+    assert [span["name"] for span in unanswered["spans"]] == [
+        "hub.queue",
+        "hub.process",
+    ]